@@ -3,11 +3,21 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import os
+import sys
+
 from scrapy import signals
+from scrapy.exceptions import NotConfigured, IgnoreRequest
+from scrapy.http import HtmlResponse
+from scrapy.utils.defer import deferred_from_coro
 
 # useful for handling different item types with a single interface
 from itemadapter import is_item, ItemAdapter
 
+# the shared ScrapingBee client lives with the rest of the scraper modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "scraper"))
+from scrapingbee_client import get_client
+
 
 class AsinCrawlerSpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
@@ -101,3 +111,37 @@ class AsinCrawlerDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class ScrapingBeeDownloaderMiddleware:
+    # Fetches every Amazon request through the shared ScrapingBee client instead of
+    # Scrapy's downloader, so the spider gets the client's retries, Retry-After handling,
+    # response cache and request budget, and the API key never appears in a request URL
+    # or in Scrapy's logs. Responses keep the original URL so spider callbacks can keep
+    # using response.urljoin(). Needs the asyncio reactor set in settings.py.
+
+    def __init__(self, client, cookies):
+        self.client = client
+        self.cookies = cookies
+        self.session = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        api_key = os.getenv("SCRAPINGBEE_API_KEY")
+        if not api_key:
+            raise NotConfigured("SCRAPINGBEE_API_KEY not set in the environment.")
+        middleware = cls(get_client(api_key), os.getenv("AMAZON_COOKIES", ""))
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    async def process_request(self, request, spider):
+        if self.session is None:
+            self.session = self.client.async_session()
+        content = await self.client.get_async(self.session, request.url, cookies=self.cookies)
+        if content is None:
+            raise IgnoreRequest(f"ScrapingBee could not fetch {request.url}")
+        return HtmlResponse(url=request.url, body=content, encoding="utf-8", request=request)
+
+    def spider_closed(self, spider):
+        if self.session is not None:
+            return deferred_from_coro(self.session.close())
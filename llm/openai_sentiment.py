@@ -1,10 +1,19 @@
 from dotenv import load_dotenv
-from openai import OpenAI
 
+import os
+import sys
 import json
+import itertools
+import collections
 import tqdm
 import enum
 
+# Share the scraper's rate-limited LLM pool
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraper"))
+from llm_pool import get_pool
+from llm_cache import prompt_version
+from llm_batch import BatchRunner, request_line
+
 load_dotenv()
 
 
@@ -306,8 +315,7 @@ class OpenAISentiment:
             path_to_output="llm/sentiment_output.jsonl", 
             model="gpt-4o-mini"
         ):
-        self.client = OpenAI()
-        # print(self.client.models.list())
+        self.pool = get_pool()
         self.path_to_json = path_to_json
         self.path_to_output = path_to_output
         self.model = model
@@ -317,30 +325,141 @@ class OpenAISentiment:
         """
         Get sentiment analysis for the input file. Save the output to the output file.
 
+        Requests are issued concurrently and results are written in input order, one
+        line per input line. A line whose request fails is written as
+        {"text": ..., "error": ...}. Re-running with the same output file keeps the
+        lines already analysed and only requests the failed or missing ones, provided
+        the file's settings sidecar shows it came from the same input file, model and
+        prompt; otherwise the output is started afresh.
+
         Parameters:
             - sysprompt (SentimentPromptType): The type of prompt to use for sentiment analysis.
             - n_rows (int, optional): The number of rows to process from the input file. If None,
                 all rows will be processed. Defaults to None.
+            - max_in_flight (int, optional): Maximum requests awaiting a response. Defaults to 64.
         """
         n_rows = kwargs.get("n_rows", None)
-        
-        sysprompt = self.N_SHOT_PROMPT if sysprompt == SentimentPromptType.N_SHOT else self.COT_PROMPT
-
-        with open(self.path_to_output, "w") as out:
-            with open(self.path_to_json, "r") as f:
-                lines = f.readlines()
-
-                total_lines = n_rows if n_rows is not None else len(lines)
-                
-                with tqdm.tqdm(total=total_lines) as pbar:
-                    for i in range(total_lines):
-                        item = json.loads(lines[i].strip())
-                        response = self._get_llm_response(item["text"], sysprompt)
-                        out.write(response + "\n")
+        max_in_flight = kwargs.get("max_in_flight", 64)
+
+        settings = self._run_settings(sysprompt)
+        if self._load_settings() != settings:
+            if os.path.exists(self.path_to_output):
+                print(f"{self.path_to_output} was produced with other settings; starting afresh.")
+            self._truncate_lines(self.path_to_output, 0)
+            self._save_settings(settings)
+
+        done = self._load_done(self.path_to_output)
+        # Keep the output up to the first line needing work; later good lines are rewritten from memory
+        keep = 0
+        while keep in done:
+            keep += 1
+        self._truncate_lines(self.path_to_output, keep)
+
+        with open(self.path_to_json, "r") as f:
+            total_lines = sum(1 for _ in f)
+        if n_rows is not None:
+            total_lines = min(n_rows, total_lines)
+
+        with open(self.path_to_json, "r") as f, open(self.path_to_output, "a") as out:
+            rows = itertools.islice(f, total_lines)
+            with tqdm.tqdm(total=total_lines, initial=min(keep, total_lines)) as pbar:
+                pending = collections.deque()
+                for i, line in enumerate(rows):
+                    if i < keep:
+                        continue
+                    text = json.loads(line.strip())["text"]
+                    if i in done:
+                        pending.append((text, done[i]))
+                    else:
+                        messages, version = self._build_messages(text, sysprompt)
+                        pending.append((text, self.pool.submit(messages, self.model, version=version)))
+                    while pending and (len(pending) >= max_in_flight or not self._is_pending(pending[0][1])):
+                        self._write_result(out, *pending.popleft())
                         pbar.update(1)
+                while pending:
+                    self._write_result(out, *pending.popleft())
+                    pbar.update(1)
 
         print("Output written to", self.path_to_output)
-       
+
+
+    def _run_settings(self, sysprompt):
+        """
+        Describe what an output file was produced from, so a resume never mixes runs.
+
+        Returns:
+            dict: The input path, model and prompt version.
+        """
+        return {"input": os.path.normpath(self.path_to_json), "model": self.model,
+                "prompt_version": self._build_messages("", sysprompt)[1]}
+
+
+    def _settings_path(self):
+        return self.path_to_output + ".settings.json"
+
+
+    def _load_settings(self):
+        try:
+            with open(self._settings_path(), "r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+
+    def _save_settings(self, settings):
+        with open(self._settings_path(), "w") as f:
+            json.dump(settings, f)
+
+
+    @staticmethod
+    def _is_pending(result):
+        return not isinstance(result, str) and not result.done()
+
+
+    def _write_result(self, out, text, result):
+        if not isinstance(result, str):
+            try:
+                result = self._clean_response(result.result())
+            except Exception as e:
+                print(f"Request failed for {text!r}: {e}")
+                result = json.dumps({"text": text, "error": str(e)})
+        out.write(result + "\n")
+        out.flush()
+
+
+    @staticmethod
+    def _load_done(path):
+        """
+        Read the lines of a previous run that need no retry.
+
+        Returns:
+            dict: Line index to output line, for complete lines that are not error records.
+        """
+        done = {}
+        if not os.path.exists(path):
+            return done
+        with open(path, "r") as f:
+            for i, line in enumerate(f):
+                if not line.endswith("\n"):
+                    break  # torn last line from an interrupted run
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    record = None
+                if not (isinstance(record, dict) and "error" in record):
+                    done[i] = line[:-1]
+        return done
+
+
+    @staticmethod
+    def _truncate_lines(path, n_lines):
+        if not os.path.exists(path):
+            return
+        with open(path, "r+b") as f:
+            for _ in range(n_lines):
+                f.readline()
+            f.truncate(f.tell())
+
 
     def _get_llm_response(self, text: str, sysprompt: str):
         # non-reasoning response generation
@@ -359,20 +478,75 @@ class OpenAISentiment:
         # )
 
         # reasoning response generation
-        sysprompt = self.N_SHOT_PROMPT if sysprompt == SentimentPromptType.N_SHOT else self.COT_REASONING_PROMPT
-        response = self.client.chat.completions.create(
+        messages, version = self._build_messages(text, sysprompt)
+        raw_response = self.pool.chat(
             model=self.model,
+            version=version,
             # reasoning_effort="medium",
-            messages=[
-                {
-                    "role": "user", 
-                    "content": f"{sysprompt} **Your Turn**: {text}"
-                }
-            ]
+            messages=messages
         )
 
-        raw_response = response.choices[0].message.content
         return self._clean_response(raw_response)
+
+
+    def _build_messages(self, text: str, sysprompt):
+        sysprompt = self.N_SHOT_PROMPT if sysprompt == SentimentPromptType.N_SHOT else self.COT_REASONING_PROMPT
+        messages = [
+            {
+                "role": "user", 
+                "content": f"{sysprompt} **Your Turn**: {text}"
+            }
+        ]
+        return messages, prompt_version(sysprompt)
+
+
+    def get_sentiment_batch(self, sysprompt: SentimentPromptType, backend=None, work_dir=None, **kwargs):
+        """
+        Get sentiment analysis for the input file through a batch backend and save it in
+        the same format as get_sentiment(). Each input line becomes one batch request
+        with the custom_id 'line-<index>'; lines without a batch result are retried
+        concurrently through the LLM pool, and a retry that fails is written as an
+        error record like get_sentiment() does.
+
+        Parameters:
+            - sysprompt (SentimentPromptType): The type of prompt to use for sentiment analysis.
+            - backend (optional): Batch backend; defaults to the OpenAI Batch API.
+            - work_dir (str, optional): Directory for shards and the submission record.
+            - n_rows (int, optional): The number of rows to process from the input file. If None,
+                all rows will be processed. Defaults to None.
+        """
+        n_rows = kwargs.get("n_rows", None)
+
+        texts = []
+        with open(self.path_to_json, "r") as f:
+            for line in f:
+                if n_rows is not None and len(texts) >= n_rows:
+                    break
+                texts.append(json.loads(line.strip())["text"])
+
+        requests = [
+            request_line(f"line-{i}", self.model, self._build_messages(text, sysprompt)[0])
+            for i, text in enumerate(texts)
+        ]
+        output_name = os.path.splitext(os.path.basename(self.path_to_output))[0]
+        runner = BatchRunner(backend, work_dir or os.path.join("llm", "batches", output_name))
+        responses = runner.run(requests)
+
+        retries = {}
+        for i, text in enumerate(texts):
+            if responses.get(f"line-{i}") is None:
+                messages, version = self._build_messages(text, sysprompt)
+                retries[i] = self.pool.submit(messages, self.model, version=version)
+        if retries:
+            print(f"Retrying {len(retries)} lines missing from the batch output.")
+
+        self._save_settings(self._run_settings(sysprompt))
+        with open(self.path_to_output, "w") as out:
+            for i, text in enumerate(texts):
+                response = responses.get(f"line-{i}")
+                self._write_result(out, text, retries[i] if response is None else self._clean_response(response))
+
+        print("Output written to", self.path_to_output)
     
 
     def _clean_response(self, response):
@@ -1,9 +1,9 @@
 import os
 import json
-import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
-from urllib.parse import urljoin
+from scrapingbee_client import get_client
+from parse_pool import get_parse_pool
+from search_extractor import parse_search_page
 
 load_dotenv()
 
@@ -11,7 +11,7 @@ class AsinHandler:
     """
     Handles the discovery and extraction of Amazon Standard Identification Numbers (ASINs)
     and associated product metadata for a specified laptop brand from Amazon search results.
-    Integrates with ScrapingBee for rendered HTML retrieval and BeautifulSoup for parsing.
+    Integrates with ScrapingBee for rendered HTML retrieval and parses search pages in the shared ParsePool.
     """
 
     # Mapping of supported brands to their Amazon search keyword and filter_id
@@ -23,7 +23,7 @@ class AsinHandler:
         "lg": ("lg", "&rh=n%3A21512780011%2Cp_123%3A46658"),
     }
 
-    def __init__(self, brand="hp", max_asins=None):
+    def __init__(self, brand="hp", max_asins=None, parse_pool=None):
         """
         Initializes the handler with the specified brand and maximum number of ASINs to collect.
         Loads ScrapingBee API key and Amazon cookies from environment variables.
@@ -31,11 +31,14 @@ class AsinHandler:
         Args:
             brand (str): Brand key as defined in brand_filter_map.
             max_asins (int, optional): Maximum number of ASINs to collect.
+            parse_pool (ParsePool, optional): Pool that parses search pages. Defaults to the shared pool.
         """
         self.api_key = os.getenv("SCRAPINGBEE_API_KEY")
         if not self.api_key:
             raise Exception("SCRAPINGBEE_API_KEY not set in the environment.")
         self.cookies = os.getenv("AMAZON_COOKIES", "")
+        self.client = get_client(self.api_key)
+        self.parse_pool = parse_pool or get_parse_pool()
 
         # Validate brand and set default if not found
         if brand not in self.brand_filter_map:
@@ -51,7 +54,7 @@ class AsinHandler:
 
     def get_page(self, url):
         """
-        Fetches the rendered HTML content of the given URL using ScrapingBee.
+        Fetches the rendered HTML content of the given URL using the shared ScrapingBee client.
 
         Args:
             url (str): The URL to fetch.
@@ -59,23 +62,44 @@ class AsinHandler:
         Returns:
             bytes or None: HTML content if successful, else None.
         """
-        # Prepare parameters for ScrapingBee API request
-        params = {
-            'api_key': self.api_key,
-            'url': url,
-            'block_resources': 'false',
-            'cookies': self.cookies
-        }
         print(f"Fetching: {url}")
-
-        # Make the request to ScrapingBee API
-        response = requests.get("https://app.scrapingbee.com/api/v1", params=params)
-        if response.status_code == 200:
-            print(f"Success: {url} returned HTTP {response.status_code}")
-            return response.content
+        content = self.client.get(url, cookies=self.cookies)
+        if content is not None:
+            print(f"Success: {url}")
         else:
-            print(f"Failed to fetch {url}: HTTP {response.status_code}")
-            return None
+            print(f"Failed to fetch {url}")
+        return content
+
+    def parse_search(self, html, base_url):
+        """
+        Parses a search results page in the parse pool.
+
+        Args:
+            html (bytes): HTML content of the page.
+            base_url (str): The base URL for resolving relative links.
+
+        Returns:
+            dict: 'products' and 'next_url', see search_extractor.parse_search_page.
+        """
+        return self.parse_pool.submit(parse_search_page, html, base_url).result()
+
+    def add_products(self, products):
+        """
+        Records parsed products until the maximum ASIN count is reached.
+
+        Args:
+            products (list): Product dicts with 'asin', 'price', 'image_url' and 'product_url'.
+
+        Returns:
+            bool: True if max_asins reached, else False.
+        """
+        for product in products:
+            print(f"Found ASIN: {product['asin']}\n")
+            self.asins.append(product)
+            # Stop if max_asins reached
+            if self.max_asins and len(self.asins) >= self.max_asins:
+                return True
+        return False
 
     def parse_page(self, html, base_url):
         """
@@ -89,40 +113,7 @@ class AsinHandler:
         Returns:
             bool: True if max_asins reached, else False.
         """
-        soup = BeautifulSoup(html, 'html.parser')
-        # Select product containers matching Amazon's search result structure
-        product_containers = soup.select('div[role="listitem"][data-component-type="s-search-result"]')
-        for product in product_containers:
-            asin = product.get("data-asin")
-            if asin:
-                # Extract image source
-                img_src = None
-                img_tag = product.select_one("img.s-image")
-                if img_tag:
-                    img_src = img_tag.get("src")
-                # Extract price text
-                price = None
-                price_tag = product.select_one("div[data-cy='price-recipe'] span.a-price > span.a-offscreen")
-                if price_tag:
-                    price = price_tag.get_text(strip=True)
-                # Extract relative product URL and convert to absolute URL
-                relative_url = None
-                link_tag = product.select_one("a.a-link-normal.s-no-outline")
-                if link_tag:
-                    relative_url = link_tag.get("href")
-                product_url = urljoin(base_url, relative_url) if relative_url else None
-
-                print(f"Found ASIN: {asin}\n")
-                self.asins.append({
-                    "asin": asin,
-                    "price": price,
-                    "image_url": img_src,
-                    "product_url": product_url
-                })
-                # Stop if max_asins reached
-                if self.max_asins and len(self.asins) >= self.max_asins:
-                    return True
-        return False
+        return self.add_products(self.parse_search(html, base_url)["products"])
 
     def get_next_page(self, html, base_url):
         """
@@ -135,14 +126,7 @@ class AsinHandler:
         Returns:
             str or None: Full URL of the next page if available, else None.
         """
-        soup = BeautifulSoup(html, 'html.parser')
-        next_page_link = soup.select_one("li.a-last a")
-        if next_page_link:
-            next_page_url = next_page_link.get("href")
-            full_url = urljoin(base_url, next_page_url)
-            print(f"Following pagination link: {full_url}")
-            return full_url
-        return None
+        return self.parse_search(html, base_url)["next_url"]
 
     def save_asins(self):
         """
@@ -180,16 +164,18 @@ class AsinHandler:
             html = self.get_page(current_url)
             if not html:
                 break
-            # Parse the current page and check if the max ASIN count is reached
-            stop = self.parse_page(html, current_url)
+            # Parse the current page once and check if the max ASIN count is reached
+            page = self.parse_search(html, current_url)
+            stop = self.add_products(page["products"])
             if stop:
                 print(f"Reached maximum ASIN limit: {self.max_asins}")
                 break
             # Get URL of the next page (if available)
-            next_url = self.get_next_page(html, current_url)
+            next_url = page["next_url"]
             if not next_url:
                 print("No further pages found.")
                 break
+            print(f"Following pagination link: {next_url}")
             current_url = next_url
         self.save_asins()
         return self.asins
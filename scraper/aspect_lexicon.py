@@ -0,0 +1,208 @@
+import os
+import re
+import json
+import threading
+from collections import Counter, defaultdict
+
+import marisa_trie
+
+from pipeline_manifest import hash_file, hash_inputs
+
+DEFAULT_TRAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "datasets",
+                                  "laptop_quad_train.tsv.jsonl")
+
+# Entities and attributes of the quad dataset that correspond to the pipeline's eight aspects
+ENTITY_ASPECTS = {
+    "DISPLAY": "DISPLAY",
+    "BATTERY": "BATTERY",
+    "POWER_SUPPLY": "BATTERY",
+    "MULTIMEDIA_DEVICES": "AUDIO",
+    "CPU": "PERFORMANCE",
+    "MEMORY": "PERFORMANCE",
+    "GRAPHICS": "PERFORMANCE",
+    "HARD_DISC": "PERFORMANCE",
+    "FANS&COOLING": "PERFORMANCE",
+}
+# Service entities say nothing about the laptop itself, whatever their attribute
+SERVICE_ENTITIES = {"SUPPORT", "SHIPPING", "COMPANY", "WARRANTY"}
+ATTRIBUTE_ASPECTS = {
+    "PRICE": "PRICE",
+    "QUALITY": "BUILD_QUALITY",
+    "DESIGN_FEATURES": "DESIGN",
+    "OPERATION_PERFORMANCE": "PERFORMANCE",
+    "PORTABILITY": "PORTABILITY",
+}
+
+# Words that name an aspect outright, in case the training set never labels them
+SEED_TERMS = {
+    "AUDIO": ["audio", "sound", "speaker", "speakers", "volume", "headphone jack", "microphone", "mic"],
+    "BATTERY": ["battery", "battery life", "charge", "charged", "charging", "charger", "power adapter"],
+    "BUILD_QUALITY": ["build", "build quality", "built", "sturdy", "flimsy", "durable", "broke", "broken",
+                      "cracked", "hinge", "quality", "scanner", "spacebar", "ports"],
+    "DESIGN": ["design", "looks", "color", "colour", "sleek", "keyboard", "backlit", "touchpad", "trackpad"],
+    "DISPLAY": ["display", "screen", "resolution", "brightness", "touchscreen", "monitor", "pixels"],
+    "PERFORMANCE": ["performance", "fast", "slow", "speed", "lag", "laggy", "processor", "cpu", "ram",
+                    "memory", "ssd", "disk", "storage", "gaming", "freezes", "crashes", "boots", "booting",
+                    "reboot", "glitchy", "locked up", "runs", "working", "turn on", "hot", "overheats"],
+    "PORTABILITY": ["portable", "portability", "light", "lightweight", "heavy", "weight", "travel", "carry", "bulky"],
+    "PRICE": ["price", "cost", "cheap", "expensive", "value", "money", "worth", "deal", "affordable", "$"],
+}
+
+_TOKEN = re.compile(r"[a-z0-9$]+(?:'[a-z]+)?")
+
+
+def normalise(text):
+    """
+    Lowercase text and reduce it to single-space separated word tokens.
+
+    Args:
+        text (str): Review text or lexicon term.
+
+    Returns:
+        str: Normalised text.
+    """
+    return " ".join(_TOKEN.findall((text or "").lower()))
+
+
+def category_aspects(category):
+    """
+    Map an ENTITY#ATTRIBUTE category to the allowed aspects it covers.
+
+    Args:
+        category (str): Category label such as 'DISPLAY#QUALITY'.
+
+    Returns:
+        set: Allowed aspect names; empty for categories outside the eight aspects.
+    """
+    entity, _, attribute = category.partition("#")
+    aspects = set()
+    if entity in ENTITY_ASPECTS:
+        aspects.add(ENTITY_ASPECTS[entity])
+    if attribute in ATTRIBUTE_ASPECTS and entity not in SERVICE_ENTITIES:
+        aspects.add(ATTRIBUTE_ASPECTS[attribute])
+    return aspects
+
+
+class AspectLexicon:
+    """
+    Trie of aspect and opinion terms that signal one of the eight allowed aspects.
+    Terms are learned from the labelled quads: a term is kept for an aspect when at
+    least min_share of its labels map to that aspect, so generic words such as
+    "laptop" or "great" (mostly LAPTOP#GENERAL) never count as evidence. Matching walks
+    the trie from every token of a review, so the cost is linear in review length.
+    """
+
+    def __init__(self, terms):
+        """
+        Build the trie.
+
+        Args:
+            terms (dict): Normalised term to the set of aspects it signals.
+        """
+        self.terms = {term: set(aspects) for term, aspects in terms.items() if term}
+        self.trie = marisa_trie.Trie(self.terms)
+
+    @classmethod
+    def from_quads(cls, path=DEFAULT_TRAIN_PATH, min_share=0.25, min_count=1):
+        """
+        Learn the lexicon from a quad dataset, adding the seed terms.
+
+        Args:
+            path (str): JSONL file of {"text", "labels": [{"aspect", "opinion", "category"}]}.
+            min_share (float): Share of a term's labels that must map to an aspect.
+            min_count (int): Minimum labels mapping a term to an aspect.
+
+        Returns:
+            AspectLexicon: The lexicon.
+        """
+        totals = Counter()
+        per_aspect = defaultdict(Counter)
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                for label in json.loads(line).get("labels", []):
+                    aspects = category_aspects(label.get("category", ""))
+                    for field in ("aspect", "opinion"):
+                        term = normalise(label.get(field))
+                        if not term or term == "null":
+                            continue
+                        totals[term] += 1
+                        for aspect in aspects:
+                            per_aspect[term][aspect] += 1
+
+        terms = defaultdict(set)
+        for term, counts in per_aspect.items():
+            for aspect, count in counts.items():
+                if count >= min_count and count / totals[term] >= min_share:
+                    terms[term].add(aspect)
+        for aspect, seeds in SEED_TERMS.items():
+            for seed in seeds:
+                terms[normalise(seed)].add(aspect)
+        # Simple plural forms, so "speaker" also matches "speakers"
+        for term in list(terms):
+            if not term.endswith("s"):
+                terms.setdefault(term + "s", set()).update(terms[term])
+        return cls(terms)
+
+    def candidate_aspects(self, text):
+        """
+        Return the allowed aspects a review may mention.
+
+        Args:
+            text (str): Review text.
+
+        Returns:
+            set: Candidate aspect names; empty if no lexicon term occurs.
+        """
+        normalised = normalise(text)
+        aspects = set()
+        start = 0
+        while start < len(normalised):
+            suffix = normalised[start:]
+            for term in self.trie.prefixes(suffix):
+                # Only whole-word matches count
+                if len(term) == len(suffix) or suffix[len(term)] == " ":
+                    aspects |= self.terms[term]
+            next_space = normalised.find(" ", start)
+            if next_space == -1:
+                break
+            start = next_space + 1
+        return aspects
+
+    def has_aspect(self, text):
+        """
+        Check whether a review contains any candidate aspect term.
+        """
+        return bool(self.candidate_aspects(text))
+
+
+_lexicon = None
+_lexicon_version = None
+_lexicon_lock = threading.Lock()
+
+
+def get_lexicon():
+    """
+    Return the lexicon learned from the training quads, building it on first use.
+
+    Returns:
+        AspectLexicon: The shared lexicon.
+    """
+    global _lexicon
+    with _lexicon_lock:
+        if _lexicon is None:
+            _lexicon = AspectLexicon.from_quads()
+        return _lexicon
+
+
+def lexicon_version():
+    """
+    Identify the lexicon's inputs, so outputs filtered by it are recomputed when it changes.
+
+    Returns:
+        str: Digest of the training file and the category mappings and seed terms.
+    """
+    global _lexicon_version
+    if _lexicon_version is None:
+        _lexicon_version = hash_inputs(hash_file(DEFAULT_TRAIN_PATH), ENTITY_ASPECTS, ATTRIBUTE_ASPECTS,
+                                       sorted(SERVICE_ENTITIES), SEED_TERMS)
+    return _lexicon_version
@@ -0,0 +1,102 @@
+import asyncio
+
+
+class AsyncPageFetcher:
+    """
+    Fetches rendered pages through a ScrapingBeeClient concurrently using asyncio.
+    A semaphore caps the number of requests in flight, and each page is handed to a
+    callback as soon as it arrives so parsing overlaps with the remaining downloads.
+    When a parse function is given, pages are parsed in a ParsePool before the callback.
+    """
+
+    def __init__(self, client, cookies=None, max_concurrency=5, parse_pool=None):
+        """
+        Initialize the fetcher with a shared ScrapingBee client and a concurrency cap.
+
+        Args:
+            client (ScrapingBeeClient): Client providing params, timeouts and retries.
+            cookies (str, optional): Amazon cookies overriding the client default.
+            max_concurrency (int): Maximum number of requests in flight at once.
+            parse_pool (ParsePool, optional): Pool used when crawl() is given a parse function.
+        """
+        self.client = client
+        self.cookies = cookies
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.parse_pool = parse_pool
+
+    async def fetch(self, session, semaphore, key, url, parse=None, fresh=False):
+        """
+        Fetch a single page, waiting for a free concurrency slot first.
+        The slot is released before parsing so the next download can start.
+
+        Args:
+            session (aiohttp.ClientSession): Session used for the request.
+            semaphore (asyncio.Semaphore): Shared concurrency limiter.
+            key: Caller-defined identifier returned alongside the content.
+            url (str): The target Amazon URL.
+            parse (callable, optional): Module-level function run on the content in the parse pool.
+            fresh (bool): Bypass cached copies of the page.
+
+        Returns:
+            tuple: (key, content) where content is bytes (or parse's result) if successful, else None.
+        """
+        try:
+            async with semaphore:
+                print(f"At - {url}")
+                content = await self.client.get_async(session, url, cookies=self.cookies, fresh=fresh)
+            if content is not None and parse is not None:
+                if self.parse_pool is not None:
+                    content = await self.parse_pool.run(parse, content)
+                else:
+                    content = parse(content)
+        except Exception as e:
+            # One failed page must not abort the crawl; the caller sees it as a failed fetch
+            print(f"Failed to fetch or parse {url}: {e}")
+            content = None
+        return key, content
+
+    async def crawl(self, requests, on_page, parse=None, fresh=False):
+        """
+        Fetch all requests concurrently and pass each page to on_page as it completes.
+        on_page may return follow-up (key, url) pairs, which are scheduled immediately.
+        A page that fails to fetch or parse reaches on_page with None content, and an
+        error raised by on_page is logged, so the remaining pages are still drained.
+
+        Args:
+            requests (iterable): Initial (key, url) pairs to fetch.
+            on_page (callable): Called as on_page(key, content); returns an iterable of
+                follow-up (key, url) pairs or None.
+            parse (callable, optional): Parse function applied to each page before on_page.
+            fresh (bool): Bypass cached copies of every page.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self.client.async_session() as session:
+            pending = {
+                asyncio.create_task(self.fetch(session, semaphore, key, url, parse, fresh))
+                for key, url in requests
+            }
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    key, content = task.result()
+                    try:
+                        follow_ups = list(on_page(key, content) or [])
+                    except Exception as e:
+                        print(f"Failed to handle page {key}: {e}")
+                        continue
+                    for next_key, next_url in follow_ups:
+                        pending.add(asyncio.create_task(
+                            self.fetch(session, semaphore, next_key, next_url, parse, fresh)
+                        ))
+
+    def run(self, requests, on_page, parse=None, fresh=False):
+        """
+        Synchronous entry point for crawl(), for callers outside an event loop.
+
+        Args:
+            requests (iterable): Initial (key, url) pairs to fetch.
+            on_page (callable): Page callback, see crawl().
+            parse (callable, optional): Parse function, see crawl().
+            fresh (bool): Bypass cached copies of every page.
+        """
+        asyncio.run(self.crawl(list(requests), on_page, parse, fresh))
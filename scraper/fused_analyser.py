@@ -0,0 +1,209 @@
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from review_store import ReviewStore
+from review_batcher import pack_reviews
+from review_summariser import ReviewSummariser, REDUCE_SUMMARISATION_PROMPT
+from review_sentiment import SentimentGenerator
+from openai_handler import OpenAIHandler
+from pipeline_manifest import hash_inputs
+
+FUSED_PROMPT = """
+    You are an aspect-based sentiment analysis and summarisation engine. You will be given a JSON array of reviews of one laptop. Each review object contains an "id", a "star_rating" (for example, "5.0 out of 5 stars") and a "review_text". You have two tasks.
+
+    1. Analyze each review independently and extract aspect terms from the review text based on its sentiment. Only use the following allowed aspect terms:
+
+   AUDIO, BATTERY, BUILD_QUALITY, DESIGN, DISPLAY, PERFORMANCE, PORTABILITY, PRICE
+
+    If the review is positive (indicated by its star rating), extract the positive aspect terms mentioned in the review that match the allowed list. If the review is negative, extract the negative aspect terms. Some reviews may contain mixed sentiments; in that case, only include aspect terms clearly expressed with a positive sentiment in the positive list and vice versa.
+
+    2. Summarise all the reviews. Your summary must be concise and within **1 sentence**, start your summary with "The laptop ...". You do not need to mention the laptop model name in the summary.
+
+    Return only a JSON object of the form {"summary": "The laptop ...", "results": [{"id": <review id>, "pos_aspects": [...], "neg_aspects": [...]}]} with exactly one result per review, using the review's "id" unchanged. If no aspect terms are found, output an empty list. **Do not** include any additional commentary or explanations.
+"""
+
+
+class FusedAnalyser:
+    """
+    Produces a laptop's summary and aspect sentiments from the same requests, so each
+    review's text is sent once instead of once per stage. Reviews are packed into
+    token-budgeted batches; each batch returns per-review aspects plus a summary of
+    the batch, and several batch summaries are reduced into one sentence. Anything
+    that fails validation falls back to the split ReviewSummariser and
+    SentimentGenerator paths, and results are stored exactly as those stages store them.
+    Every review goes to the fused prompt, so the sentiment pre-filter, cascade and
+    result cache are not applied; the manifest records fused summaries and sentiments
+    under their own hashes so the split stages never reuse or extend them as their own.
+    """
+
+    def __init__(self, summariser=None, sentiment_generator=None, max_workers=16):
+        """
+        Initialize the analyser.
+
+        Args:
+            summariser (ReviewSummariser, optional): Split summary path used for fallbacks.
+            sentiment_generator (SentimentGenerator, optional): Split sentiment path used for
+                fallbacks and batch sizing.
+            max_workers (int): Laptops analysed concurrently by run().
+        """
+        self.summariser = summariser or ReviewSummariser()
+        self.sentiment_generator = sentiment_generator or SentimentGenerator()
+        self.max_workers = max_workers
+
+    def _get_responses(self, sysprompt, prompts):
+        client = OpenAIHandler(sysprompt)
+        return client.get_responses(prompts)
+
+    @staticmethod
+    def parse_summary(response):
+        """
+        Return the summary from a fused response if it is a valid one-sentence summary.
+
+        Args:
+            response (str): Raw model response.
+
+        Returns:
+            str or None: The summary, or None if missing or malformed.
+        """
+        try:
+            summary = json.loads(response).get("summary")
+        except (json.JSONDecodeError, AttributeError, TypeError):
+            return None
+        if not isinstance(summary, str) or not summary.strip().startswith("The laptop"):
+            return None
+        return summary.strip()
+
+    def prompt_hash(self):
+        """
+        Hash the prompts and settings a fused summary depends on, apart from the reviews,
+        including the split summariser's used for fallbacks.
+        """
+        return hash_inputs("fused", OpenAIHandler.DEFAULT_MODEL, FUSED_PROMPT, self.summariser.prompt_hash())
+
+    def summary_hash(self, laptop):
+        """
+        Hash everything that determines a laptop's fused summary.
+
+        Args:
+            laptop (dict): Product record with a 'review' list.
+
+        Returns:
+            str: Digest used by the pipeline manifest for the 'summarise' stage.
+        """
+        review_texts = [review.get("review_text") for review in laptop.get("review", [])]
+        return hash_inputs(self.prompt_hash(), review_texts)
+
+    def sentiment_hash(self, laptop):
+        """
+        Hash everything that determines a laptop's fused sentiment output.
+
+        Args:
+            laptop (dict): Product record with a 'review' list.
+
+        Returns:
+            str: Digest used by the pipeline manifest for the 'sentiment' stage.
+        """
+        reviews = [(review.get("star_rating", ""), review.get("review_text", ""))
+                   for review in laptop.get("review", [])]
+        return hash_inputs("fused", OpenAIHandler.DEFAULT_MODEL, FUSED_PROMPT, reviews)
+
+    def analyse_product(self, laptop):
+        """
+        Summarise one laptop and extract its aspect sentiments.
+
+        Args:
+            laptop (dict): Product record with a 'review' list.
+
+        Returns:
+            tuple: (summary, aggregated aspect lists keyed 'pos_5_aspects' ... 'neg_1_aspects').
+        """
+        generator = self.sentiment_generator
+        items = generator.review_items(laptop)
+        batches = pack_reviews(items, generator.batch_tokens, generator.max_batch_size)
+        responses = self._get_responses(FUSED_PROMPT, [json.dumps(batch) for batch in batches]) if batches else []
+
+        results = {}
+        summaries = []
+        for batch, response in zip(batches, responses):
+            results.update(generator.parse_batch_response(batch, response))
+            summaries.append(self.parse_summary(response))
+
+        failed = [item for item in items if item["id"] not in results]
+        if failed:
+            print(f"Falling back to the sentiment prompt for {len(failed)} reviews.")
+            results.update(generator.analyse_reviews(failed))
+
+        if not summaries or None in summaries:
+            print("Falling back to the summary prompt.")
+            summary = self.summariser.summarise_product(laptop)
+        elif len(summaries) == 1:
+            summary = summaries[0]
+        else:
+            summary = self._get_responses(REDUCE_SUMMARISATION_PROMPT, ["; ".join(summaries)])[0]
+        return summary, generator.aggregate(items, results)
+
+    def process_product(self, laptop, processed_store, sentiment_store, manifest=None):
+        """
+        Add a summary and sentiments to one laptop and upsert it into both stores,
+        skipping the LLM calls when the manifest shows both are up to date.
+
+        Args:
+            laptop (dict): Product record with a 'review' list.
+            processed_store (ReviewStore): Store of summarised products.
+            sentiment_store (ReviewStore): Store of final analysed products.
+            manifest (PipelineManifest, optional): Manifest used to skip unchanged work.
+
+        Returns:
+            dict or None: The analysed laptop, or None if the analysis failed.
+        """
+        product_id = laptop.get("product_id")
+        summary_hash = self.summary_hash(laptop)
+        sentiment_hash = self.sentiment_hash(laptop)
+        if manifest and product_id in processed_store and product_id in sentiment_store and \
+                manifest.is_done("summarise", product_id, summary_hash) and \
+                manifest.is_done("sentiment", product_id, sentiment_hash):
+            self.summariser.reuse_previous(laptop, summary_hash, processed_store, manifest)
+            self.sentiment_generator.reuse_previous(laptop, sentiment_hash, sentiment_store, manifest)
+            return laptop
+
+        try:
+            summary, aggregated_sentiments = self.analyse_product(laptop)
+        except Exception as e:
+            print(f"Failed to analyse {product_id}: {e}")
+            if manifest:
+                manifest.mark_failed("summarise", product_id, summary_hash, e)
+                manifest.mark_failed("sentiment", product_id, sentiment_hash, e)
+            return None
+        laptop = self.summariser.save_summary(laptop, summary, summary_hash, processed_store, manifest,
+                                              prompt_hash=self.prompt_hash())
+        return self.sentiment_generator.save_product(
+            dict(laptop), aggregated_sentiments, sentiment_hash, sentiment_store, manifest,
+            settings_hash=self.sentiment_hash({"review": []})
+        )
+
+    def run(self, brand: str, manifest=None):
+        path_to_product_store = f'./scraper_results/{brand}_reviews.jsonl'
+
+        if not os.path.exists(path_to_product_store):
+            print("No reviews file found. Make sure the reviews have been processed.")
+            return
+
+        reviews_data = ReviewStore(path_to_product_store)
+
+        if not len(reviews_data):
+            print("No reviews found.")
+            return
+
+        processed_store = ReviewStore(f'./scraper_results/{brand}_processed_reviews.jsonl')
+        sentiment_store = ReviewStore(f'./scraper_results/final/{brand}_sentiment_analysis.jsonl')
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            list(pool.map(
+                lambda laptop: self.process_product(laptop, processed_store, sentiment_store, manifest),
+                reviews_data
+            ))
+
+        processed_store.export_json(f'./scraper_results/{brand}_processed_reviews.json')
+        sentiment_store.export_json(f'./scraper_results/final/{brand}_sentiment_analysis.json')
+        print(f"Fused analysis complete for {brand}.")
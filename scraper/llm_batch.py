@@ -0,0 +1,242 @@
+import os
+import json
+import time
+from dotenv import load_dotenv
+from pipeline_manifest import hash_inputs
+
+load_dotenv()
+
+CHAT_ENDPOINT = "/v1/chat/completions"
+
+
+def request_line(custom_id, model, messages, **kwargs):
+    """
+    Build one line of an OpenAI Batch API input file.
+
+    Args:
+        custom_id (str): Stable ID used to match the result back to its input.
+        model (str): Model name.
+        messages (list): Chat messages.
+        **kwargs: Extra arguments for the chat completion.
+
+    Returns:
+        dict: The batch request.
+    """
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": CHAT_ENDPOINT,
+        "body": dict(kwargs, model=model, messages=messages),
+    }
+
+
+def write_shards(requests, shard_dir, max_requests=50000, max_bytes=190 * 1024 * 1024):
+    """
+    Write batch requests to JSONL shards that respect the Batch API file limits.
+
+    Args:
+        requests (list): Requests from request_line().
+        shard_dir (str): Directory for the shard files.
+        max_requests (int): Maximum requests per shard.
+        max_bytes (int): Maximum size in bytes of one shard.
+
+    Returns:
+        list: Paths of the written shards.
+    """
+    os.makedirs(shard_dir, exist_ok=True)
+    paths = []
+    out = None
+    count = size = 0
+    for request in requests:
+        line = (json.dumps(request, ensure_ascii=False) + "\n").encode("utf-8")
+        if out is None or count >= max_requests or size + len(line) > max_bytes:
+            if out is not None:
+                out.close()
+            paths.append(os.path.join(shard_dir, f"shard_{len(paths):04d}.jsonl"))
+            out = open(paths[-1], "wb")
+            count = size = 0
+        out.write(line)
+        count += 1
+        size += len(line)
+    if out is not None:
+        out.close()
+    return paths
+
+
+class OpenAIBatchBackend:
+    """
+    Submits shards to the OpenAI Batch API, which completes within 24 hours at half
+    the price of synchronous requests.
+    """
+
+    def __init__(self, completion_window="24h"):
+        from openai import OpenAI
+        self.client = OpenAI()
+        self.completion_window = completion_window
+
+    def submit(self, shard_path):
+        """
+        Upload a shard and start a batch for it.
+
+        Returns:
+            str: The batch ID.
+        """
+        with open(shard_path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=CHAT_ENDPOINT,
+            completion_window=self.completion_window,
+        )
+        return batch.id
+
+    def status(self, batch_id):
+        """
+        Return the batch status, e.g. 'in_progress' or 'completed'.
+        """
+        return self.client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id):
+        """
+        Download a finished batch's output and error lines.
+
+        Returns:
+            list: Output records with 'custom_id', 'response' and 'error'.
+        """
+        batch = self.client.batches.retrieve(batch_id)
+        lines = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                lines.extend(self.client.files.content(file_id).text.splitlines())
+        return [json.loads(line) for line in lines if line.strip()]
+
+
+class LocalBatchBackend:
+    """
+    Stand-in for the Batch API that answers each shard immediately with a local
+    callable, writing output in the Batch API's format. Used for tests and for
+    running the batch path without waiting on OpenAI.
+    """
+
+    def __init__(self, respond=None):
+        """
+        Args:
+            respond (callable, optional): Maps a request body to the response content.
+                Defaults to sending the request through the shared LLM pool.
+        """
+        self.respond = respond or self._pool_respond
+        self._outputs = {}
+
+    @staticmethod
+    def _pool_respond(body):
+        from llm_pool import get_pool
+        return get_pool().chat(body["messages"], body["model"])
+
+    def submit(self, shard_path):
+        """
+        Answer every request in a shard and keep the output under a new batch ID.
+        """
+        batch_id = f"local_{os.path.basename(shard_path)}_{len(self._outputs)}"
+        with open(shard_path, "r", encoding="utf-8") as f:
+            requests = [json.loads(line) for line in f if line.strip()]
+        outputs = []
+        for request in requests:
+            try:
+                content = self.respond(request["body"])
+            except Exception as e:
+                outputs.append({"custom_id": request["custom_id"], "response": None,
+                                "error": {"message": str(e)}})
+                continue
+            outputs.append({
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "body": {
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]
+                }},
+                "error": None,
+            })
+        self._outputs[batch_id] = outputs
+        return batch_id
+
+    def status(self, batch_id):
+        return "completed"
+
+    def results(self, batch_id):
+        return self._outputs[batch_id]
+
+
+class BatchRunner:
+    """
+    Runs a set of chat requests through a batch backend: writes sharded request
+    files with stable custom_ids, submits every shard, polls until they finish and
+    maps the results back by custom_id. Submitted batch IDs are recorded in the work
+    directory, so an interrupted run resumes polling instead of paying again.
+    """
+
+    FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+    def __init__(self, backend=None, work_dir="scraper_results/batches", poll_interval=60.0):
+        """
+        Initialize the runner.
+
+        Args:
+            backend: OpenAIBatchBackend, LocalBatchBackend or compatible; defaults to OpenAI.
+            work_dir (str): Directory for shards and the submission record.
+            poll_interval (float): Seconds between status checks.
+        """
+        self.backend = backend or OpenAIBatchBackend()
+        self.work_dir = work_dir
+        self.poll_interval = poll_interval
+
+    def _load_submitted(self, path):
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def run(self, requests):
+        """
+        Run batch requests to completion.
+
+        Args:
+            requests (list): Requests from request_line() with unique custom_ids.
+
+        Returns:
+            dict: custom_id to response content, or None for requests that failed.
+        """
+        if not requests:
+            return {}
+        record_path = os.path.join(self.work_dir, "submitted.json")
+        submitted = self._load_submitted(record_path)
+        digest = hash_inputs(requests)
+        if submitted.get("digest") != digest:
+            # A different request set; start fresh rather than reuse unrelated batches
+            submitted = {"digest": digest, "batches": {}}
+
+        shards = write_shards(requests, os.path.join(self.work_dir, "shards"))
+        for shard in shards:
+            if shard not in submitted["batches"]:
+                submitted["batches"][shard] = self.backend.submit(shard)
+                print(f"Submitted {shard} as batch {submitted['batches'][shard]}")
+                with open(record_path, "w", encoding="utf-8") as f:
+                    json.dump(submitted, f)
+
+        pending = set(submitted["batches"].values())
+        while True:
+            statuses = {batch_id: self.backend.status(batch_id) for batch_id in pending}
+            pending = {batch_id for batch_id, status in statuses.items() if status not in self.FINAL_STATUSES}
+            if not pending:
+                break
+            print(f"Waiting on {len(pending)} batches...")
+            time.sleep(self.poll_interval)
+
+        results = {request["custom_id"]: None for request in requests}
+        for batch_id in submitted["batches"].values():
+            for output in self.backend.results(batch_id):
+                response = output.get("response") or {}
+                if output.get("error") or response.get("status_code") != 200:
+                    continue
+                results[output["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+        os.remove(record_path)
+        failed = sum(content is None for content in results.values())
+        print(f"Batch run complete: {len(results) - failed} succeeded, {failed} failed")
+        return results
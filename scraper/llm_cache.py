@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+
+def prompt_version(prompt):
+    """
+    Derive a short version tag for a prompt, so editing the prompt invalidates its entries.
+
+    Args:
+        prompt (str): The system prompt or prompt template.
+
+    Returns:
+        str: First 12 hex digits of the prompt's SHA-256 digest.
+    """
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+
+
+class LLMCache:
+    """
+    SQLite-backed cache of chat completion responses keyed by model, prompt version
+    and the exact messages sent. Re-running a stage over unchanged inputs is then
+    served locally, entries are evicted least-recently-used past a size cap and every
+    entry of an outdated prompt version can be dropped at once.
+    """
+
+    def __init__(self, path="scraper_results/llm_cache.sqlite", max_bytes=256 * 1024 * 1024):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path (str): Path to the SQLite file.
+            max_bytes (int): Maximum total size of cached responses.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT, prompt_version TEXT, response TEXT, "
+            "size INTEGER, created REAL, accessed REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_version ON responses (prompt_version)")
+        self._db.commit()
+
+    def key_for(self, model, version, messages, **kwargs):
+        """
+        Derive the cache key for a request.
+
+        Args:
+            model (str): Model name.
+            version (str): Prompt version tag.
+            messages (list): Chat messages.
+            **kwargs: Extra request arguments that change the response.
+
+        Returns:
+            str: Hex SHA-256 digest identifying the request.
+        """
+        payload = json.dumps({"model": model, "version": version, "messages": messages, "kwargs": kwargs},
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Return the cached response for a key, or None.
+
+        Args:
+            key (str): Key from key_for().
+
+        Returns:
+            str or None: The response content.
+        """
+        with self._lock:
+            row = self._db.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, model, version, response):
+        """
+        Store a response, then evict old entries if over the size cap.
+
+        Args:
+            key (str): Key from key_for().
+            model (str): Model name.
+            version (str): Prompt version tag.
+            response (str): The response content.
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model, prompt_version, response, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, version, response, len(response.encode("utf-8")), now, now)
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute(
+                "SELECT key, size FROM responses ORDER BY accessed ASC").fetchall():
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def invalidate(self, version=None, model=None):
+        """
+        Drop cached responses for a prompt version and/or model, or everything.
+
+        Args:
+            version (str, optional): Prompt version tag to drop.
+            model (str, optional): Model name to drop.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        clauses, args = [], []
+        if version is not None:
+            clauses.append("prompt_version = ?")
+            args.append(version)
+        if model is not None:
+            clauses.append("model = ?")
+            args.append(model)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            removed = self._db.execute(f"DELETE FROM responses{where}", args).rowcount
+            self._db.commit()
+        return removed
+
+    def stats(self):
+        """
+        Return hit/miss counters and the current footprint.
+
+        Returns:
+            dict: Keys 'hits', 'misses', 'coalesced', 'entries' and 'bytes'.
+        """
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced,
+                "entries": entries, "bytes": size}
+
+
+def llm_cache_from_env():
+    """
+    Build the default LLMCache from environment variables, or None if disabled.
+
+    LLM_CACHE=0 disables caching, LLM_CACHE_PATH sets the database file and
+    LLM_CACHE_MAX_MB the size cap.
+
+    Returns:
+        LLMCache or None: The configured cache.
+    """
+    if os.getenv("LLM_CACHE", "1") == "0":
+        return None
+    return LLMCache(
+        path=os.getenv("LLM_CACHE_PATH", "scraper_results/llm_cache.sqlite"),
+        max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", 256)) * 1024 * 1024)
+    )
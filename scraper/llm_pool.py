@@ -0,0 +1,294 @@
+import os
+import time
+import random
+import asyncio
+import threading
+from concurrent.futures import Future
+from dotenv import load_dotenv
+from openai import (AsyncOpenAI, RateLimitError, APIConnectionError, APITimeoutError,
+                    InternalServerError)
+from review_batcher import estimate_tokens
+from llm_cache import llm_cache_from_env
+
+load_dotenv()
+
+# Errors worth retrying: rate limiting, dropped connections and transient 5xx responses
+RETRY_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a per-minute rate. Only used from the
+    pool's event loop, so it needs no locking.
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        """
+        Initialize a full bucket.
+
+        Args:
+            per_minute (float): Tokens added per minute.
+            capacity (float, optional): Maximum burst; defaults to one minute's worth.
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def take(self, amount):
+        """
+        Wait until the bucket holds the requested tokens, then remove them.
+        Requests larger than the capacity are clamped so they can still run.
+
+        Args:
+            amount (float): Tokens to take.
+        """
+        amount = min(amount, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class LLMPool:
+    """
+    Shared asynchronous OpenAI chat client for every LLM stage.
+    Runs one AsyncOpenAI client on a background event loop, so blocking callers on any
+    thread can put many requests in flight at once. A semaphore caps concurrency and
+    token buckets keep requests and tokens per minute under the account limits.
+    A 429 pauses every request until the backoff expires and halves the request rate,
+    which then creeps back up to the configured limit as requests succeed.
+    With an LLMCache attached, repeated requests are answered from the cache and
+    identical requests already in flight share a single API call.
+    """
+
+    def __init__(self, max_concurrency=200, requests_per_minute=5000, tokens_per_minute=2_000_000,
+                 max_retries=6, backoff_base=1.0, backoff_cap=60.0, max_output_tokens=1000, cache=None):
+        """
+        Initialize the pool. The event loop and client start on first use.
+
+        Args:
+            max_concurrency (int): Maximum requests in flight.
+            requests_per_minute (int): Request rate limit.
+            tokens_per_minute (int): Token rate limit, counting prompt and expected output.
+            max_retries (int): Number of retries after the first attempt.
+            backoff_base (float): Base delay in seconds for exponential backoff.
+            backoff_cap (float): Maximum delay in seconds between attempts.
+            max_output_tokens (int): Output tokens reserved per request in the token bucket.
+            cache (LLMCache, optional): Response cache consulted before any request is sent.
+        """
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_output_tokens = max_output_tokens
+        self.cache = cache
+        self.rate_limited = 0
+        self._loop = None
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def _start(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-pool", daemon=True).start()
+                asyncio.run_coroutine_threadsafe(self._setup(), loop).result()
+                self._loop = loop
+        return self._loop
+
+    async def _setup(self):
+        # Retries are handled here so rate limiting is shared across requests
+        self._client = AsyncOpenAI(max_retries=0)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._requests = TokenBucket(self.requests_per_minute)
+        self._tokens = TokenBucket(self.tokens_per_minute)
+        self._resume_at = 0.0
+
+    def retry_delay(self, attempt, error):
+        """
+        Compute how long to wait before retrying a failed request.
+        Uses the server's retry-after hint when present, otherwise full-jitter
+        exponential backoff capped at backoff_cap.
+
+        Args:
+            attempt (int): Zero-based index of the attempt that just failed.
+            error (Exception): The error raised by the request.
+
+        Returns:
+            float: Delay in seconds.
+        """
+        response = getattr(error, "response", None)
+        headers = response.headers if response is not None else {}
+        for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+            try:
+                return min(float(headers[header]) * scale, self.backoff_cap)
+            except (KeyError, TypeError, ValueError):
+                continue
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    async def complete(self, messages, model, **kwargs):
+        """
+        Send one chat completion through the rate limiters, retrying transient failures.
+
+        Args:
+            messages (list): Chat messages.
+            model (str): Model name.
+            **kwargs: Extra arguments for chat.completions.create.
+
+        Returns:
+            str: The content of the first choice.
+        """
+        tokens = sum(estimate_tokens(message["content"]) for message in messages) + self.max_output_tokens
+        for attempt in range(self.max_retries + 1):
+            await self._requests.take(1)
+            await self._tokens.take(tokens)
+            async with self._semaphore:
+                # Honour a rate-limit pause triggered by any other request
+                pause = self._resume_at - time.monotonic()
+                if pause > 0:
+                    await asyncio.sleep(pause)
+                try:
+                    response = await self._client.chat.completions.create(
+                        model=model, messages=messages, **kwargs
+                    )
+                except RETRY_ERRORS as e:
+                    if attempt == self.max_retries:
+                        raise
+                    delay = self.retry_delay(attempt, e)
+                    if isinstance(e, RateLimitError):
+                        self.rate_limited += 1
+                        self._resume_at = max(self._resume_at, time.monotonic() + delay)
+                        self._requests.rate = max(self._requests.rate / 2, 1 / 60.0)
+                    print(f"OpenAI request failed ({type(e).__name__}); retrying in {delay:.1f}s "
+                          f"(attempt {attempt + 2}/{self.max_retries + 1})")
+                else:
+                    # Recover the request rate gradually after rate limiting
+                    limit = self.requests_per_minute / 60.0
+                    self._requests.rate = min(limit, self._requests.rate + limit / 50)
+                    return response.choices[0].message.content
+            await asyncio.sleep(delay)
+
+    def submit(self, messages, model, version="", **kwargs):
+        """
+        Schedule a chat completion from any thread without waiting for it.
+
+        Args:
+            messages (list): Chat messages.
+            model (str): Model name.
+            version (str): Prompt version tag the response is cached under.
+            **kwargs: Extra arguments for chat.completions.create.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the response content.
+        """
+        if self.cache is None:
+            return asyncio.run_coroutine_threadsafe(self.complete(messages, model, **kwargs), self._start())
+
+        key = self.cache.key_for(model, version, messages, **kwargs)
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                # A future resolved but not yet released serves the request like a cache hit
+                if future.done():
+                    self.cache.hits += 1
+                else:
+                    self.cache.coalesced += 1
+                return future
+        cached = self.cache.get(key)
+        future = Future()
+        if cached is not None:
+            future.set_result(cached)
+            return future
+        with self._lock:
+            # Another thread may have started the same request while the cache was read
+            if key in self._in_flight:
+                self.cache.coalesced += 1
+                return self._in_flight[key]
+            self._in_flight[key] = future
+
+        def finish(request):
+            try:
+                response = request.result()
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                # Resolve waiters before caching so a cache error cannot leave them pending
+                future.set_result(response)
+                if isinstance(response, str):  # refusals and content filter hits come back as None
+                    try:
+                        self.cache.put(key, model, version, response)
+                    except Exception as e:
+                        print(f"Failed to cache LLM response: {e}")
+            finally:
+                with self._lock:
+                    self._in_flight.pop(key, None)
+
+        asyncio.run_coroutine_threadsafe(
+            self.complete(messages, model, **kwargs), self._start()
+        ).add_done_callback(finish)
+        return future
+
+    def chat(self, messages, model, **kwargs):
+        """
+        Send one chat completion and wait for its content.
+        """
+        return self.submit(messages, model, **kwargs).result()
+
+    def chat_many(self, message_lists, model, return_exceptions=False, **kwargs):
+        """
+        Send many chat completions concurrently and wait for all of them.
+
+        Args:
+            message_lists (list): One list of chat messages per request.
+            model (str): Model name.
+            return_exceptions (bool): Return a failed request's exception in its place
+                instead of raising it, so the other responses are kept.
+            **kwargs: Extra arguments for chat.completions.create.
+
+        Returns:
+            list: Response contents (or exceptions) in the order of message_lists.
+
+        Raises:
+            Exception: The first request error, after every request has finished, unless
+                return_exceptions is set.
+        """
+        futures = [self.submit(messages, model, **kwargs) for messages in message_lists]
+        errors = [future.exception() for future in futures]
+        if return_exceptions:
+            return [error if error is not None else future.result() for future, error in zip(futures, errors)]
+        return [future.result() for future in futures]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Return the LLM pool shared by every stage, sized from the environment
+    (OPENAI_MAX_CONCURRENCY, OPENAI_RPM, OPENAI_TPM) and using the response
+    cache from llm_cache_from_env().
+
+    Returns:
+        LLMPool: The shared pool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = LLMPool(
+                max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "200")),
+                requests_per_minute=int(os.getenv("OPENAI_RPM", "5000")),
+                tokens_per_minute=int(os.getenv("OPENAI_TPM", "2000000")),
+                cache=llm_cache_from_env(),
+            )
+        return _pool
@@ -0,0 +1,313 @@
+from collections import defaultdict
+
+import numpy as np
+
+from aspect_lexicon import normalise
+
+EMPTY = np.iinfo(np.uint32).max
+
+
+def shingles(normalised, k=5):
+    """
+    Hash the character k-grams of many normalised texts at once.
+
+    Args:
+        normalised (list): Texts already passed through normalise().
+        k (int): Shingle length in bytes of the UTF-8 text.
+
+    Returns:
+        tuple: (uint32 shingle hashes, int64 index of the text each shingle belongs to).
+            Texts shorter than k give one shingle.
+    """
+    encoded = [text.encode("utf-8").ljust(k) for text in normalised]
+    lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+    buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint32)
+    # FNV-1 hash of every k-byte window of the concatenated texts
+    windows = np.zeros(buffer.size - k + 1, dtype=np.uint32)
+    for j in range(k):
+        windows = (windows * np.uint32(16777619)) ^ buffer[j:j + windows.size]
+    # Drop the windows that run across the end of a text
+    valid = np.ones(windows.size, dtype=bool)
+    ends = np.cumsum(lengths)
+    for j in range(1, k):
+        crossing = ends - j
+        valid[crossing[crossing < windows.size]] = False
+    owners = np.repeat(np.arange(len(normalised), dtype=np.int64), lengths - k + 1)
+    return windows[valid], owners
+
+
+class MinHasher:
+    """
+    MinHash signatures over character shingles, computed with one-permutation
+    hashing: each shingle is hashed once, the hash range is split into num_perm bins
+    and a text's signature holds its minimum in every bin. Empty bins borrow the next
+    filled bin's value (rotation densification), so short texts still compare. Two
+    texts agree on a slot with probability close to the Jaccard similarity of their
+    shingle sets, and a whole corpus is signed in a few vectorised passes.
+    """
+
+    def __init__(self, num_perm=64, k=5, seed=1):
+        """
+        Args:
+            num_perm (int): Signature length; must be a power of two.
+            k (int): Shingle length in characters.
+            seed (int): Seed for the shingle hash; signatures only compare under the same seed.
+        """
+        if num_perm & (num_perm - 1):
+            raise ValueError("num_perm must be a power of two")
+        self.num_perm = num_perm
+        self.k = k
+        rng = np.random.default_rng(seed)
+        self.multiplier = np.uint32(rng.integers(0, 1 << 32) | 1)
+        self.offset = np.uint32(rng.integers(0, 1 << 32))
+        self.value_bits = 32 - (num_perm.bit_length() - 1)
+
+    def signatures(self, texts):
+        """
+        Compute the MinHash signatures of many texts.
+
+        Args:
+            texts (list): Review texts.
+
+        Returns:
+            numpy.ndarray: (len(texts), num_perm) uint32 signatures.
+        """
+        return self.signatures_of_normalised([normalise(text) for text in texts])
+
+    def signatures_of_normalised(self, normalised):
+        """
+        Compute signatures of texts already passed through normalise().
+        """
+        values, owners = shingles(normalised, self.k)
+        hashed = values ^ self.offset
+        hashed ^= hashed >> np.uint32(15)
+        hashed *= self.multiplier
+        bins = (hashed >> np.uint32(self.value_bits)).astype(np.int64)
+        signatures = np.full(len(normalised) * self.num_perm, EMPTY, dtype=np.uint32)
+        np.minimum.at(signatures, owners * self.num_perm + bins, hashed & np.uint32((1 << self.value_bits) - 1))
+        return self._densify(signatures.reshape(len(normalised), self.num_perm))
+
+    def _densify(self, signatures):
+        # For every bin, the nearest filled bin at or after it, wrapping around
+        doubled = np.concatenate([signatures, signatures], axis=1)
+        columns = np.arange(2 * self.num_perm)
+        filled_at = np.where(doubled != EMPTY, columns, 2 * self.num_perm)
+        nearest = np.minimum.accumulate(filled_at[:, ::-1], axis=1)[:, ::-1][:, :self.num_perm]
+        nearest = np.minimum(nearest, 2 * self.num_perm - 1)
+        borrowed = np.take_along_axis(doubled, nearest, axis=1)
+        # Offset borrowed values by the distance so they do not collide with genuine ones
+        distance = (nearest - columns[:self.num_perm]).astype(np.uint32)
+        return borrowed + (distance << np.uint32(self.value_bits))
+
+    def signature(self, text):
+        """
+        Compute the MinHash signature of one text.
+
+        Returns:
+            numpy.ndarray: num_perm uint32 values.
+        """
+        return self.signatures([text])[0]
+
+
+def similarity(signature_a, signature_b):
+    """
+    Estimate the Jaccard similarity of two texts from their signatures.
+    """
+    return float(np.mean(signature_a == signature_b))
+
+
+class LSHIndex:
+    """
+    Locality-sensitive hashing over MinHash signatures: each signature is split into
+    bands, and two signatures become candidates when any band matches exactly. With
+    b bands of r rows, pairs of similarity s collide with probability 1 - (1 - s^r)^b.
+    """
+
+    def __init__(self, num_perm=64, bands=16):
+        """
+        Args:
+            num_perm (int): Signature length.
+            bands (int): Number of bands; must divide num_perm.
+        """
+        if num_perm % bands:
+            raise ValueError("bands must divide num_perm")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets = [defaultdict(set) for _ in range(bands)]
+        self._keys = {}
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def insert(self, key, signature):
+        """
+        Add a signature under a key, replacing any previous signature for that key.
+        """
+        self.remove(key)
+        band_keys = self._band_keys(signature)
+        for buckets, band_key in zip(self._buckets, band_keys):
+            buckets[band_key].add(key)
+        self._keys[key] = band_keys
+
+    def remove(self, key):
+        """
+        Remove a key if present.
+        """
+        band_keys = self._keys.pop(key, None)
+        if band_keys is None:
+            return
+        for buckets, band_key in zip(self._buckets, band_keys):
+            bucket = buckets[band_key]
+            bucket.discard(key)
+            if not bucket:
+                del buckets[band_key]
+
+    def query(self, signature):
+        """
+        Return the keys sharing at least one band with a signature.
+        """
+        candidates = set()
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates |= buckets.get(band_key, set())
+        return candidates
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+
+def candidate_pairs(signatures, bands=16, partition=None):
+    """
+    Find every pair of signatures that share at least one LSH band, in a few sorts.
+
+    Args:
+        signatures (numpy.ndarray): (n, num_perm) signatures.
+        bands (int): Number of bands; must divide num_perm.
+        partition (numpy.ndarray, optional): Group label per row; only rows with the
+            same label are paired.
+
+    Returns:
+        tuple: (left, right) int64 arrays of row indices with left < right. Rows in a
+            shared bucket are paired with the bucket's first row only.
+    """
+    n, num_perm = signatures.shape
+    if num_perm % bands:
+        raise ValueError("bands must divide num_perm")
+    rows = num_perm // bands
+    base = np.zeros(n, dtype=np.uint64) if partition is None else np.asarray(partition).astype(np.uint64)
+    lefts, rights = [], []
+    for band in range(bands):
+        keys = base.copy()
+        for column in signatures[:, band * rows:(band + 1) * rows].T.astype(np.uint64):
+            keys = (keys * np.uint64(0x100000001B3)) ^ column
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        run_start = np.ones(n, dtype=bool)
+        run_start[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        first = order[np.maximum.accumulate(np.where(run_start, np.arange(n), 0))]
+        lefts.append(first[~run_start])
+        rights.append(order[~run_start])
+    pairs = np.unique(np.concatenate(lefts) * n + np.concatenate(rights)) if n else np.zeros(0, dtype=np.int64)
+    left, right = pairs // max(n, 1), pairs % max(n, 1)
+    if partition is not None:
+        partition = np.asarray(partition)
+        same = partition[left] == partition[right]
+        left, right = left[same], right[same]
+    return left, right
+
+
+def near_duplicate_groups(signatures, threshold=0.8, bands=16, partition=None, also_link=None):
+    """
+    Group near-duplicate rows: LSH candidates whose estimated Jaccard similarity is at
+    least the threshold are linked, and linked rows form one group.
+
+    Args:
+        signatures (numpy.ndarray): (n, num_perm) signatures.
+        threshold (float): Minimum estimated similarity to link two rows.
+        bands (int): LSH bands.
+        partition (numpy.ndarray, optional): Group label per row; rows with different labels
+            are never linked.
+        also_link (callable, optional): Maps candidate (left, right) arrays to a mask of
+            pairs to link whatever their similarity.
+
+    Returns:
+        numpy.ndarray: The smallest row index of each row's group.
+    """
+    left, right = candidate_pairs(signatures, bands, partition)
+    linked = (signatures[left] == signatures[right]).mean(axis=1) >= threshold
+    if also_link is not None and not linked.all():
+        unlinked = np.flatnonzero(~linked)
+        linked[unlinked] = also_link(left[unlinked], right[unlinked])
+    left, right = left[linked], right[linked]
+
+    # Propagate the smallest index along the links until every group agrees
+    labels = np.arange(signatures.shape[0])
+    while True:
+        updated = labels.copy()
+        np.minimum.at(updated, right, labels[left])
+        np.minimum.at(updated, left, labels[right])
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def truncated_copies(normalised, min_length=50):
+    """
+    Build an also_link test for near_duplicate_groups() that links a text to a longer
+    one it is a prefix of, such as a review cut off at "Read more".
+
+    Args:
+        normalised (list): Normalised texts, indexed like the signatures.
+        min_length (int): Minimum characters of the shorter text, so short stock
+            phrases are not linked to longer reviews that open with them.
+
+    Returns:
+        callable: The test.
+    """
+    stripped = [text[:-len(" read more")] if text.endswith(" read more") else text for text in normalised]
+    long_enough = np.fromiter((len(text) >= min_length for text in stripped), dtype=bool, count=len(stripped))
+    # Texts can only be prefixes of each other if their openings match
+    openings = np.fromiter((hash(text[:min_length]) for text in stripped), dtype=np.int64, count=len(stripped))
+
+    def linked(left, right):
+        mask = long_enough[left] & long_enough[right] & (openings[left] == openings[right])
+        for i in np.flatnonzero(mask).tolist():
+            short, long = sorted((stripped[left[i]], stripped[right[i]]), key=len)
+            mask[i] = long.startswith(short)
+        return mask
+
+    return linked
+
+
+def dedupe(texts, threshold=0.8, hasher=None, bands=16, partition=None):
+    """
+    Pick one text from every group of near-duplicates.
+
+    Args:
+        texts (list): Texts to deduplicate.
+        threshold (float): Minimum estimated similarity for two texts to count as duplicates.
+        hasher (MinHasher, optional): Signature settings; defaults to MinHasher().
+        bands (int): LSH bands.
+        partition (list, optional): Group label per text, e.g. a product ID; texts are only
+            deduplicated against texts with the same label.
+
+    Returns:
+        list: Indices of the texts to keep, in input order. The longest text of each
+            group is kept, the earliest on ties, so truncated copies give way to full ones.
+    """
+    if not texts:
+        return []
+    normalised = [normalise(text) for text in texts]
+    signatures = (hasher or MinHasher()).signatures_of_normalised(normalised)
+    if partition is not None:
+        partition = np.unique(np.asarray(partition), return_inverse=True)[1]
+    groups = near_duplicate_groups(signatures, threshold, bands, partition, truncated_copies(normalised))
+    # Within each group, prefer the longest text, then the earliest
+    lengths = np.fromiter((len(text) for text in normalised), dtype=np.int64, count=len(normalised))
+    order = np.lexsort((np.arange(len(texts)), -lengths, groups))
+    first_in_group = np.ones(len(texts), dtype=bool)
+    first_in_group[1:] = groups[order][1:] != groups[order][:-1]
+    return sorted(order[first_in_group].tolist())
@@ -1,26 +1,49 @@
 from dotenv import load_dotenv
-from openai import OpenAI
+from llm_pool import get_pool
+from llm_cache import prompt_version
 
 load_dotenv()
 
 class OpenAIHandler:
-    def __init__(self, sysprompt, model="gpt-4o-mini"):
-        self.client = OpenAI()
+    DEFAULT_MODEL = "gpt-4o-mini"
+
+    def __init__(self, sysprompt, model=DEFAULT_MODEL):
+        # Every handler shares one rate-limited async client instead of building its own
+        self.pool = get_pool()
         self.sysprompt = sysprompt
         self.model = model
+        # Responses are cached per prompt version, so editing the prompt misses the cache
+        self.version = prompt_version(sysprompt)
+
+    def messages(self, prompt):
+        """
+        Build the chat messages sent for a user prompt.
+        """
+        return [
+            {
+                "role": "system",
+                "content": self.sysprompt
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
 
     def get_response(self, prompt):
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": self.sysprompt
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
-        )
-        return response.choices[0].message.content
\ No newline at end of file
+        return self.pool.chat(self.messages(prompt), self.model, version=self.version)
+
+    def get_responses(self, prompts, return_exceptions=False):
+        """
+        Send several prompts with the same system prompt concurrently.
+
+        Args:
+            prompts (list): User prompts.
+            return_exceptions (bool): Return a failed request's exception in its place
+                instead of raising it.
+
+        Returns:
+            list: Responses (or exceptions) in the order of prompts.
+        """
+        return self.pool.chat_many([self.messages(prompt) for prompt in prompts], self.model,
+                                   return_exceptions=return_exceptions, version=self.version)
@@ -0,0 +1,94 @@
+import math
+
+# Amazon serves ten reviews per review page
+REVIEWS_PER_PAGE = 10
+
+
+class PaginationPlanner:
+    """
+    Plans exactly which star-filtered review pages to request for a set of per-star quotas.
+    The initial plan covers each quota with the fewest pages at the known page size.
+    As pages arrive, follow-up pages are only issued when a quota can no longer be met by
+    the pages still in flight, or speculatively as soon as a page comes back short.
+    """
+
+    def __init__(self, quotas, page_size=REVIEWS_PER_PAGE, max_pages=None, speculative=False):
+        """
+        Initialize the planner.
+
+        Args:
+            quotas (dict): Star key to number of reviews needed (e.g. '5_star': 7).
+            page_size (int): Reviews per full page.
+            max_pages (int, optional): Highest page number that may be requested per star.
+            speculative (bool): Prefetch the next page as soon as a page comes back short,
+                instead of waiting for the outstanding pages of that star to land.
+        """
+        self.quotas = {star: quota for star, quota in quotas.items() if quota > 0}
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.speculative = speculative
+        self.next_page = {star: 1 for star in self.quotas}
+        self.outstanding = {star: set() for star in self.quotas}
+        self.exhausted = set()
+
+    def _issue(self, star, count):
+        pages = []
+        for _ in range(count):
+            page = self.next_page[star]
+            if self.max_pages is not None and page > self.max_pages:
+                break
+            self.next_page[star] = page + 1
+            self.outstanding[star].add(page)
+            pages.append((star, page))
+        return pages
+
+    def initial_pages(self):
+        """
+        Return the pages needed to cover every quota assuming full pages.
+
+        Returns:
+            list: (star, page_number) pairs to request.
+        """
+        pages = []
+        for star, quota in self.quotas.items():
+            pages.extend(self._issue(star, math.ceil(quota / self.page_size)))
+        return pages
+
+    def on_page(self, star, page, collected, page_reviews):
+        """
+        Record an arrived page and return any follow-up pages to request.
+
+        Args:
+            star (str): Star key the page belongs to.
+            page (int): Page number that arrived.
+            collected (int): Reviews collected so far for this star, including this page.
+            page_reviews (int or None): Usable reviews on this page; None if the fetch failed.
+
+        Returns:
+            list: (star, page_number) pairs to request next.
+        """
+        self.outstanding[star].discard(page)
+        if page_reviews == 0:
+            # An empty page means the star-filtered listing has run out
+            self.exhausted.add(star)
+        quota = self.quotas[star]
+        if collected >= quota or star in self.exhausted:
+            return []
+
+        short = page_reviews is None or page_reviews < self.page_size
+        expected = len(self.outstanding[star]) * self.page_size
+        missing = quota - collected - expected
+        if missing > 0:
+            return self._issue(star, math.ceil(missing / self.page_size))
+        if short and self.speculative:
+            return self._issue(star, 1)
+        return []
+
+    def pages_requested(self):
+        """
+        Return the total number of pages issued so far across all stars.
+
+        Returns:
+            int: Number of planned or follow-up page requests.
+        """
+        return sum(page - 1 for page in self.next_page.values())
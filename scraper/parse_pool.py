@@ -0,0 +1,108 @@
+import os
+import asyncio
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+
+class ParsePool:
+    """
+    CPU-bound HTML parsing stage backed by a process pool.
+    Fetchers hand it raw page bytes together with a module-level parse function and
+    get back the compact records that function returns, so parsing scales with cores
+    instead of competing with network I/O for the GIL. A bounded number of pending
+    pages provides backpressure: submitters block once the pool falls behind.
+    """
+
+    def __init__(self, workers=None, max_pending=None):
+        """
+        Initialize the pool settings. Worker processes are started on first use.
+
+        Args:
+            workers (int, optional): Number of worker processes. Defaults to the CPU count;
+                0 parses inline in the calling thread.
+            max_pending (int, optional): Maximum pages queued or being parsed at once.
+                Defaults to twice the worker count.
+        """
+        self.workers = (os.cpu_count() or 1) if workers is None else max(0, int(workers))
+        self.max_pending = max_pending or max(1, 2 * self.workers)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def submit(self, fn, *args):
+        """
+        Schedule fn(*args) on the pool, blocking while max_pending pages are outstanding.
+
+        Args:
+            fn (callable): Picklable module-level parse function.
+            *args: Arguments for fn, typically the raw page bytes.
+
+        Returns:
+            concurrent.futures.Future: Future resolving to fn's return value.
+        """
+        if self.workers == 0:
+            future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        self._slots.acquire()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    async def run(self, fn, *args):
+        """
+        Asynchronous counterpart of submit() for use inside an event loop.
+        Waiting for a free slot happens off the loop so fetching keeps going.
+
+        Args:
+            fn (callable): Picklable module-level parse function.
+            *args: Arguments for fn.
+
+        Returns:
+            The return value of fn(*args).
+        """
+        if self.workers == 0:
+            return fn(*args)
+        future = await asyncio.to_thread(self.submit, fn, *args)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        """
+        Stop the worker processes, waiting for in-flight parses to finish.
+        """
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_parse_pool():
+    """
+    Return the process-wide ParsePool, sized from SCRAPER_PARSE_WORKERS when set.
+
+    Returns:
+        ParsePool: The shared pool.
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            workers = os.getenv("SCRAPER_PARSE_WORKERS")
+            _shared_pool = ParsePool(workers=int(workers) if workers else None)
+        return _shared_pool
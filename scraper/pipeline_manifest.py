@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+
+def hash_inputs(*parts):
+    """
+    Hash arbitrary JSON-serialisable inputs into a stable digest.
+
+    Args:
+        *parts: Values that together determine a unit of work's output.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def hash_file(path):
+    """
+    Hash a file's contents, or return None if it does not exist.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        str or None: Hex SHA-256 digest.
+    """
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PipelineManifest:
+    """
+    Records, per stage and per item (brand or product), the hash of the inputs that
+    produced an output, where that output lives and whether the work completed.
+    Entries are appended as JSON lines and the latest entry per (stage, item) wins,
+    so a crash never loses the record of work already paid for.
+    """
+
+    def __init__(self, path):
+        """
+        Open (or create) a manifest and load its latest entries.
+
+        Args:
+            path (str): Path to the manifest JSONL file.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn line from an interrupted write
+                    self._entries[(entry["stage"], entry["item"])] = entry
+
+    def get(self, stage, item):
+        """
+        Return the latest entry for a stage and item, or None.
+
+        Args:
+            stage (str): Pipeline stage name.
+            item (str): Brand or product ID.
+
+        Returns:
+            dict or None: Entry with 'input_hash', 'output', 'status' and 'updated'.
+        """
+        with self._lock:
+            return self._entries.get((stage, item))
+
+    def is_done(self, stage, item, input_hash):
+        """
+        Check whether an item completed a stage with exactly these inputs.
+
+        Args:
+            stage (str): Pipeline stage name.
+            item (str): Brand or product ID.
+            input_hash (str): Digest from hash_inputs() for the current inputs.
+
+        Returns:
+            bool: True if the work can be skipped.
+        """
+        entry = self.get(stage, item)
+        return bool(entry) and entry["status"] == "done" and entry["input_hash"] == input_hash
+
+    def mark(self, stage, item, input_hash, output=None, status="done", **extra):
+        """
+        Append an entry recording the outcome of a unit of work.
+
+        Args:
+            stage (str): Pipeline stage name.
+            item (str): Brand or product ID.
+            input_hash (str): Digest of the inputs that were used.
+            output (str, optional): Where the output was written.
+            status (str): 'done' or 'failed'.
+            **extra: Additional JSON-serialisable details (e.g. error message).
+        """
+        entry = dict(extra, stage=stage, item=item, input_hash=input_hash,
+                     output=output, status=status, updated=time.time())
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self._entries[(stage, item)] = entry
+
+    def mark_failed(self, stage, item, input_hash, error):
+        """
+        Record that a unit of work failed so it is retried on the next run.
+
+        Args:
+            stage (str): Pipeline stage name.
+            item (str): Brand or product ID.
+            input_hash (str): Digest of the inputs that were used.
+            error (Exception or str): What went wrong.
+        """
+        self.mark(stage, item, input_hash, status="failed", error=str(error))
+
+    def summary(self, stage):
+        """
+        Count the items of a stage by status.
+
+        Args:
+            stage (str): Pipeline stage name.
+
+        Returns:
+            dict: Status to number of items.
+        """
+        counts = {}
+        with self._lock:
+            for (entry_stage, _), entry in self._entries.items():
+                if entry_stage == stage:
+                    counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        return counts
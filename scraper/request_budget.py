@@ -0,0 +1,72 @@
+import asyncio
+import threading
+
+
+class CreditBudgetExceeded(Exception):
+    """
+    Raised when a paid request would exceed the configured ScrapingBee credit budget.
+    """
+
+
+class RequestBudget:
+    """
+    Global limit on paid ScrapingBee requests shared by every scraping worker.
+    Caps the number of requests in flight across all threads and event loops,
+    and optionally the total credits spent over the run. Credits are charged once
+    per page fetched, not per attempt, so retried transient failures do not use
+    up the budget.
+    """
+
+    # Seconds between slot checks while an event loop task waits for a free slot
+    POLL_INTERVAL = 0.01
+
+    def __init__(self, max_in_flight=10, max_credits=None, credits_per_request=5):
+        """
+        Initialize the budget.
+
+        Args:
+            max_in_flight (int): Maximum concurrent paid requests across all workers.
+            max_credits (int, optional): Total credits that may be spent; None for no limit.
+            credits_per_request (int): Credits charged per page (5 with JS rendering).
+        """
+        self.max_in_flight = max_in_flight
+        self.max_credits = max_credits
+        self.credits_per_request = credits_per_request
+        self.credits_used = 0
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+
+    def charge(self):
+        """
+        Charge the credits for one page, before its first attempt.
+
+        Raises:
+            CreditBudgetExceeded: If the page would exceed max_credits.
+        """
+        with self._lock:
+            if self.max_credits is not None and \
+                    self.credits_used + self.credits_per_request > self.max_credits:
+                raise CreditBudgetExceeded(
+                    f"Credit budget of {self.max_credits} exhausted ({self.credits_used} used)"
+                )
+            self.credits_used += self.credits_per_request
+
+    def acquire(self):
+        """
+        Block until a request slot is free and take it.
+        """
+        self._slots.acquire()
+
+    async def acquire_async(self):
+        """
+        Asynchronous counterpart of acquire(). The slot is only taken on the event loop,
+        so a task cancelled while waiting never holds one.
+        """
+        while not self._slots.acquire(blocking=False):
+            await asyncio.sleep(self.POLL_INTERVAL)
+
+    def release(self):
+        """
+        Free the request slot taken by acquire().
+        """
+        self._slots.release()
@@ -0,0 +1,180 @@
+import os
+import json
+import time
+import gzip
+import hashlib
+import sqlite3
+import threading
+
+
+class ResponseCache:
+    """
+    Content-addressed on-disk cache for fetched pages.
+    Bodies are stored gzip-compressed under a hash of the target URL and fetch
+    parameters, with a small SQLite index tracking size and access times so that
+    entries can expire after a TTL and be evicted least-recently-used past a size cap.
+    """
+
+    # Credentials do not change which page is fetched and must not split the cache;
+    # the Amazon session cookie rotates, so keying on it would orphan every cached page
+    IGNORED_PARAMS = {"api_key", "cookies"}
+
+    def __init__(self, cache_dir="scraper_results/cache", ttl=3 * 24 * 3600,
+                 max_bytes=512 * 1024 * 1024, cache_only=False):
+        """
+        Initialize the cache directory and its index.
+
+        Args:
+            cache_dir (str): Directory holding compressed bodies and the index.
+            ttl (float, optional): Seconds an entry stays fresh; None disables expiry.
+            max_bytes (int): Maximum total size of compressed bodies on disk.
+            cache_only (bool): If True, callers must never fall back to the network.
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.cache_only = cache_only
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, size INTEGER, created REAL, accessed REAL)"
+        )
+        self._db.commit()
+
+    def key_for(self, url, params=None):
+        """
+        Derive the cache key for a target URL and its fetch parameters.
+
+        Args:
+            url (str): The target page URL.
+            params (dict, optional): Fetch parameters; the API key and cookies are ignored.
+
+        Returns:
+            str: Hex SHA-256 digest identifying the response.
+        """
+        params = {k: v for k, v in (params or {}).items() if k not in self.IGNORED_PARAMS}
+        params.pop("url", None)
+        payload = json.dumps({"url": url, "params": params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.gz")
+
+    def get(self, key):
+        """
+        Return the cached body for a key, or None if it is missing or expired.
+
+        Args:
+            key (str): Key from key_for().
+
+        Returns:
+            bytes or None: The decompressed body.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT created FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None or (self.ttl is not None and now - row[0] > self.ttl):
+                if row is not None:
+                    self._delete(key)
+                    self._db.commit()
+                self.misses += 1
+                return None
+            try:
+                with gzip.open(self._path(key), "rb") as f:
+                    content = f.read()
+            except (OSError, EOFError):
+                self._delete(key)
+                self._db.commit()
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+            return content
+
+    def put(self, key, content):
+        """
+        Store a body under a key, then evict old entries if over the size cap.
+
+        Args:
+            key (str): Key from key_for().
+            content (bytes): The raw response body.
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, size, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, os.path.getsize(path), now, now)
+            )
+            self._evict()
+            self._db.commit()
+
+    def _delete(self, key):
+        self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute(
+                "SELECT key, size FROM entries ORDER BY accessed ASC").fetchall():
+            self._delete(key)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        """
+        Remove every cached entry.
+        """
+        with self._lock:
+            for (key,) in self._db.execute("SELECT key FROM entries").fetchall():
+                self._delete(key)
+            self._db.commit()
+
+    def stats(self):
+        """
+        Return hit/miss counters and the current on-disk footprint.
+
+        Returns:
+            dict: Keys 'hits', 'misses', 'entries' and 'bytes'.
+        """
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+
+def cache_from_env():
+    """
+    Build the default ResponseCache from environment variables, or None if disabled.
+
+    SCRAPER_CACHE=0 disables caching, SCRAPER_CACHE_DIR sets the directory,
+    SCRAPER_CACHE_TTL the TTL in seconds, SCRAPER_CACHE_MAX_MB the size cap and
+    SCRAPER_CACHE_ONLY=1 serves from the cache without touching the network.
+
+    Returns:
+        ResponseCache or None: The configured cache.
+    """
+    if os.getenv("SCRAPER_CACHE", "1") == "0":
+        return None
+    return ResponseCache(
+        cache_dir=os.getenv("SCRAPER_CACHE_DIR", "scraper_results/cache"),
+        ttl=float(os.getenv("SCRAPER_CACHE_TTL", 3 * 24 * 3600)),
+        max_bytes=int(float(os.getenv("SCRAPER_CACHE_MAX_MB", 512)) * 1024 * 1024),
+        cache_only=os.getenv("SCRAPER_CACHE_ONLY", "0") == "1"
+    )
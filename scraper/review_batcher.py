@@ -0,0 +1,46 @@
+import json
+
+# Rough English average for OpenAI tokenisers; only used to size batches, not to bill
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """
+    Estimate the number of tokens in a piece of text.
+
+    Args:
+        text (str): Text that will be sent to the model.
+
+    Returns:
+        int: Approximate token count.
+    """
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def pack_reviews(items, max_tokens=3000, max_items=25):
+    """
+    Greedily pack review items into batches that stay within a token budget.
+    Items keep their order; an item larger than the budget gets a batch of its own.
+
+    Args:
+        items (list): JSON-serialisable review items.
+        max_tokens (int): Approximate token budget for one batch's user message.
+        max_items (int): Maximum items in one batch, bounding the response size.
+
+    Returns:
+        list: Lists of items, one per request.
+    """
+    batches = []
+    batch = []
+    batch_tokens = 0
+    for item in items:
+        tokens = estimate_tokens(json.dumps(item, ensure_ascii=False))
+        if batch and (batch_tokens + tokens > max_tokens or len(batch) >= max_items):
+            batches.append(batch)
+            batch = []
+            batch_tokens = 0
+        batch.append(item)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
@@ -0,0 +1,201 @@
+import re
+from datetime import datetime
+from urllib.parse import urljoin
+from parsel import Selector
+from review_index import review_id
+
+AMAZON_BASE_URL = "https://www.amazon.com"
+
+
+def page_selector(content):
+    """
+    Parse a fetched page once with parsel's lxml backend.
+
+    Args:
+        content (bytes or str): Raw HTML of the page.
+
+    Returns:
+        parsel.Selector: Selector over the parsed document.
+    """
+    if isinstance(content, bytes):
+        return Selector(body=content, encoding="utf-8")
+    return Selector(text=content)
+
+
+def _text(node, query):
+    """
+    Return the whitespace-stripped text of the first element matching a CSS query.
+    """
+    element = node.css(query)
+    if not element:
+        return ""
+    return "".join(element[0].css("::text").getall()).strip()
+
+
+def extract_reviews(sel):
+    """
+    Yield one record per review on a review page, in page order.
+    Reviews without body text are skipped.
+
+    Args:
+        sel (parsel.Selector): Selector for a review page.
+
+    Yields:
+        dict: Review with 'review_id', 'reviewer_name', 'star_rating', 'review_date' and
+            'review_text'. The ID is Amazon's review ID, or a content digest when the
+            element has none.
+    """
+    for rev in sel.css("li[data-hook='review']"):
+        review_text = _text(rev, "span[data-hook='review-body'] span")
+        if not review_text:
+            continue
+        review = {
+            "review_id": rev.attrib.get("id"),
+            "reviewer_name": _text(rev, "a.a-profile > div.a-profile-content > span.a-profile-name"),
+            "star_rating": _text(rev, "i[data-hook='review-star-rating'] span.a-icon-alt"),
+            "review_date": _text(rev, "span[data-hook='review-date']"),
+            "review_text": review_text
+        }
+        review["review_id"] = review_id(review)
+        yield review
+
+
+def parse_review_date(review_date):
+    """
+    Read the date a review was posted from its date line.
+
+    Args:
+        review_date (str): Date line, e.g. 'Reviewed in the United States on May 1, 2024'.
+
+    Returns:
+        datetime.date or None: The date, or None if the line carries no full date.
+    """
+    match = re.search(r"([A-Z][a-z]+) (\d{1,2}), (\d{4})", review_date or "")
+    if not match:
+        return None
+    try:
+        return datetime.strptime(" ".join(match.groups()), "%B %d %Y").date()
+    except ValueError:
+        return None
+
+
+def star_key(star_rating):
+    """
+    Return the histogram key of a review's star rating, e.g. '5_star' for "5.0 out of 5 stars".
+
+    Args:
+        star_rating (str): Star rating text from the review page.
+
+    Returns:
+        str or None: The key, or None if the rating cannot be read.
+    """
+    match = re.match(r"\s*([1-5])(?:\.0)?\b", star_rating or "")
+    return f"{match.group(1)}_star" if match else None
+
+
+def extract_product_details(sel):
+    """
+    Extract the product title, average rating and total review count from a review page.
+
+    Args:
+        sel (parsel.Selector): Selector for a review page.
+
+    Returns:
+        dict: Keys 'title', 'average_rating' and 'review_count' (None when absent).
+    """
+    return {
+        "title": sel.css("h1.product-info-title a::text").get(),
+        "average_rating": sel.css("i[data-hook='average-star-rating'] span.a-icon-alt::text").get(),
+        "review_count": sel.css("div[data-hook='total-review-count'] span::text").get()
+    }
+
+
+def extract_histogram(sel):
+    """
+    Extract the star-rating histogram percentages from a review page.
+
+    Args:
+        sel (parsel.Selector): Selector for a review page.
+
+    Returns:
+        dict: Star key (e.g. '5_star') to percentage string without the sign (e.g. '66').
+    """
+    percentages = {}
+    for aria_label in sel.css("ul#histogramTable li a::attr(aria-label)").getall():
+        match = re.search(r"(\d+)\s+stars represent (\d+)%", aria_label)
+        if match:
+            percentages[f"{match.group(1)}_star"] = match.group(2)
+    return percentages
+
+
+def extract_star_urls(sel):
+    """
+    Map each star level in the histogram to its absolute star-filtered review URL.
+
+    Args:
+        sel (parsel.Selector): Selector for a review page.
+
+    Returns:
+        dict: Star key (e.g. '5_star') to absolute URL.
+    """
+    star_urls = {}
+    for li in sel.css("ul#histogramTable li"):
+        aria_label = li.css("a::attr(aria-label)").get()
+        href = li.css("a::attr(href)").get()
+        if aria_label and href:
+            star_urls[f"{aria_label.split()[0]}_star"] = urljoin(AMAZON_BASE_URL, href)
+    return star_urls
+
+
+def extract_parent_asin(sel):
+    """
+    Extract the parent ASIN that groups a product's colour, memory and storage variants.
+
+    Args:
+        sel (parsel.Selector): Selector for a review page.
+
+    Returns:
+        str or None: The parent ASIN, or None when the page does not name one.
+    """
+    parent = sel.css("[data-parent-asin]::attr(data-parent-asin)").get()
+    if parent:
+        return parent.strip() or None
+    return sel.re_first(r'"parentAsin"\s*:\s*"([A-Z0-9]{10})"')
+
+
+def parse_review_page(content):
+    """
+    Parse a raw review page into a compact, picklable record.
+    Runs in ParsePool worker processes, so it must stay a module-level function.
+
+    Args:
+        content (bytes): Raw HTML of the review page.
+
+    Returns:
+        dict: Keys 'details', 'histogram', 'star_urls' and 'reviews'.
+    """
+    return _page_record(page_selector(content))
+
+
+def _page_record(sel):
+    return {
+        "details": extract_product_details(sel),
+        "histogram": extract_histogram(sel),
+        "star_urls": extract_star_urls(sel),
+        "reviews": list(extract_reviews(sel))
+    }
+
+
+def parse_probe_page(content):
+    """
+    Parse the first review page of a product like parse_review_page(), adding the
+    parent ASIN used to recognise variants that share a review pool.
+
+    Args:
+        content (bytes): Raw HTML of the review page.
+
+    Returns:
+        dict: Keys of parse_review_page() plus 'parent_asin'.
+    """
+    sel = page_selector(content)
+    return dict(_page_record(sel), parent_asin=extract_parent_asin(sel))
@@ -0,0 +1,125 @@
+import os
+import time
+import sqlite3
+import threading
+
+from pipeline_manifest import hash_inputs
+
+
+def review_id(review):
+    """
+    Return a review's stable ID: the Amazon review ID when it was scraped, otherwise
+    a digest of the reviewer, rating, date and text, so a review keeps the same ID
+    across runs, star filters and products.
+
+    Args:
+        review (dict): Review as produced by review_extractor.extract_reviews().
+
+    Returns:
+        str: The review ID. Content digests start with 'h:'.
+    """
+    if review.get("review_id"):
+        return review["review_id"]
+    digest = hash_inputs(review.get("reviewer_name"), review.get("star_rating"),
+                         review.get("review_date"), review.get("review_text"))
+    return f"h:{digest[:24]}"
+
+
+class ReviewIndex:
+    """
+    Persistent set of every review ID seen by any brand and run, with the product it
+    was first seen on. IDs are held in memory for O(1) membership checks and backed
+    by SQLite, so stages can tell known reviews from new ones without rereading the
+    review stores.
+    """
+
+    def __init__(self, path="scraper_results/review_index.sqlite"):
+        """
+        Open (or create) the index and load its IDs.
+
+        Args:
+            path (str): Path to the SQLite file.
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS reviews ("
+            "review_id TEXT PRIMARY KEY, brand TEXT, product_id TEXT, first_seen REAL)"
+        )
+        self._db.commit()
+        self._ids = {row[0] for row in self._db.execute("SELECT review_id FROM reviews")}
+
+    def __contains__(self, review_id):
+        return review_id in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def unknown(self, reviews):
+        """
+        Return the reviews whose IDs are not in the index, in order.
+
+        Args:
+            reviews (list): Review dictionaries.
+
+        Returns:
+            list: The new reviews.
+        """
+        return [review for review in reviews if review_id(review) not in self._ids]
+
+    def add(self, reviews, brand, product_id):
+        """
+        Record reviews as seen. IDs already in the index keep their first product.
+
+        Args:
+            reviews (list): Review dictionaries.
+            brand (str): Brand the reviews were scraped for.
+            product_id (str): Product ASIN the reviews belong to.
+
+        Returns:
+            int: Number of reviews that were new.
+        """
+        now = time.time()
+        with self._lock:
+            new_ids = {review_id(review) for review in reviews} - self._ids
+            self._db.executemany(
+                "INSERT OR IGNORE INTO reviews (review_id, brand, product_id, first_seen) VALUES (?, ?, ?, ?)",
+                [(rid, brand, product_id, now) for rid in sorted(new_ids)]
+            )
+            self._db.commit()
+            self._ids |= new_ids
+        return len(new_ids)
+
+    def location(self, review_id):
+        """
+        Return where a review was first seen.
+
+        Args:
+            review_id (str): The review ID.
+
+        Returns:
+            tuple or None: (brand, product_id), or None if the review is unknown.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT brand, product_id FROM reviews WHERE review_id = ?", (review_id,)
+            ).fetchone()
+        return tuple(row) if row else None
+
+
+def review_index_from_env():
+    """
+    Build the shared ReviewIndex from environment variables, or None if disabled.
+
+    REVIEW_INDEX=0 disables the index and REVIEW_INDEX_PATH sets the database file.
+
+    Returns:
+        ReviewIndex or None: The configured index.
+    """
+    if os.getenv("REVIEW_INDEX", "1") == "0":
+        return None
+    return ReviewIndex(os.getenv("REVIEW_INDEX_PATH", "scraper_results/review_index.sqlite"))
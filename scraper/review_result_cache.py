@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import random
+import sqlite3
+import threading
+
+import numpy as np
+
+from minhash import MinHasher, LSHIndex, similarity
+from sentiment_cascade import label_accuracy
+
+
+class ReviewResultCache:
+    """
+    SQLite-backed index of analysed review texts and their aspect results. A new
+    review whose MinHash similarity to a cached review with the same star rating is
+    at least the threshold reuses that review's result, so the stock phrasings that
+    recur across products are only analysed once. Entries are evicted least-recently
+    used past max_entries; the access times of reused entries are kept in memory and
+    written by flush(), so a hit costs no commit. A random share of hits is still sent
+    to the LLM so the agreement between reused and fresh results can be measured.
+    """
+
+    MAX_PENDING = 1000
+
+    def __init__(self, path="scraper_results/review_results.sqlite", version="", threshold=0.8,
+                 max_entries=100_000, verify_rate=0.05, num_perm=64, bands=16):
+        """
+        Open (or create) the cache and load its index.
+
+        Args:
+            path (str): Path to the SQLite file.
+            version (str): Model and prompt identifier; entries of other versions are ignored.
+            threshold (float): Minimum estimated Jaccard similarity for reuse.
+            max_entries (int): Maximum cached reviews for this version.
+            verify_rate (float): Share of hits re-analysed to measure agreement.
+            num_perm (int): MinHash signature length.
+            bands (int): LSH bands.
+        """
+        self.path = path
+        self.version = version
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.verify_rate = verify_rate
+        self.hits = 0
+        self.misses = 0
+        self.verified = 0
+        self.agreement = 0.0
+        self.hasher = MinHasher(num_perm)
+        self.index = LSHIndex(num_perm, bands)
+        self._entries = {}
+        self._verifying = {}
+        self._touched = {}
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, version TEXT, star INTEGER, review_text TEXT, "
+            "result TEXT, signature BLOB, accessed REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_version ON results (version, accessed)")
+        self._db.commit()
+        rows = self._db.execute(
+            "SELECT id, star, result, signature FROM results WHERE version = ? ORDER BY accessed DESC LIMIT ?",
+            (version, max_entries)
+        ).fetchall()
+        for entry_id, star, result, signature in rows:
+            self._add_entry(entry_id, star, json.loads(result), np.frombuffer(signature, dtype=np.uint32))
+
+    def _add_entry(self, entry_id, star, result, signature):
+        self._entries[entry_id] = (star, tuple(result), signature)
+        self.index.insert(entry_id, signature)
+
+    @staticmethod
+    def _labels(pos, neg):
+        return {f"{aspect}:positive" for aspect in pos} | {f"{aspect}:negative" for aspect in neg}
+
+    def _best_match(self, star, signature):
+        best_id, best = None, 0.0
+        for entry_id in self.index.query(signature):
+            entry_star, _, entry_signature = self._entries[entry_id]
+            if entry_star != star:
+                continue
+            score = similarity(signature, entry_signature)
+            if score > best:
+                best_id, best = entry_id, score
+        return best_id, best
+
+    def lookup(self, review_text, star):
+        """
+        Return the result of a near-duplicate cached review, or None.
+
+        A sampled share of hits returns None and counts as a miss so the caller
+        analyses the review; the fresh result passed to add() is then compared with the
+        cached one, and a review that gets no result must be passed to discard().
+
+        Args:
+            review_text (str): Review text.
+            star (int): Star rating, 1 to 5.
+
+        Returns:
+            tuple or None: (positive aspects, negative aspects).
+        """
+        signature = self.hasher.signature(review_text)
+        with self._lock:
+            entry_id, score = self._best_match(star, signature)
+            if entry_id is None or score < self.threshold:
+                self.misses += 1
+                return None
+            result = self._entries[entry_id][1]
+            if len(self._verifying) < self.MAX_PENDING and random.random() < self.verify_rate:
+                self._verifying[(review_text, star)] = result
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[entry_id] = time.time()
+            return [list(aspects) for aspects in result]
+
+    def add(self, review_text, star, result):
+        """
+        Cache a freshly analysed review, then evict old entries if over max_entries.
+        Exact duplicates of a cached review are not stored twice.
+
+        Args:
+            review_text (str): Review text.
+            star (int): Star rating, 1 to 5.
+            result (tuple): (positive aspects, negative aspects) from the LLM.
+        """
+        pos, neg = result
+        signature = self.hasher.signature(review_text)
+        with self._lock:
+            cached = self._verifying.pop((review_text, star), None)
+            if cached is not None:
+                self.agreement += label_accuracy(self._labels(pos, neg), self._labels(*cached))
+                self.verified += 1
+            if self._best_match(star, signature)[1] == 1.0:
+                return
+            cursor = self._db.execute(
+                "INSERT INTO results (version, star, review_text, result, signature, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.version, star, review_text, json.dumps([list(pos), list(neg)]), signature.tobytes(),
+                 time.time())
+            )
+            self._add_entry(cursor.lastrowid, star, (list(pos), list(neg)), signature)
+            self._evict()
+            self._db.commit()
+
+    def discard(self, review_text, star):
+        """
+        Forget a pending verification for a review the LLM returned no result for.
+
+        Args:
+            review_text (str): Review text.
+            star (int): Star rating, 1 to 5.
+        """
+        with self._lock:
+            self._verifying.pop((review_text, star), None)
+
+    def flush(self):
+        """
+        Write the access times of the entries reused since the last flush, in one commit.
+        """
+        with self._lock:
+            self._write_touched()
+            self._db.commit()
+
+    def _write_touched(self):
+        if self._touched:
+            self._db.executemany("UPDATE results SET accessed = ? WHERE id = ?",
+                                 [(accessed, entry_id) for entry_id, accessed in self._touched.items()])
+            self._touched.clear()
+
+    def _evict(self):
+        excess = len(self._entries) - self.max_entries
+        if excess <= 0:
+            return
+        self._write_touched()
+        for (entry_id,) in self._db.execute(
+                "SELECT id FROM results WHERE version = ? ORDER BY accessed ASC LIMIT ?",
+                (self.version, excess)).fetchall():
+            self._db.execute("DELETE FROM results WHERE id = ?", (entry_id,))
+            self._entries.pop(entry_id, None)
+            self.index.remove(entry_id)
+
+    def stats(self):
+        """
+        Return reuse counters and the verification agreement.
+
+        Returns:
+            dict: Keys 'hits', 'misses' (including hits sampled for verification), 'verified', 'agreement' (mean per-review overlap of
+                reused and fresh results, or None before any verification) and 'entries'.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "verified": self.verified,
+                    "agreement": self.agreement / self.verified if self.verified else None,
+                    "entries": len(self._entries)}
+
+    def report(self):
+        stats = self.stats()
+        looked_up = stats["hits"] + stats["misses"]
+        agreement = f"{stats['agreement']:.1%}" if stats["agreement"] is not None else "n/a"
+        return (f"Near-duplicate cache reused {stats['hits']} of {looked_up} review results; "
+                f"agreement with the LLM on {stats['verified']} verified reuses: {agreement}.")
+
+
+def review_result_cache_from_env(version=""):
+    """
+    Build the default ReviewResultCache from environment variables, or None if disabled.
+
+    REVIEW_CACHE=0 disables reuse, REVIEW_CACHE_PATH sets the database file,
+    REVIEW_CACHE_THRESHOLD the similarity threshold, REVIEW_CACHE_MAX_ENTRIES the
+    size cap and REVIEW_CACHE_VERIFY_RATE the share of reuses that are verified.
+
+    Args:
+        version (str): Model and prompt identifier of the results.
+
+    Returns:
+        ReviewResultCache or None: The configured cache.
+    """
+    if os.getenv("REVIEW_CACHE", "1") == "0":
+        return None
+    return ReviewResultCache(
+        path=os.getenv("REVIEW_CACHE_PATH", "scraper_results/review_results.sqlite"),
+        version=version,
+        threshold=float(os.getenv("REVIEW_CACHE_THRESHOLD", 0.8)),
+        max_entries=int(os.getenv("REVIEW_CACHE_MAX_ENTRIES", 100_000)),
+        verify_rate=float(os.getenv("REVIEW_CACHE_VERIFY_RATE", 0.05)),
+    )
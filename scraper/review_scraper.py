@@ -1,13 +1,16 @@
-import requests
 import os
-import json
-import re
 import time
-from urllib.parse import urljoin, urlparse, parse_qs, urlencode, urlunparse
-from scrapy import Selector
-from bs4 import BeautifulSoup
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 from dotenv import load_dotenv
 from typing import Dict
+from async_fetcher import AsyncPageFetcher
+from scrapingbee_client import get_client
+from parse_pool import get_parse_pool
+from review_extractor import extract_histogram, parse_review_page, parse_probe_page, parse_review_date, star_key
+from pagination_planner import PaginationPlanner
+from review_store import ReviewStore
+from minhash import dedupe
+from review_index import review_id
 
 class AmazonReviewProcessor:
     """
@@ -16,7 +19,8 @@ class AmazonReviewProcessor:
     deduplication, metadata extraction, and JSON serialization.
     """
 
-    def __init__(self, api_key, brand: str, product_info: Dict[str, str], review_pages=5):
+    def __init__(self, api_key, brand: str, product_info: Dict[str, str], review_pages=5, max_concurrency=5,
+                 parse_pool=None, speculative_prefetch=False, output_dir="scraper_results", dedupe_threshold=0.8):
         """
         Initialize the processor with API key, brand, product metadata, and scrape settings.
 
@@ -24,7 +28,12 @@ class AmazonReviewProcessor:
             api_key (str): ScrapingBee API key.
             brand (str): Brand name (used for output file naming).
             product_info (Dict[str, str]): Dict with keys 'asin', 'price', 'image_url', 'product_url'.
-            review_pages (int): Number of review pages to scrape per star rating.
+            review_pages (int): Maximum number of review pages to scrape per star rating.
+            max_concurrency (int): Maximum number of page requests in flight at once.
+            parse_pool (ParsePool, optional): Pool that parses fetched pages. Defaults to the shared pool.
+            speculative_prefetch (bool): Request the next page of a star rating as soon as a page comes back short.
+            output_dir (str): Directory for this processor's output files.
+            dedupe_threshold (float): Estimated text similarity at which two reviews count as duplicates.
         """
         self.api_key = api_key
         self.brand = brand
@@ -33,7 +42,15 @@ class AmazonReviewProcessor:
         self.image_url = product_info.get("image_url")
         self.product_url = product_info.get("product_url")
         self.pages = review_pages
-        self.output_dir = "scraper_results"
+        self.speculative_prefetch = speculative_prefetch
+        self.cookies = os.getenv("AMAZON_COOKIES_3", "")
+        self.client = get_client(api_key)
+        self.fetcher = AsyncPageFetcher(
+            self.client, cookies=self.cookies, max_concurrency=max_concurrency,
+            parse_pool=parse_pool or get_parse_pool()
+        )
+        self.output_dir = output_dir
+        self.dedupe_threshold = dedupe_threshold
         self.ensure_output_dir()
 
         # Counters for summary statistics
@@ -41,24 +58,27 @@ class AmazonReviewProcessor:
         self.scraping_success = 0
         self.scraping_failed = 0
 
+        # Parsed first review page, kept for variant grouping
+        self.probe_page = None
+
     def ensure_output_dir(self):
         """
         Create the output directory if it does not already exist.
         """
         if not os.path.exists(self.output_dir):
-            os.makedirs(self.output_dir)
+            os.makedirs(self.output_dir, exist_ok=True)
             print(f"Created output directory: {self.output_dir}")
 
-    def send_request(self, page_number, base_url=None):
+    def build_review_url(self, page_number, base_url=None):
         """
-        Send a GET request to ScrapingBee to fetch a rendered Amazon review page.
+        Build the Amazon review page URL for the given page number.
 
         Args:
-            page_number (int): The review page number to fetch.
+            page_number (int): The review page number.
             base_url (str, optional): If provided, use this as the base URL for filtered reviews.
 
         Returns:
-            bytes or None: HTML content if successful, else None.
+            str: The full Amazon review page URL.
         """
         if base_url:
             # Update/add the pageNumber and common params in the provided URL.
@@ -77,67 +97,78 @@ class AmazonReviewProcessor:
         else:
             base_url = f'https://www.amazon.com/dp/product-reviews/{self.product_id}/'
             url = f'{base_url}?ie=UTF8&reviewerType=all_reviews&pageNumber={page_number}'
+        return url
+
+    def send_request(self, page_number, base_url=None):
+        """
+        Fetch a rendered Amazon review page through the shared ScrapingBee client.
 
+        Args:
+            page_number (int): The review page number to fetch.
+            base_url (str, optional): If provided, use this as the base URL for filtered reviews.
+
+        Returns:
+            bytes or None: HTML content if successful, else None.
+        """
+        url = self.build_review_url(page_number, base_url)
         print(f"At - {url}")
-        response = requests.get(
-            url='https://app.scrapingbee.com/api/v1',
-            params={
-                'api_key': self.api_key,
-                'url': url,
-                'block_resources': 'false',
-                'cookies': os.getenv("AMAZON_COOKIES_3", "")
-            },
-        )
-        print(f'URL {url} - HTTP Status Code: {response.status_code}')
-        if response.status_code == 200:
-            return response.content
-        else:
+        content = self.client.get(url, cookies=self.cookies)
+        if content is None:
             print(f"Failed to retrieve page {page_number}")
-            print(response.content)
-            return None
+        return content
 
     def scrape_reviews(self):
         """
-        Scrape the main review pages for the product and combine their HTML into a single file.
+        Fetch a single probe review page for the product and parse it in the parse pool
+        to extract the product details and star-rating histogram. The parsed page is
+        kept in probe_page.
 
         Returns:
-            str: Path to the combined HTML file containing all scraped review pages.
+            dict: Listing info with 'title', 'average_rating', 'review_count', 'histogram',
+                'histogram_reviews_to_scrape' and 'star_urls'. Empty if the probe page could
+                not be fetched or carried no histogram.
         """
-        print("Step 1: Scraping main Amazon reviews...")
-        combined_soup = BeautifulSoup(
-            '<html><head><title>Combined Amazon Reviews</title></head><body></body></html>',
-            'html.parser'
-        )
-        body = combined_soup.find('body')
-
-        for page_number in range(1, self.pages + 1):
-            print(f"\nProcessing main reviews page {page_number}...")
-            content = self.send_request(page_number)
-            if content:
-                divider = combined_soup.new_tag('div')
-                divider.attrs['style'] = 'margin: 20px 0; padding: 10px; background-color: #f0f0f0; border-top: 2px solid #ccc;'
-                divider.string = f'--- Main Page {page_number} ---'
-                body.append(divider)
-                page_soup = BeautifulSoup(content, 'html.parser')
-                body.append(page_soup.body or page_soup)
-                self.scraping_success += 1
-            else:
+        print("Step 1: Fetching probe review page for histogram and metadata...")
+        listing = {}
+
+        def on_page(page_number, page):
+            if not page:
                 self.scraping_failed += 1
-            if page_number < self.pages:
-                time.sleep(2)
+                return
+            self.scraping_success += 1
+            self.probe_page = page
+            histogram, histogram_reviews_to_scrape = self.quotas_from_histogram(page["histogram"])
+            if histogram:
+                listing.update(
+                    page["details"],
+                    histogram=histogram,
+                    histogram_reviews_to_scrape=histogram_reviews_to_scrape,
+                    star_urls=page["star_urls"]
+                )
+
+        self.fetcher.run([(1, self.build_review_url(1))], on_page, parse=parse_probe_page)
+        return listing
 
-        html_path = os.path.join(self.output_dir, "all_reviews.html")
-        with open(html_path, 'w', encoding='utf-8') as f:
-            f.write(str(combined_soup))
-        return html_path
-    
     def compute_quotas(self, sel):
         """
         Extracts the star-rating histogram from the parsed Selector and computes
         the number of reviews to sample for each star level.
 
         Args:
-            sel (scrapy.Selector): Selector object for the HTML content.
+            sel (parsel.Selector): Selector object for the HTML content.
+
+        Returns:
+            tuple: (histogram, histogram_reviews_to_scrape), see quotas_from_histogram().
+        """
+        return self.quotas_from_histogram(extract_histogram(sel))
+
+    def quotas_from_histogram(self, percentages):
+        """
+        Computes the number of reviews to sample for each star level from the
+        histogram percentages extracted off a review page.
+
+        Args:
+            percentages (dict): Star key to percentage string (e.g., '5_star': '66').
 
         Returns:
             tuple: (histogram, histogram_reviews_to_scrape)
@@ -146,23 +177,18 @@ class AmazonReviewProcessor:
         """
         histogram = {}
         histogram_reviews_to_scrape = {}
-        for li in sel.css("ul#histogramTable li"):
-            aria_label = li.css("a::attr(aria-label)").get()
-            if aria_label:
-                match = re.search(r"(\d+)\s+stars represent (\d+)%", aria_label)
-                if match:
-                    star = match.group(1)
-                    percent = match.group(2)  # string percent (e.g., "64")
-                    reviews_to_scrape = round(float(percent) / 10)  # Example: 66% → 7
-                    key = f"{star}_star"
-                    histogram[key] = f"{percent}%"
-                    histogram_reviews_to_scrape[key] = reviews_to_scrape
+        for key, percent in percentages.items():
+            reviews_to_scrape = round(float(percent) / 10)  # Example: 66% → 7
+            histogram[key] = f"{percent}%"
+            histogram_reviews_to_scrape[key] = reviews_to_scrape
         return histogram, histogram_reviews_to_scrape
     
 
     def dedupe_reviews(self, reviews):
         """
-        Remove duplicate reviews based on review text content.
+        Remove reviews seen twice under the same review ID, then near-duplicate reviews
+        based on review text content: formatting variants, light edits and truncated
+        copies of a review are dropped in favour of its longest version.
 
         Args:
             reviews (list): List of review dictionaries, each with a 'review_text' key.
@@ -170,150 +196,280 @@ class AmazonReviewProcessor:
         Returns:
             list: List of unique review dictionaries.
         """
-        unique_reviews = []
-        seen_texts = set()
+        seen = set()
+        unique = []
         for review in reviews:
-            if review["review_text"] not in seen_texts:
-                seen_texts.add(review["review_text"])
-                unique_reviews.append(review)
-        return unique_reviews
+            rid = review_id(review)
+            if rid not in seen:
+                seen.add(rid)
+                unique.append(review)
+        reviews = unique
+        keep = dedupe([review["review_text"] for review in reviews], threshold=self.dedupe_threshold)
+        return [reviews[i] for i in keep]
     
 
     def to_json(self, product_data):
         """
-        Serialize a product's review and metadata dictionary to the brand's JSON file.
-        Appends to the file if it exists, otherwise creates a new file.
+        Upsert a product's review and metadata dictionary into the brand's review store.
+        The store is append-only JSONL keyed by product_id, so each write is a single append.
 
         Args:
             product_data (dict): Dictionary containing product metadata and reviews.
 
         Returns:
-            str: Path to the output JSON file.
-        """
-        json_path = os.path.join(self.output_dir, f"{self.brand}_reviews.json")
-        # Load existing data if file exists, else start a new list
-        if os.path.exists(json_path):
-            with open(json_path, "r", encoding="utf-8") as infile:
-                try:
-                    existing_data = json.load(infile)
-                    if not isinstance(existing_data, list):
-                        existing_data = [existing_data]
-                except json.JSONDecodeError:
-                    existing_data = []
+            str: Path to the brand's review store.
+        """
+        store = ReviewStore(os.path.join(self.output_dir, f"{self.brand}_reviews.jsonl"))
+        if store.upsert(product_data):
+            print(f"Saved product data to {store.path}")
         else:
-            existing_data = []
-        existing_data.append(product_data)
-        with open(json_path, "w", encoding="utf-8") as outfile:
-            json.dump(existing_data, outfile, ensure_ascii=False, indent=4)
-        print(f"Saved product data to {json_path}")
-        return json_path
+            print(f"No product data to save for {self.product_id}")
+        return store.path
 
 
-    def parse_reviews(self, html_path):
+    def parse_reviews(self, listing):
         """
-        Parse reviews from the combined HTML, then for each star rating,
-        scrape additional filtered reviews and merge all unique reviews.
+        Fetch the star-filtered review pages chosen by the PaginationPlanner concurrently,
+        extracting reviews from each page as it arrives, then merge all unique reviews.
 
         Args:
-            html_path (str): Path to the combined review HTML file.
+            listing (dict): Listing info returned by scrape_reviews().
 
         Returns:
-            str: Path to the output JSON file containing all structured review data.
+            str: Path to the review store containing all structured review data.
         """
-        print("\nStep 2: Parsing reviews from HTML...")
-        with open(html_path, "r", encoding="utf-8") as file:
-            html = file.read()
-        sel = Selector(text=html)
+        print("\nStep 2: Parsing star-filtered reviews...")
         try:
-            # --- Extract star-rating histogram and compute per-star quotas ---
-            histogram, histogram_reviews_to_scrape = self.compute_quotas(sel)
+            if not listing:
+                raise ValueError("no review page with a star histogram was retrieved")
+            histogram = listing["histogram"]
+            histogram_reviews_to_scrape = listing["histogram_reviews_to_scrape"]
             print("Calculated reviews to scrape per star:", histogram_reviews_to_scrape)
 
-            # --- For each star rating, scrape additional reviews using pagination ---
-            additional_reviews = []
+            # --- Resolve the filtered base URL for each star rating from histogram info ---
+            star_urls = {}
             for star, count_needed in histogram_reviews_to_scrape.items():
-                # Retrieve the base URL for this star rating from histogram info.
-                star_url = None
-                for li in sel.css("ul#histogramTable li"):
-                    aria_label = li.css("a::attr(aria-label)").get()
-                    if aria_label and star.startswith(aria_label.split()[0]):  # e.g., "5" for "5_star"
-                        href = li.css("a::attr(href)").get()
-                        if href:
-                            star_url = urljoin("https://www.amazon.com", href)
-                            break
-
+                star_url = listing["star_urls"].get(star)
                 print(f"\nScraping up to {count_needed} reviews for {star} rating from base URL: {star_url}\n")
                 if star_url and count_needed > 0:
-                    star_reviews = []
-                    for page in range(1, self.pages + 1):
-                        page_content = self.send_request(page, base_url=star_url)
-                        if page_content:
-                            page_soup = BeautifulSoup(page_content, 'html.parser')
-                            review_elements = page_soup.select("li[data-hook='review']")
-                            for rev in review_elements:
-                                review_text_tag = rev.select_one("span[data-hook='review-body'] span")
-                                reviewer_name_tag = rev.select_one("a.a-profile > div.a-profile-content > span.a-profile-name")
-                                star_rating_tag = rev.select_one("i[data-hook='review-star-rating'] span.a-icon-alt")
-                                review_date_tag = rev.select_one("span[data-hook='review-date']")
-
-                                # Extract review fields
-                                if review_text_tag:
-                                    review_text = review_text_tag.get_text(strip=True)
-                                    reviewer_name = reviewer_name_tag.get_text(strip=True) if reviewer_name_tag else ""
-                                    star_rating = star_rating_tag.get_text(strip=True) if star_rating_tag else ""
-                                    review_date = review_date_tag.get_text(strip=True) if review_date_tag else ""
-                                    star_reviews.append({
-                                        "reviewer_name": reviewer_name,
-                                        "star_rating": star_rating,
-                                        "review_date": review_date,
-                                        "review_text": review_text
-                                    })
-                                if len(star_reviews) >= count_needed:
-                                    break
-                        else:
-                            print(f"Failed to retrieve page {page} for {star} reviews.")
-                        if len(star_reviews) >= count_needed:
-                            break
-                        time.sleep(1)
-                    print(f"Collected {len(star_reviews)} reviews for {star} rating.")
-                    additional_reviews.extend(star_reviews)
+                    star_urls[star] = star_url
                 else:
                     print(f"No reviews to scrape for {star} rating.")
 
+            # --- Request exactly the planned pages of every star rating concurrently ---
+            planner = PaginationPlanner(
+                {star: histogram_reviews_to_scrape[star] for star in star_urls},
+                max_pages=self.pages,
+                speculative=self.speculative_prefetch
+            )
+            star_pages = {star: {} for star in star_urls}
+
+            def to_request(star, page):
+                return (star, page), self.build_review_url(page, base_url=star_urls[star])
+
+            def on_page(key, parsed_page):
+                star, page = key
+                if parsed_page:
+                    self.scraping_success += 1
+                    star_pages[star][page] = parsed_page["reviews"]
+                    page_reviews = len(parsed_page["reviews"])
+                else:
+                    self.scraping_failed += 1
+                    print(f"Failed to retrieve page {page} for {star} reviews.")
+                    page_reviews = None
+                collected = sum(len(reviews) for reviews in star_pages[star].values())
+                return [to_request(*follow_up)
+                        for follow_up in planner.on_page(star, page, collected, page_reviews)]
+
+            self.fetcher.run(
+                [to_request(star, page) for star, page in planner.initial_pages()],
+                on_page,
+                parse=parse_review_page
+            )
+            print(f"Requested {planner.pages_requested()} star-filtered pages.")
+
+            # Merge in histogram and page order so output does not depend on arrival order
+            additional_reviews = []
+            for star in histogram_reviews_to_scrape:
+                pages = star_pages.get(star, {})
+                star_reviews = [review for page in sorted(pages) for review in pages[page]]
+                star_reviews = star_reviews[:histogram_reviews_to_scrape[star]]
+                print(f"Collected {len(star_reviews)} reviews for {star} rating.")
+                additional_reviews.extend(star_reviews)
+
             # --- Remove duplicate reviews ---
             combined_reviews = self.dedupe_reviews(additional_reviews)
             self.total_reviews_scraped = len(combined_reviews)
 
-            # --- Extract additional product details ---
-            title = sel.css("h1.product-info-title a::text").get()
-            average_rating = sel.css("i[data-hook='average-star-rating'] span.a-icon-alt::text").get()
-            review_count = sel.css("div[data-hook='total-review-count'] span::text").get()
-
             # --- Merge all data into a product_data dictionary ---
-            product_data = {
-                "title": title,
-                "product_id": self.product_id,
-                "price": self.price,
-                "image_url": self.image_url,
-                "product_url": self.product_url,
-                "average_rating": average_rating,
-                "review_count": review_count,
-                "histogram": histogram,
-                "histogram_reviews_to_scrape": histogram_reviews_to_scrape,
-                "review": combined_reviews
-            }
+            product_data = self.product_record(listing, combined_reviews)
 
         except Exception as e:
             print(f"Error while scraping: {e}")
             self.scraping_failed += 1
             product_data = {}   # Empty product data in case of error
 
-        # Save the product data into a JSON file (accumulating if file exists)
+        # Save the product data into the brand's review store
         json_path = self.to_json(product_data)
         print(f"\nParsed and combined {self.total_reviews_scraped} unique star-filtered reviews into {json_path}")
         return json_path
 
 
+    def refresh_reviews(self, stored_product, known=None):
+        """
+        Fetch only the reviews posted since the product was last scraped: review pages
+        sorted by most recent are requested one at a time, bypassing the response
+        cache, until a page reaches a review older than the newest stored one. The
+        stored reviews are a per-star sample, so reviews already stored or in the index
+        are skipped rather than ending the refresh; only when stored reviews carry no
+        readable date does the first known review stop it. The new reviews are
+        deduplicated and put in front of the stored ones, each star is trimmed back to
+        its quota from the refreshed histogram, the listing info is updated from the
+        first page and the product is saved to the review store.
+
+        Args:
+            stored_product (dict): The product's record in the brand's review store.
+            known (container, optional): Further review IDs to skip, e.g. a ReviewIndex.
+
+        Returns:
+            list: The new reviews kept, newest first. Empty if none were found or the first page failed.
+        """
+        print(f"Refreshing {self.product_id} with its most recent reviews...")
+        stored_reviews = stored_product.get("review", [])
+        stored_ids = {review_id(review) for review in stored_reviews}
+        # Reviews stored before they had Amazon IDs are recognised by their text
+        stored_texts = {review.get("review_text") for review in stored_reviews}
+        stored_dates = [date for date in (parse_review_date(review.get("review_date")) for review in stored_reviews)
+                        if date is not None]
+        newest = max(stored_dates) if stored_dates else None
+        recent_url = f'https://www.amazon.com/product-reviews/{self.product_id}/?sortBy=recent'
+        listing = {}
+        pages = {}
+
+        def is_known(review):
+            rid = review_id(review)
+            return rid in stored_ids or review.get("review_text") in stored_texts or \
+                (known is not None and rid in known)
+
+        def on_page(page_number, page):
+            if not page:
+                self.scraping_failed += 1
+                print(f"Failed to retrieve recent reviews page {page_number}; stopping the refresh.")
+                return None
+            self.scraping_success += 1
+            if page_number == 1:
+                listing.update(page["details"], histogram=page["histogram"])
+            new_reviews = []
+            reached_stored = False
+            for review in page["reviews"]:
+                date = parse_review_date(review.get("review_date"))
+                if newest is not None and date is not None and date < newest:
+                    reached_stored = True
+                    break
+                if is_known(review):
+                    if newest is None:
+                        reached_stored = True
+                        break
+                    continue
+                new_reviews.append(review)
+            pages[page_number] = new_reviews
+            if reached_stored or not page["reviews"] or page_number >= self.pages:
+                return None
+            return [(page_number + 1, self.build_review_url(page_number + 1, base_url=recent_url))]
+
+        self.fetcher.run([(1, self.build_review_url(1, base_url=recent_url))], on_page,
+                         parse=parse_review_page, fresh=True)
+        new_reviews = self.dedupe_reviews([review for page in sorted(pages) for review in pages[page]])
+        if not listing:
+            self.total_reviews_scraped = 0
+            return []
+
+        product_data = dict(stored_product)
+        for key in ("average_rating", "review_count"):
+            if listing.get(key):
+                product_data[key] = listing[key]
+        if listing["histogram"]:
+            product_data["histogram"], product_data["histogram_reviews_to_scrape"] = \
+                self.quotas_from_histogram(listing["histogram"])
+        product_data["review"] = self.sample_reviews(new_reviews + stored_reviews,
+                                                     product_data.get("histogram_reviews_to_scrape"))
+        kept = {id(review) for review in product_data["review"]}
+        new_reviews = [review for review in new_reviews if id(review) in kept]
+        self.total_reviews_scraped = len(new_reviews)
+        self.to_json(product_data)
+        print(f"Found {len(new_reviews)} new reviews for {self.product_id}.")
+        return new_reviews
+
+    @staticmethod
+    def sample_reviews(reviews, quotas):
+        """
+        Keep at most each star level's quota of reviews, taking them in order, so a
+        refreshed product keeps the star distribution of a full scrape.
+
+        Args:
+            reviews (list): Review dictionaries, preferred ones first.
+            quotas (dict, optional): Star key to review quota (e.g., '5_star': 7). Reviews
+                are kept unchanged when there are no quotas.
+
+        Returns:
+            list: The kept reviews, in their original order.
+        """
+        if not quotas:
+            return list(reviews)
+        counts = {}
+        sampled = []
+        for review in reviews:
+            key = star_key(review.get("star_rating"))
+            if key in quotas:
+                if counts.get(key, 0) >= quotas[key]:
+                    continue
+                counts[key] = counts.get(key, 0) + 1
+            sampled.append(review)
+        return sampled
+
+    def product_record(self, listing, reviews):
+        """
+        Combine this product's metadata, its listing info and a list of reviews.
+
+        Args:
+            listing (dict): Listing info returned by scrape_reviews().
+            reviews (list): Review dictionaries.
+
+        Returns:
+            dict: Product data as stored in the brand's review store.
+        """
+        return {
+            "title": listing["title"],
+            "product_id": self.product_id,
+            "price": self.price,
+            "image_url": self.image_url,
+            "product_url": self.product_url,
+            "average_rating": listing["average_rating"],
+            "review_count": listing["review_count"],
+            "histogram": listing["histogram"],
+            "histogram_reviews_to_scrape": listing["histogram_reviews_to_scrape"],
+            "review": reviews
+        }
+
+    def save_variant(self, listing, scraped_product):
+        """
+        Save this product as a variant of an already scraped product sharing its review
+        pool: the listing info is this product's own, the reviews are the scraped ones.
+
+        Args:
+            listing (dict): Listing info returned by scrape_reviews() for this product.
+            scraped_product (dict): Stored product data of the scraped variant.
+
+        Returns:
+            str: Path to the review store.
+        """
+        product_data = {}
+        if listing and scraped_product:
+            product_data = dict(self.product_record(listing, scraped_product["review"]),
+                                variant_of=scraped_product["product_id"])
+            self.total_reviews_scraped = len(product_data["review"])
+        return self.to_json(product_data)
+
     def cleanup_files(self):
         """
         Delete the temporary files all_reviews.html and product_clean.json.
@@ -326,16 +482,21 @@ class AmazonReviewProcessor:
                 os.remove(file_path)
                 print(f"Deleted {file_path}")
 
-    def process(self):
+    def process(self, listing=None):
         """
         Main method to run the complete review scraping and processing workflow:
-        - Scrapes main review pages,
-        - Parses and samples reviews by star rating,
+        - Fetches a probe review page for the histogram and metadata, unless the
+          listing from an earlier scrape_reviews() call is passed in,
+        - Fetches the planned star-filtered pages and samples reviews by star rating,
         - Deduplicates and merges,
         - Serializes results to JSON,
         - Cleans up temporary files.
         """
         start_time = time.time()
+        if listing is None:
+            listing = self.scrape_reviews()
+        self.parse_reviews(listing)
+
         print("\n" + "="*50)
         print("PROCESS COMPLETE - SUMMARY")
         print("="*50)
@@ -1,7 +1,15 @@
 from openai_handler import OpenAIHandler
+from review_store import ReviewStore
+from pipeline_manifest import hash_inputs
+from review_batcher import pack_reviews
+from llm_batch import BatchRunner, request_line
+from aspect_lexicon import get_lexicon, lexicon_version
+from review_index import review_id
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import json
 import os
+import threading
 
 load_dotenv()
 
@@ -27,78 +35,544 @@ SENTIMENT_PROMPT = """
     Return only the JSON object containing these keys and their corresponding arrays. If no aspect terms are found for a particular key, output an empty list for that key. **Do not** include any additional commentary or explanations.
 """
 
+BATCH_SENTIMENT_PROMPT = """
+    You are an aspect-based sentiment analysis engine. You will be given a JSON array of laptop reviews. Each review object contains an "id", a "star_rating" (for example, "5.0 out of 5 stars") and a "review_text". Your task is to analyze each review independently and extract aspect terms from the review text based on its sentiment. Only use the following allowed aspect terms:
+
+   AUDIO, BATTERY, BUILD_QUALITY, DESIGN, DISPLAY, PERFORMANCE, PORTABILITY, PRICE
+
+    For each review, if the review is positive (indicated by its star rating), extract the positive aspect terms mentioned in the review that match the allowed list. If the review is negative, extract the negative aspect terms. Some reviews may contain mixed sentiments; in that case, only include aspect terms clearly expressed with a positive sentiment in the positive list and vice versa.
+
+    Return only a JSON object of the form {"results": [{"id": <review id>, "pos_aspects": [...], "neg_aspects": [...]}]} with exactly one result per review, using the review's "id" unchanged. If no aspect terms are found, output an empty list. **Do not** include any additional commentary or explanations.
+"""
+
+ALLOWED_ASPECTS = {
+    "AUDIO", "BATTERY", "BUILD_QUALITY", "DESIGN", "DISPLAY", "PERFORMANCE", "PORTABILITY", "PRICE"
+}
+
+
+def star_of(star_rating):
+    """
+    Return the whole-star rating of a review, e.g. 5 for "5.0 out of 5 stars".
+
+    Args:
+        star_rating (str): Star rating text from the review page.
+
+    Returns:
+        int or None: Star rating from 1 to 5, or None if it cannot be read.
+    """
+    try:
+        star = int(float(star_rating.split()[0]))
+    except (ValueError, IndexError, AttributeError):
+        return None
+    return star if 1 <= star <= 5 else None
+
+
 class SentimentGenerator:
-    def run(self, brand: str):
-        path_to_product_json = f'./scraper_results/{brand}_processed_reviews.json'
+    def __init__(self, batch_tokens=3000, max_batch_size=25, max_workers=16, prefilter=True, cascade=None,
+                 result_cache=None):
+        """
+        Initialize the generator.
+
+        Args:
+            batch_tokens (int): Approximate token budget for the reviews packed into one request.
+            max_batch_size (int): Maximum reviews packed into one request.
+            max_workers (int): Laptops analysed concurrently by run().
+            prefilter (bool): Skip the LLM for reviews with no aspect term in the local lexicon.
+            cascade (SentimentCascade, optional): Local 'aspect' classifier that answers the
+                reviews it is confident about; only the rest are sent to the LLM.
+            result_cache (ReviewResultCache, optional): Index of analysed review texts whose
+                results are reused for near-duplicate reviews.
+        """
+        self.batch_tokens = batch_tokens
+        self.max_batch_size = max_batch_size
+        self.max_workers = max_workers
+        self.prefilter = prefilter
+        self.cascade = cascade
+        self.result_cache = result_cache
+        self.reviews_seen = 0
+        self.reviews_skipped = 0
+        self._stats_lock = threading.Lock()
+
+    def filter_reviews(self, items):
+        """
+        Answer the reviews that need no LLM call: those without any candidate aspect
+        get empty results, near-duplicates of analysed reviews reuse their results, and
+        the local classifier answers those it is confident about.
+
+        Args:
+            items (list): Review items with 'id', 'star_rating' and 'review_text'.
+
+        Returns:
+            tuple: (items that still need the LLM, review id to results for the rest).
+        """
+        kept, answered = items, {}
+        if self.prefilter:
+            lexicon = get_lexicon()
+            kept = [item for item in items if lexicon.has_aspect(item["review_text"])]
+            kept_ids = {item["id"] for item in kept}
+            answered = {item["id"]: ([], []) for item in items if item["id"] not in kept_ids}
+            with self._stats_lock:
+                self.reviews_seen += len(items)
+                self.reviews_skipped += len(answered)
+        if self.result_cache and kept:
+            uncached = []
+            for item in kept:
+                cached = self.result_cache.lookup(item["review_text"], star_of(item["star_rating"]))
+                if cached is None:
+                    uncached.append(item)
+                else:
+                    answered[item["id"]] = tuple(cached)
+            kept = uncached
+        if self.cascade and kept:
+            escalated = []
+            for item, labels in zip(kept, self.cascade.answer([item["review_text"] for item in kept])):
+                if labels is None:
+                    escalated.append(item)
+                    continue
+                polarities = [label.split(":") for label in sorted(labels)]
+                answered[item["id"]] = ([aspect for aspect, polarity in polarities if polarity == "positive"],
+                                        [aspect for aspect, polarity in polarities if polarity == "negative"])
+            kept = escalated
+        return kept, answered
+
+    def remember_results(self, items, results):
+        """
+        Add LLM results to the near-duplicate cache, if one is configured, drop
+        pending verifications of reviews the LLM returned no result for and write the
+        access times of the reused results.
+
+        Args:
+            items (list): Review items that were sent to the LLM.
+            results (dict): Review id to (positive aspects, negative aspects).
+        """
+        if not self.result_cache:
+            return
+        for item in items:
+            if item["id"] in results:
+                self.result_cache.add(item["review_text"], star_of(item["star_rating"]), results[item["id"]])
+            else:
+                self.result_cache.discard(item["review_text"], star_of(item["star_rating"]))
+        self.result_cache.flush()
+
+    @staticmethod
+    def results_version():
+        """
+        Identify the model and prompts behind review results, for keying cached results.
+        """
+        return hash_inputs(OpenAIHandler.DEFAULT_MODEL, BATCH_SENTIMENT_PROMPT, SENTIMENT_PROMPT)[:12]
+
+    def skip_rate(self):
+        """
+        Return the share of reviews answered by the lexicon without an LLM call.
+        """
+        with self._stats_lock:
+            return self.reviews_skipped / self.reviews_seen if self.reviews_seen else 0.0
+
+    def _get_responses(self, sysprompt, prompts):
+        # A request that fails after the pool's retries reads as an empty response, so its
+        # reviews are split and retried instead of failing the whole product
+        responses = []
+        for response in OpenAIHandler(sysprompt).get_responses(prompts, return_exceptions=True):
+            if isinstance(response, Exception):
+                print(f"Sentiment request failed: {response}")
+                response = None
+            responses.append(response)
+        return responses
+
+    def parse_batch_response(self, batch, response):
+        """
+        Map a batch response back to its reviews.
+
+        Args:
+            batch (list): Review items with 'id', 'star_rating' and 'review_text'.
+            response (str): Raw model response for the batch.
+
+        Returns:
+            dict: Review id to (positive aspects, negative aspects) for every review
+                  the model returned a well-formed result for.
+        """
+        if response is None:
+            return {}
+        try:
+            results = json.loads(response).get("results", [])
+        except (json.JSONDecodeError, AttributeError):
+            print("Failed to decode JSON response from OpenAI for this batch.")
+            return {}
+
+        expected = {item["id"] for item in batch}
+        parsed = {}
+        for result in results if isinstance(results, list) else []:
+            if not isinstance(result, dict) or result.get("id") not in expected:
+                continue
+            pos, neg = result.get("pos_aspects"), result.get("neg_aspects")
+            if not isinstance(pos, list) or not isinstance(neg, list):
+                continue
+            parsed[result["id"]] = (
+                [aspect for aspect in pos if aspect in ALLOWED_ASPECTS],
+                [aspect for aspect in neg if aspect in ALLOWED_ASPECTS],
+            )
+        return parsed
+
+    def parse_single_response(self, item, response):
+        """
+        Read the one-review prompt's response for a review that kept failing in batches.
+
+        Args:
+            item (dict): Review item with 'star_rating' and 'review_text'.
+            response (str): Raw model response.
+
+        Returns:
+            tuple or None: (positive aspects, negative aspects), or None on failure.
+        """
+        try:
+            response_json = json.loads(response)
+        except (TypeError, json.JSONDecodeError):
+            print("Failed to decode JSON response from OpenAI for this review.")
+            return None
+        if not isinstance(response_json, dict):
+            print("Unexpected JSON response from OpenAI for this review.")
+            return None
+        star = star_of(item["star_rating"])
+        pos, neg = response_json.get(f"pos_{star}_aspects"), response_json.get(f"neg_{star}_aspects")
+        return ([aspect for aspect in pos if aspect in ALLOWED_ASPECTS] if isinstance(pos, list) else [],
+                [aspect for aspect in neg if aspect in ALLOWED_ASPECTS] if isinstance(neg, list) else [])
+
+    def analyse_reviews(self, items):
+        """
+        Analyse review items in token-budgeted batches sent concurrently. Reviews
+        missing from a batch's results are split in half and retried in the next
+        round; single reviews that still fail fall back to the one-review prompt.
+
+        Args:
+            items (list): Review items with 'id', 'star_rating' and 'review_text'.
+
+        Returns:
+            dict: Review id to (positive aspects, negative aspects).
+        """
+        results = {}
+        pending = pack_reviews(items, self.batch_tokens, self.max_batch_size)
+        while pending:
+            responses = self._get_responses(BATCH_SENTIMENT_PROMPT, [json.dumps(batch) for batch in pending])
+            retry, fallback = [], []
+            for batch, response in zip(pending, responses):
+                results.update(self.parse_batch_response(batch, response))
+                failed = [item for item in batch if item["id"] not in results]
+                if not failed:
+                    continue
+                if len(batch) == 1:
+                    fallback.extend(failed)
+                    continue
+                print(f"Retrying {len(failed)} of {len(batch)} reviews missing from a batch response.")
+                middle = (len(failed) + 1) // 2
+                retry.extend(part for part in (failed[:middle], failed[middle:]) if part)
+
+            if fallback:
+                review_inputs = [json.dumps([{
+                    "star_rating": item["star_rating"],
+                    "review_text": item["review_text"]
+                }]) for item in fallback]
+                for item, response in zip(fallback, self._get_responses(SENTIMENT_PROMPT, review_inputs)):
+                    single = self.parse_single_response(item, response)
+                    if single is not None:
+                        results[item["id"]] = single
+            pending = retry
+        return results
+
+    def analyse_product(self, laptop):
+        """
+        Extract aspect sentiments from every review of one laptop.
+
+        Args:
+            laptop (dict): Product record with a 'review' list.
+
+        Returns:
+            dict: Aggregated aspect lists keyed 'pos_5_aspects' ... 'neg_1_aspects'.
+        """
+        items = self.review_items(laptop)
+        kept, results = self.filter_reviews(items)
+        analysed = {}
+        try:
+            analysed = self.analyse_reviews(kept)
+        finally:
+            # Also runs when the analysis raises, so no verification sample is left pending
+            self.remember_results(kept, analysed)
+        results.update(analysed)
+        return self.aggregate(items, results)
+
+    def review_items(self, laptop):
+        """
+        Number a laptop's usable reviews for analysis.
+
+        Args:
+            laptop (dict): Product record with a 'review' list.
+
+        Returns:
+            list: Review items with 'id', 'star_rating' and 'review_text'.
+        """
+        items = []
+        for review in laptop.get("review", []):
+            star_rating = review.get("star_rating", "")
+            review_text = review.get("review_text", "")
+            if star_rating and review_text and star_of(star_rating):
+                items.append({"id": len(items), "star_rating": star_rating, "review_text": review_text})
+        return items
+
+    def aggregate(self, items, results):
+        """
+        Merge per-review aspects into a laptop's per-star aspect lists.
+
+        Args:
+            items (list): Review items from review_items().
+            results (dict): Review id to (positive aspects, negative aspects).
+
+        Returns:
+            dict: Aggregated aspect lists keyed 'pos_5_aspects' ... 'neg_1_aspects'.
+        """
+        # Initialize the aggregated sentiments dictionary for this laptop
+        aggregated_sentiments = {
+            "pos_5_aspects": [],
+            "neg_5_aspects": [],
+            "pos_4_aspects": [],
+            "neg_4_aspects": [],
+            "pos_3_aspects": [],
+            "neg_3_aspects": [],
+            "pos_2_aspects": [],
+            "neg_2_aspects": [],
+            "pos_1_aspects": [],
+            "neg_1_aspects": []
+        }
+
+        # Merge each review's aspects in review order under its star rating
+        for item in items:
+            if item["id"] not in results:
+                continue
+            pos, neg = results[item["id"]]
+            star = star_of(item["star_rating"])
+            aggregated_sentiments[f"pos_{star}_aspects"].extend(pos)
+            aggregated_sentiments[f"neg_{star}_aspects"].extend(neg)
+        return aggregated_sentiments
+
+    def input_hash(self, laptop):
+        """
+        Hash everything that determines a laptop's sentiment output.
+
+        Args:
+            laptop (dict): Product record with a 'review' list.
+
+        Returns:
+            str: Digest used by the pipeline manifest.
+        """
+        reviews = [(review.get("star_rating", ""), review.get("review_text", ""))
+                   for review in laptop.get("review", [])]
+        parts = [OpenAIHandler.DEFAULT_MODEL, BATCH_SENTIMENT_PROMPT, reviews,
+                 lexicon_version() if self.prefilter else None]
+        if self.cascade:
+            parts.append(self.cascade.version())
+        if self.result_cache:
+            parts.append(["near-duplicate results", self.result_cache.threshold])
+        return hash_inputs(*parts)
+
+    def settings_hash(self):
+        """
+        Hash the model, prompt and filters a laptop's sentiments depend on, apart from its reviews.
+        """
+        return self.input_hash({"review": []})
+
+    def plan_update(self, laptop, previous, entry):
+        """
+        Decide whether a laptop's previous sentiments can be extended instead of recomputed.
+
+        Args:
+            laptop (dict): Product record with a 'review' list.
+            previous (dict or None): The laptop's previous record in the sentiment store.
+            entry (dict or None): The laptop's latest manifest entry for 'sentiment'.
+
+        Returns:
+            list or None: The reviews not yet analysed, or None if every review must be analysed.
+        """
+        if not previous or previous.get("review_sentiments") is None or not entry or entry.get("status") != "done":
+            return None
+        covered = entry.get("review_ids")
+        if covered is None or entry.get("settings_hash") != self.settings_hash():
+            return None
+        reviews = laptop.get("review", [])
+        covered = set(covered)
+        if not {review_id(review) for review in reviews} >= covered:
+            return None  # reviews were removed, so their aspects would have to be taken out
+        return [review for review in reviews if review_id(review) not in covered]
+
+    @staticmethod
+    def merge_aggregates(previous, added):
+        """
+        Append the aspects of newly analysed reviews to a laptop's per-star aspect lists.
+        """
+        return {key: list(previous.get(key, [])) + aspects for key, aspects in added.items()}
+
+    def process_product(self, laptop, sentiment_store, manifest=None):
+        """
+        Add aspect sentiments to one laptop and upsert it into the sentiment store,
+        reusing previous sentiments when the manifest shows its inputs are unchanged.
+        When the only change is new reviews, just those are analysed and their aspects
+        appended to the previous sentiments.
+
+        Args:
+            laptop (dict): Summarised product record with a 'review' list.
+            sentiment_store (ReviewStore): Store of final analysed products.
+            manifest (PipelineManifest, optional): Manifest used to skip unchanged work.
+
+        Returns:
+            dict or None: The analysed laptop, or None if the analysis failed.
+        """
+        input_hash = self.input_hash(laptop)
+        if self.reuse_previous(laptop, input_hash, sentiment_store, manifest):
+            return laptop
+
+        product_id = laptop.get("product_id")
+        previous = sentiment_store.get(product_id)
+        entry = manifest.get("sentiment", product_id) if manifest else None
+        new_reviews = self.plan_update(laptop, previous, entry)
+        try:
+            if new_reviews is not None:
+                print(f"Adding the sentiments of {len(new_reviews)} new reviews to {product_id}.")
+                aggregated_sentiments = self.merge_aggregates(
+                    previous["review_sentiments"], self.analyse_product({"review": new_reviews}))
+            else:
+                aggregated_sentiments = self.analyse_product(laptop)
+        except Exception as e:
+            print(f"Failed to analyse sentiments for {laptop.get('product_id')}: {e}")
+            if manifest:
+                manifest.mark_failed("sentiment", laptop.get("product_id"), input_hash, e)
+            return None
+        return self.save_product(laptop, aggregated_sentiments, input_hash, sentiment_store, manifest)
+
+    def reuse_previous(self, laptop, input_hash, sentiment_store, manifest=None):
+        """
+        Copy a laptop's previous sentiments if the manifest shows its inputs are unchanged.
+
+        Returns:
+            bool: True if the previous sentiments were reused.
+        """
+        product_id = laptop.get("product_id")
+        previous = sentiment_store.get(product_id)
+        if not (manifest and previous and manifest.is_done("sentiment", product_id, input_hash)):
+            return False
+        laptop["review_sentiments"] = previous.get("review_sentiments")
+        if laptop != previous:
+            sentiment_store.upsert(laptop)
+        print(f"Sentiments for {product_id} are up to date; skipping.")
+        return True
+
+    def save_product(self, laptop, aggregated_sentiments, input_hash, sentiment_store, manifest=None,
+                     settings_hash=None):
+        """
+        Attach aggregated sentiments to a laptop, store it and record it in the manifest.
+        settings_hash overrides settings_hash() for sentiments produced another way, such
+        as by the fused stage, so plan_update() does not extend them as its own.
+
+        Returns:
+            dict: The analysed laptop.
+        """
+        # Append the aggregated sentiments to the current laptop dict under "review_sentiments"
+        laptop["review_sentiments"] = aggregated_sentiments
+        sentiment_store.upsert(laptop)
+        if manifest:
+            # Record which reviews the sentiments cover so later runs can extend them
+            manifest.mark("sentiment", laptop.get("product_id"), input_hash, output=sentiment_store.path,
+                          review_ids=sorted({review_id(review) for review in laptop.get("review", [])}),
+                          settings_hash=settings_hash or self.settings_hash())
+        return laptop
+
+    def run_batch(self, laptops, sentiment_store, manifest=None, backend=None, work_dir=None):
+        """
+        Analyse laptops through a batch backend instead of synchronous requests.
+        Every review batch becomes one batch request with the custom_id
+        '<product_id>:<batch index>'; reviews whose batch result is missing or
+        malformed are retried synchronously. Results are stored exactly as run() does.
+
+        Args:
+            laptops (list): Summarised product records.
+            sentiment_store (ReviewStore): Store of final analysed products.
+            manifest (PipelineManifest, optional): Manifest used to skip unchanged work.
+            backend (optional): Batch backend; defaults to the OpenAI Batch API.
+            work_dir (str, optional): Directory for shards and the submission record.
+        """
+        handler = OpenAIHandler(BATCH_SENTIMENT_PROMPT)
+        plans = []
+        requests = []
+        for laptop in laptops:
+            input_hash = self.input_hash(laptop)
+            if self.reuse_previous(laptop, input_hash, sentiment_store, manifest):
+                continue
+            items = self.review_items(laptop)
+            kept, skipped = self.filter_reviews(items)
+            batches = pack_reviews(kept, self.batch_tokens, self.max_batch_size)
+            for i, batch in enumerate(batches):
+                requests.append(request_line(
+                    f"{laptop['product_id']}:{i}", handler.model, handler.messages(json.dumps(batch))
+                ))
+            plans.append((laptop, input_hash, items, kept, batches, skipped))
+
+        runner = BatchRunner(backend, work_dir or "scraper_results/batches/sentiment")
+        try:
+            responses = runner.run(requests)
+        except Exception:
+            for plan in plans:
+                self.remember_results(plan[3], {})
+            raise
+
+        for laptop, input_hash, items, kept, batches, skipped in plans:
+            product_id = laptop["product_id"]
+            results = dict(skipped)
+            for i, batch in enumerate(batches):
+                results.update(self.parse_batch_response(batch, responses.get(f"{product_id}:{i}")))
+            failed = [item for item in items if item["id"] not in results]
+            try:
+                if failed:
+                    print(f"Retrying {len(failed)} reviews of {product_id} missing from the batch output.")
+                    results.update(self.analyse_reviews(failed))
+            except Exception as e:
+                print(f"Failed to analyse sentiments for {product_id}: {e}")
+                if manifest:
+                    manifest.mark_failed("sentiment", product_id, input_hash, e)
+                continue
+            finally:
+                self.remember_results(kept, results)
+            self.save_product(laptop, self.aggregate(items, results), input_hash, sentiment_store, manifest)
+
+    def run(self, brand: str, manifest=None, batch=False, batch_backend=None):
+        path_to_product_store = f'./scraper_results/{brand}_processed_reviews.jsonl'
         out_path = f'./scraper_results/final/{brand}_sentiment_analysis.json'
 
-        if not os.path.exists(path_to_product_json):
+        if not os.path.exists(path_to_product_store):
             print("No processed reviews file found. Make sure the reviews have been processed.")
             return
 
-        with open(path_to_product_json, 'r', encoding='utf-8') as f:
-            reviews_data = json.load(f)
+        reviews_data = ReviewStore(path_to_product_store)
 
-        if not reviews_data:
+        if not len(reviews_data):
             print("No reviews found.")
             return
 
-        # Process each laptop individually
-        for laptop in reviews_data:
-            # Initialize the aggregated sentiments dictionary for this laptop
-            aggregated_sentiments = {
-                "pos_5_aspects": [],
-                "neg_5_aspects": [],
-                "pos_4_aspects": [],
-                "neg_4_aspects": [],
-                "pos_3_aspects": [],
-                "neg_3_aspects": [],
-                "pos_2_aspects": [],
-                "neg_2_aspects": [],
-                "pos_1_aspects": [],
-                "neg_1_aspects": []
-            }
-            
-            for review in laptop.get("review", []):
-                star_rating = review.get("star_rating", "")
-                review_text = review.get("review_text", "")
-                if star_rating and review_text:
-                    # Prepare the JSON array as the prompt input
-                    review_input = json.dumps([{
-                        "star_rating": star_rating,
-                        "review_text": review_text
-                    }])
-                    # Initialize and call your OpenAI client
-                    client = OpenAIHandler(SENTIMENT_PROMPT)
-                    response = client.get_response(review_input)
-                    
-                    try:
-                        response_json = json.loads(response)
-                    except json.JSONDecodeError:
-                        print("Failed to decode JSON response from OpenAI for this review.")
-                        continue
-                    
-                    # Merge each key's list from the response into aggregated_sentiments
-                    for key in aggregated_sentiments:
-                        new_aspects = response_json.get(key, [])
-                        aggregated_sentiments[key].extend(new_aspects)
-            
-            # Add set to remove duplicates for each sentiment key if needed
-            for key in aggregated_sentiments:
-                # aggregated_sentiments[key] = list(set(aggregated_sentiments[key]))
-                aggregated_sentiments[key] = list(aggregated_sentiments[key])
-            
-            # Append the aggregated sentiments to the current laptop dict under "review_sentiments"
-            laptop["review_sentiments"] = aggregated_sentiments
-
-        # Ensure the output directory exists
-        output_dir = os.path.dirname(out_path)
-        os.makedirs(output_dir, exist_ok=True)
-
-        # Save the updated laptop data back to the output file
-        with open(out_path, 'w', encoding='utf-8') as f:
-            json.dump(reviews_data, f, indent=4)
+        sentiment_store = ReviewStore(f'./scraper_results/final/{brand}_sentiment_analysis.jsonl')
+
+        if batch:
+            self.run_batch(list(reviews_data), sentiment_store, manifest, batch_backend,
+                           work_dir=f'./scraper_results/batches/{brand}_sentiment')
+        else:
+            # Analyse laptops concurrently; the shared LLM pool enforces the rate limits
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                list(pool.map(lambda laptop: self.process_product(laptop, sentiment_store, manifest), reviews_data))
+
+        # Export the legacy JSON array consumed by the backend
+        sentiment_store.export_json(out_path)
 
+        if self.prefilter:
+            print(f"Lexicon pre-filter answered {self.reviews_skipped} of {self.reviews_seen} reviews "
+                  f"({self.skip_rate():.1%}) without an LLM call.")
+        if self.cascade:
+            print(self.cascade.report())
+        if self.result_cache:
+            print(self.result_cache.report())
         print(f"Sentiment analysis complete. Results saved to {out_path}")
 
 if __name__ == "__main__":
@@ -0,0 +1,173 @@
+import os
+import json
+import threading
+
+
+class ReviewStore:
+    """
+    Append-only JSONL store of product records keyed by product_id.
+    Every upsert appends the full record as a single line and the latest line for a
+    product wins, so writing a product costs O(1) I/O instead of rewriting the file.
+    An in-memory offset index built on open gives direct lookups and streaming
+    iteration; compact() drops superseded lines and export_json() writes the legacy
+    JSON array consumed by the backend.
+    """
+
+    def __init__(self, path):
+        """
+        Open (or create) a store and index its latest record per product.
+
+        Args:
+            path (str): Path to the JSONL file.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._offsets = {}  # product_id -> (offset, length), in first-insertion order
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            open(self.path, "ab").close()
+            return
+        good_end = 0
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                length = len(line)
+                if line.endswith(b"\n"):
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        record = None
+                    if isinstance(record, dict) and record.get("product_id"):
+                        self._offsets[record["product_id"]] = (offset, length)
+                    good_end = offset + length
+                offset += length
+        # Drop a torn trailing line left by an interrupted write
+        if good_end != os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(good_end)
+
+    def upsert(self, product):
+        """
+        Insert or replace a product record with a single atomic append.
+
+        Args:
+            product (dict): Product record with a 'product_id' key.
+
+        Returns:
+            bool: True if stored, False if the record has no product_id.
+        """
+        product_id = product.get("product_id") if product else None
+        if not product_id:
+            return False
+        line = (json.dumps(product, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write(line)
+            self._offsets[product_id] = (offset, len(line))
+        return True
+
+    def get(self, product_id):
+        """
+        Return the latest record for a product, or None if absent.
+
+        Args:
+            product_id (str): The product ASIN.
+
+        Returns:
+            dict or None: The product record.
+        """
+        with self._lock:
+            location = self._offsets.get(product_id)
+            if location is None:
+                return None
+            f = open(self.path, "rb")
+        with f:
+            return self._read(f, location)
+
+    @staticmethod
+    def _read(f, location):
+        offset, length = location
+        f.seek(offset)
+        return json.loads(f.read(length))
+
+    def __contains__(self, product_id):
+        return product_id in self._offsets
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __iter__(self):
+        return self.iter_products()
+
+    def iter_products(self):
+        """
+        Stream the latest record of every product in first-insertion order.
+
+        Yields:
+            dict: Product records.
+        """
+        # Snapshot the index and open the file together so a concurrent compact()
+        # cannot invalidate the offsets being read
+        with self._lock:
+            locations = list(self._offsets.values())
+            f = open(self.path, "rb")
+        with f:
+            for location in locations:
+                yield self._read(f, location)
+
+    def product_ids(self):
+        """
+        Return the product IDs in the store in first-insertion order.
+
+        Returns:
+            list: Product IDs.
+        """
+        with self._lock:
+            return list(self._offsets)
+
+    def compact(self):
+        """
+        Rewrite the store with only the latest record per product, atomically.
+        """
+        tmp_path = f"{self.path}.tmp"
+        with self._lock:
+            offsets = {}
+            with open(self.path, "rb") as src, open(tmp_path, "wb") as dst:
+                for product_id, location in self._offsets.items():
+                    src.seek(location[0])
+                    line = src.read(location[1])
+                    offsets[product_id] = (dst.tell(), len(line))
+                    dst.write(line)
+            os.replace(tmp_path, self.path)
+            self._offsets = offsets
+
+    def export_json(self, path, indent=4):
+        """
+        Write the store as a JSON array in the legacy brand-file format, atomically.
+
+        Args:
+            path (str): Destination JSON file.
+            indent (int): Indentation passed to json.dumps, matching json.dump output.
+
+        Returns:
+            str: The destination path.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        pad = " " * indent
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            out.write("[")
+            for i, product in enumerate(self.iter_products()):
+                body = json.dumps(product, ensure_ascii=False, indent=indent)
+                out.write(("," if i else "") + "\n" + pad + body.replace("\n", "\n" + pad))
+            out.write("\n]" if self._offsets else "]")
+        os.replace(tmp_path, path)
+        return path
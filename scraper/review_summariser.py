@@ -1,6 +1,9 @@
 from openai_handler import OpenAIHandler
+from review_store import ReviewStore
+from pipeline_manifest import hash_inputs
+from review_batcher import pack_reviews
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-import json
 import os
 
 load_dotenv()
@@ -9,39 +12,258 @@ SUMMARISATION_PROMPT = """
     You will be given a string of laptop product reviews. Each review is separated by a semicolon ";". Your task is to summarise the reviews and provide a summary of the reviews. Your summary must be concise and within **1 sentence**, start your summary with "The laptop ...". You do not need to mention the laptop model name in the summary. **Only** return the summary of the reviews.
 """
 
+CHUNK_SUMMARISATION_PROMPT = """
+    You will be given a string of laptop product reviews. Each review is separated by a semicolon ";". These are only some of the laptop's reviews. Your task is to summarise what these reviews say about the laptop in **at most 3 sentences**, keeping the main praise and complaints and how common they are. You do not need to mention the laptop model name. **Only** return the summary.
+"""
+
+REDUCE_SUMMARISATION_PROMPT = """
+    You will be given partial summaries of the reviews of one laptop, each covering a different group of reviews and separated by a semicolon ";". Your task is to combine them into one summary of all the reviews. Your summary must be concise and within **1 sentence**, start your summary with "The laptop ...". You do not need to mention the laptop model name in the summary. **Only** return the summary of the reviews.
+"""
+
+UPDATE_SUMMARISATION_PROMPT = """
+    You will be given the current one-sentence summary of a laptop's reviews, followed by new reviews of the same laptop separated by a semicolon ";". Your task is to update the summary so it also reflects the new reviews, giving them weight in proportion to how many reviews the summary already covers. Your summary must be concise and within **1 sentence**, start your summary with "The laptop ...". You do not need to mention the laptop model name in the summary. **Only** return the updated summary.
+"""
+
+
+def review_hash(review):
+    """
+    Identify a review by its content for tracking which reviews a summary covers.
+
+    Args:
+        review (dict): Review with a 'review_text' key.
+
+    Returns:
+        str: Short hex digest of the review text.
+    """
+    return hash_inputs(review.get("review_text"))[:16]
+
+
 class ReviewSummariser:
-    def run(self, brand: str):
-        path_to_product_json = f'./scraper_results/{brand}_reviews.json'
+    def __init__(self, max_workers=16, chunk_tokens=3000, chunk_concurrency=8,
+                 max_update_fraction=0.25, max_consecutive_updates=10):
+        """
+        Initialize the summariser.
+
+        Args:
+            max_workers (int): Laptops summarised concurrently by run().
+            chunk_tokens (int): Approximate token budget of the reviews sent in one request.
+            chunk_concurrency (int): Chunks of one laptop summarised concurrently.
+            max_update_fraction (float): Largest share of new reviews folded into an existing
+                summary with one update request; more triggers a full summary.
+            max_consecutive_updates (int): Updates allowed before a full summary is regenerated,
+                bounding drift from repeated incremental edits.
+        """
+        self.max_workers = max_workers
+        self.chunk_tokens = chunk_tokens
+        self.chunk_concurrency = chunk_concurrency
+        self.max_update_fraction = max_update_fraction
+        self.max_consecutive_updates = max_consecutive_updates
+
+    def _get_responses(self, sysprompt, prompts):
+        client = OpenAIHandler(sysprompt)
+        responses = []
+        for start in range(0, len(prompts), self.chunk_concurrency):
+            responses.extend(client.get_responses(prompts[start:start + self.chunk_concurrency]))
+        return responses
+
+    def _chunks(self, texts):
+        return ["; ".join(chunk) for chunk in pack_reviews(texts, self.chunk_tokens, max_items=len(texts) or 1)]
+
+    def summarise_product(self, laptop):
+        """
+        Summarise all reviews of one laptop in a single sentence.
+        Reviews that fit in one chunk are summarised in one request. Otherwise each
+        token-bounded chunk is summarised in parallel and the partial summaries are
+        reduced into the final sentence, so latency stays flat as reviews grow.
+
+        Args:
+            laptop (dict): Product record with a 'review' list.
+
+        Returns:
+            str: The summary.
+        """
+        # Ensure there is a review key (using an empty list as a default)
+        review_texts = [txt.get("review_text") or "" for txt in laptop.get("review", [])]
+        chunks = self._chunks(review_texts)
+        if len(chunks) <= 1:
+            return self._get_responses(SUMMARISATION_PROMPT, chunks or [""])[0]
+
+        # Map: summarise each chunk; repeat on the partial summaries until they fit one request
+        partials = self._get_responses(CHUNK_SUMMARISATION_PROMPT, chunks)
+        chunks = self._chunks(partials)
+        while len(chunks) > 1:
+            reduced = self._chunks(self._get_responses(CHUNK_SUMMARISATION_PROMPT, chunks))
+            if len(reduced) >= len(chunks):
+                # Partial summaries are not shrinking; reduce what we have in one request
+                chunks = ["; ".join(reduced)]
+                break
+            chunks = reduced
+
+        # Reduce: combine the partial summaries into one sentence
+        return self._get_responses(REDUCE_SUMMARISATION_PROMPT, chunks)[0]
+
+    def input_hash(self, laptop):
+        """
+        Hash everything that determines a laptop's summary.
+
+        Args:
+            laptop (dict): Product record with a 'review' list.
+
+        Returns:
+            str: Digest used by the pipeline manifest.
+        """
+        review_texts = [txt.get("review_text") for txt in laptop.get("review", [])]
+        return hash_inputs(self.prompt_hash(), review_texts)
+
+    def update_summary(self, summary, new_reviews):
+        """
+        Fold new reviews into an existing summary with a single request.
+
+        Args:
+            summary (str): The current summary.
+            new_reviews (list): Reviews the summary does not cover yet.
+
+        Returns:
+            str: The updated summary.
+        """
+        new_texts = "; ".join(review.get("review_text") or "" for review in new_reviews)
+        prompt = f"Current summary: {summary}\n\nNew reviews: {new_texts}"
+        return self._get_responses(UPDATE_SUMMARISATION_PROMPT, [prompt])[0]
+
+    def plan_update(self, laptop, previous, entry):
+        """
+        Decide whether a laptop's previous summary can be updated instead of regenerated.
+
+        Args:
+            laptop (dict): Product record with a 'review' list.
+            previous (dict or None): The laptop's previous processed record.
+            entry (dict or None): The laptop's latest manifest entry for 'summarise'.
+
+        Returns:
+            list or None: The new reviews to fold in, or None if a full summary is needed.
+        """
+        if not previous or not previous.get('review_summary') or not entry or entry.get("status") != "done":
+            return None
+        covered = entry.get("review_hashes")
+        if covered is None or entry.get("prompt_hash") != self.prompt_hash():
+            return None
+        if entry.get("updates", 0) >= self.max_consecutive_updates:
+            return None
+        reviews = laptop.get("review", [])
+        current = {review_hash(review) for review in reviews}
+        if not current >= set(covered):
+            return None  # reviews were removed, so the summary may describe text that is gone
+        new_reviews = [review for review in reviews if review_hash(review) not in set(covered)]
+        if len(new_reviews) > self.max_update_fraction * len(reviews):
+            return None
+        return new_reviews
+
+    def prompt_hash(self):
+        """
+        Hash the prompts and settings a summary depends on, apart from the reviews.
+        """
+        return hash_inputs(OpenAIHandler.DEFAULT_MODEL, SUMMARISATION_PROMPT, CHUNK_SUMMARISATION_PROMPT,
+                           REDUCE_SUMMARISATION_PROMPT, UPDATE_SUMMARISATION_PROMPT, self.chunk_tokens)
+
+    def process_product(self, laptop, processed_store, manifest=None):
+        """
+        Add a summary to one laptop and upsert it into the processed store,
+        skipping the LLM call when the manifest shows its inputs are unchanged.
+
+        Args:
+            laptop (dict): Product record with a 'review' list.
+            processed_store (ReviewStore): Store of summarised products.
+            manifest (PipelineManifest, optional): Manifest used to skip unchanged work.
+
+        Returns:
+            dict or None: The summarised laptop, or None if summarising failed.
+        """
+        product_id = laptop.get('product_id')
+        input_hash = self.input_hash(laptop)
+        previous = processed_store.get(product_id)
+        entry = manifest.get("summarise", product_id) if manifest else None
+        new_reviews = self.plan_update(laptop, previous, entry)
+
+        # Skip products whose summary already covers exactly these reviews
+        if new_reviews == [] or (manifest and previous and manifest.is_done("summarise", product_id, input_hash)):
+            laptop['review_summary'] = previous.get('review_summary')
+            if laptop != previous:
+                processed_store.upsert(laptop)
+            print(f"Summary for {product_id} is up to date; skipping.")
+            return laptop
+
+        try:
+            if new_reviews:
+                print(f"Updating the summary for {product_id} with {len(new_reviews)} new reviews.")
+                summary = self.update_summary(previous['review_summary'], new_reviews)
+                updates = entry.get("updates", 0) + 1
+            else:
+                summary = self.summarise_product(laptop)
+                updates = 0
+        except Exception as e:
+            print(f"Failed to summarise {product_id}: {e}")
+            if manifest:
+                manifest.mark_failed("summarise", product_id, input_hash, e)
+            return None
+        return self.save_summary(laptop, summary, input_hash, processed_store, manifest, updates)
+
+    def reuse_previous(self, laptop, input_hash, processed_store, manifest=None):
+        """
+        Copy a laptop's previous summary if the manifest shows its inputs are unchanged.
+
+        Returns:
+            bool: True if the previous summary was reused.
+        """
+        product_id = laptop.get('product_id')
+        previous = processed_store.get(product_id)
+        if not (manifest and previous and manifest.is_done("summarise", product_id, input_hash)):
+            return False
+        laptop['review_summary'] = previous.get('review_summary')
+        if laptop != previous:
+            processed_store.upsert(laptop)
+        print(f"Summary for {product_id} is up to date; skipping.")
+        return True
+
+    def save_summary(self, laptop, summary, input_hash, processed_store, manifest=None, updates=0,
+                     prompt_hash=None):
+        """
+        Attach a summary to a laptop, store it and record the reviews it covers in the manifest.
+        prompt_hash overrides prompt_hash() for summaries produced another way, such as by
+        the fused stage, so plan_update() does not extend them as its own.
+
+        Returns:
+            dict: The summarised laptop.
+        """
+        product_id = laptop.get('product_id')
+        print(f"\nSummary for {product_id}: {summary}\n")
+        laptop['review_summary'] = summary
+        processed_store.upsert(laptop)
+        if manifest:
+            # Record which reviews the summary covers so later runs can update it incrementally
+            manifest.mark("summarise", product_id, input_hash, output=processed_store.path,
+                          review_hashes=sorted({review_hash(review) for review in laptop.get("review", [])}),
+                          prompt_hash=prompt_hash or self.prompt_hash(), updates=updates)
+        return laptop
+
+    def run(self, brand: str, manifest=None):
+        path_to_product_store = f'./scraper_results/{brand}_reviews.jsonl'
         out_path = f'./scraper_results/{brand}_processed_reviews.json'
 
-        if not os.path.exists(path_to_product_json):
+        if not os.path.exists(path_to_product_store):
             print("No reviews file found. Make sure the reviews have been processed.")
             return
 
-        with open(path_to_product_json, 'r') as f:
-            reviews_data = json.load(f)
+        reviews_data = ReviewStore(path_to_product_store)
 
-        if not reviews_data:
+        if not len(reviews_data):
             print("No reviews found.")
             return
 
-        # Process each laptop and add a summary
-        for laptop in reviews_data:
-            # Ensure there is a review key (using an empty list as a default)
-            temp_review_str = "; ".join([txt.get("review_text") for txt in laptop.get("review", [])])
-            client = OpenAIHandler(SUMMARISATION_PROMPT)
-            summary = client.get_response(temp_review_str)
-            print(f"\nSummary for {laptop.get('product_id')}: {summary}\n")
-            laptop['review_summary'] = summary
-
-        # Check if the results file exists; if so, load and append, otherwise start fresh
-        if os.path.exists(out_path):
-            with open(out_path, 'r') as f:
-                existing_data = json.load(f)
-            combined_data = existing_data + reviews_data
-        else:
-            combined_data = reviews_data
-
-        with open(out_path, 'w') as f:
-            json.dump(combined_data, f, indent=4)
-            
\ No newline at end of file
+        # Summaries are upserted by product_id, so reruns replace rather than duplicate products
+        processed_store = ReviewStore(f'./scraper_results/{brand}_processed_reviews.jsonl')
+
+        # Summarise laptops concurrently; the shared LLM pool enforces the rate limits
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            list(pool.map(lambda laptop: self.process_product(laptop, processed_store, manifest), reviews_data))
+
+        processed_store.export_json(out_path)
@@ -3,9 +3,22 @@ from asin_scraper import AsinHandler
 from review_summariser import ReviewSummariser
 from review_sentiment import SentimentGenerator
 from review_scraper import AmazonReviewProcessor
+from scrapingbee_client import get_client
+from request_budget import RequestBudget
+from review_store import ReviewStore
+from pipeline_manifest import PipelineManifest, hash_inputs, hash_file
+from streaming_pipeline import StreamingPipeline
+from fused_analyser import FusedAnalyser
+from sentiment_cascade import SentimentCascade, get_classifier
+from review_result_cache import review_result_cache_from_env
+from minhash import dedupe
+from variant_grouper import group_variants
+from review_index import review_index_from_env
+from concurrent.futures import ThreadPoolExecutor
 
 import os
 import json
+import shutil
 
 load_dotenv()
 
@@ -19,20 +32,37 @@ if not AMAZON_COOKIES:
     exit(1)
 
 
-def scrape_asins(brand, max_asins=None):
+def scrape_asins(brand, max_asins=None, manifest=None):
     """
     Starts the scraper to crawl laptop ASINs from Amazon.
+    Skipped when the manifest shows the same brand and limit already produced the current asins.json.
     """
     if not brand:
         raise ValueError("No laptop brand specified.")
 
+    path_to_asins = './scraper_results/asins.json'
+    input_hash = hash_inputs(brand, max_asins)
+    if manifest and manifest.is_done("asins", brand, input_hash) and \
+            manifest.get("asins", brand).get("output_hash") == hash_file(path_to_asins):
+        print(f"ASINs for {brand} unchanged since the last run; skipping discovery.")
+        return
+
     handler = AsinHandler(brand=brand, max_asins=max_asins)
     handler.run()
+    if manifest:
+        manifest.mark("asins", brand, input_hash, output=path_to_asins, output_hash=hash_file(path_to_asins))
 
 
-def scrape_reviews(brand: str, review_pages_per_asin=3):
+def scrape_reviews(brand: str, review_pages_per_asin=3, max_workers=4, max_in_flight=10, max_credits=None,
+                   manifest=None, dedupe_threshold=0.8):
     """
-    Reads the ASINs from asins.json and processes them.
+    Reads the ASINs from asins.json and processes them in parallel.
+    Each ASIN's first review page is probed, and ASINs whose pages show the same
+    parent ASIN or review pool are grouped as variants: only the first of each group
+    is scraped, and its reviews are saved under every variant with the variant's own
+    listing info. Each ASIN is written to its own workspace; a single writer then
+    merges the results into the brand's reviews file. All workers share one request budget.
+    ASINs the manifest records as already scraped with the same inputs are skipped.
     """
     path_to_asins = './scraper_results/asins.json'
 
@@ -47,51 +77,340 @@ def scrape_reviews(brand: str, review_pages_per_asin=3):
         print("No ASINs scraped.")
         return
 
-    # Loop through each scraped ASIN and process it
+    brand_store = ReviewStore(f'./scraper_results/{brand}_reviews.jsonl')
+    entries = []
+    input_hashes = {}
     for entry in asins_data:
-        # product_id = entry.get('asin')
-        if entry:
-            print(f"\n=== Processing product: {entry.get("asin")} ===")
-            # Here you can decide whether to process all ASINs or just one
-            processor = AmazonReviewProcessor(
-                api_key=SCRAPINGBEE_API_KEY, 
-                product_info=entry, 
-                review_pages=review_pages_per_asin,
-                brand=brand
-            )
-            processor.process()
-        else:
+        if not entry or not entry.get("asin"):
             print("Encountered an entry without an ASIN.")
+            continue
+        asin = entry.get("asin")
+        input_hashes[asin] = hash_inputs(entry, review_pages_per_asin)
+        if manifest and manifest.is_done("scrape", asin, input_hashes[asin]) and asin in brand_store:
+            print(f"Product {asin} already scraped; skipping.")
+            continue
+        entries.append(entry)
+
+    # Every worker shares the client's connection pool, cache and request budget
+    get_client(SCRAPINGBEE_API_KEY).budget = RequestBudget(
+        max_in_flight=max_in_flight, max_credits=max_credits
+    )
+    workspace_root = os.path.join('./scraper_results', 'work', brand)
+
+    def probe_entry(entry):
+        asin = entry.get("asin")
+        workspace = os.path.join(workspace_root, asin)
+        # Start from a clean workspace so a previous crashed run cannot leak into this one
+        shutil.rmtree(workspace, ignore_errors=True)
+        print(f"\n=== Probing product: {asin} ===")
+        processor = AmazonReviewProcessor(
+            api_key=SCRAPINGBEE_API_KEY,
+            product_info=entry,
+            review_pages=review_pages_per_asin,
+            brand=brand,
+            output_dir=workspace,
+            dedupe_threshold=dedupe_threshold
+        )
+        return processor, processor.scrape_reviews()
+
+    def mark_failed(asins, error):
+        for asin in asins:
+            print(f"Failed to process product {asin}: {error}")
+            if manifest:
+                manifest.mark_failed("scrape", asin, input_hashes[asin], error)
+
+    # Probe every ASIN first so variants sharing a review pool are only scraped once
+    probes = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(probe_entry, entry) for entry in entries]
+        for entry, future in zip(entries, futures):
+            try:
+                probes[entry.get("asin")] = future.result()
+            except Exception as e:
+                mark_failed([entry.get("asin")], e)
+    groups = group_variants(list(probes), {asin: processor.probe_page for asin, (processor, _) in probes.items()})
+    print(f"Grouped {len(probes)} ASINs into {len(groups)} review pools.")
+
+    def process_group(group):
+        asin = group[0]
+        processor, listing = probes[asin]
+        print(f"\n=== Processing product: {asin} ===")
+        processor.process(listing)
+        path = os.path.join(processor.output_dir, f"{brand}_reviews.jsonl")
+        scraped = ReviewStore(path).get(asin) if os.path.exists(path) else None
+        paths = [path]
+        for variant in group[1:]:
+            print(f"Reusing the reviews of {asin} for variant {variant}")
+            variant_processor, variant_listing = probes[variant]
+            paths.append(variant_processor.save_variant(variant_listing, scraped))
+        return paths
 
+    product_paths = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(process_group, group) for group in groups]
+        for group, future in zip(groups, futures):
+            try:
+                paths = future.result()
+            except Exception as e:
+                mark_failed(group, e)
+                continue
+            product_paths.extend(paths)
+            for asin, path in zip(group, paths):
+                if not manifest:
+                    continue
+                if os.path.exists(path) and asin in ReviewStore(path):
+                    manifest.mark("scrape", asin, input_hashes[asin], output=brand_store.path)
+                else:
+                    manifest.mark_failed("scrape", asin, input_hashes[asin], "no product data scraped")
 
-def add_summaries(brand):
+    merge_workspaces(brand, product_paths)
+    shutil.rmtree(workspace_root, ignore_errors=True)
+
+
+def merge_workspaces(brand: str, product_paths):
+    """
+    Merges per-ASIN workspace stores into the brand's review store, then exports
+    the legacy JSON file.
+    """
+    store = ReviewStore(f'./scraper_results/{brand}_reviews.jsonl')
+    for path in product_paths:
+        if os.path.exists(path):
+            for product in ReviewStore(path):
+                store.upsert(product)
+    store.compact()
+    store.export_json(f'./scraper_results/{brand}_reviews.json')
+    print(f"Merged {len(product_paths)} products into {store.path}")
+
+
+def refresh_reviews(brand: str, max_recent_pages=10, max_workers=4, max_in_flight=10, max_credits=None,
+                    dedupe_threshold=0.8):
+    """
+    Adds only the reviews posted since the last scrape to every product in the brand's
+    review store. Each product pages through its reviews newest first and stops at the
+    first review older than its newest stored one, skipping reviews already stored or in
+    the review index, so an unchanged product costs one request. Variants saved with variant_of take their source product's refreshed
+    reviews without any request.
+    """
+    brand_store = ReviewStore(f'./scraper_results/{brand}_reviews.jsonl')
+    products = [product for product in brand_store if not product.get("variant_of")]
+    if not products:
+        print("No scraped products to refresh. Run a full scrape first.")
+        return
+    variants = {}
+    for product in brand_store:
+        if product.get("variant_of"):
+            variants.setdefault(product["variant_of"], []).append(product)
+
+    get_client(SCRAPINGBEE_API_KEY).budget = RequestBudget(
+        max_in_flight=max_in_flight, max_credits=max_credits
+    )
+    index = review_index_from_env()
+    workspace_root = os.path.join('./scraper_results', 'work', brand)
+
+    def refresh_product(product):
+        asin = product["product_id"]
+        workspace = os.path.join(workspace_root, asin)
+        shutil.rmtree(workspace, ignore_errors=True)
+        processor = AmazonReviewProcessor(
+            api_key=SCRAPINGBEE_API_KEY,
+            product_info={"asin": asin},
+            review_pages=max_recent_pages,
+            brand=brand,
+            output_dir=workspace,
+            dedupe_threshold=dedupe_threshold
+        )
+        new_reviews = processor.refresh_reviews(product, known=index)
+        path = os.path.join(workspace, f"{brand}_reviews.jsonl")
+        if new_reviews:
+            workspace_store = ReviewStore(path)
+            refreshed = workspace_store.get(asin)
+            for variant in variants.get(asin, []):
+                workspace_store.upsert(dict(variant, review=refreshed["review"]))
+        return len(new_reviews), path
+
+    product_paths = []
+    new_total = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(refresh_product, product) for product in products]
+        for product, future in zip(products, futures):
+            try:
+                new_count, path = future.result()
+            except Exception as e:
+                print(f"Failed to refresh product {product['product_id']}: {e}")
+                continue
+            new_total += new_count
+            product_paths.append(path)
+
+    merge_workspaces(brand, product_paths)
+    shutil.rmtree(workspace_root, ignore_errors=True)
+    print(f"Found {new_total} new reviews across {len(products)} products.")
+
+
+def dedupe_brand_reviews(brand: str, threshold=0.8, across_products=False, index=None):
+    """
+    Removes near-duplicate reviews from the brand's review store in one pass over
+    every review. By default reviews are only compared within their product; with
+    across_products enabled, a review repeated on several products is kept on the
+    first product only. Variant listings share their reviews, so only use that for
+    stores without variants. Only products that lose reviews are rewritten.
+    With a ReviewIndex, products whose reviews are all indexed were deduplicated by
+    an earlier run and are skipped, and the kept reviews are added to the index.
+    """
+    store = ReviewStore(f'./scraper_results/{brand}_reviews.jsonl')
+    products = [product for product in store if product.get("review")]
+    if index is not None and not across_products:
+        products = [product for product in products if index.unknown(product["review"])]
+    texts, locations = [], []
+    for index_in_batch, product in enumerate(products):
+        for position, review in enumerate(product["review"]):
+            texts.append(review.get("review_text", ""))
+            locations.append((index_in_batch, position))
+
+    owners = [owner for owner, _ in locations]
+    keep = dedupe(texts, threshold=threshold, partition=None if across_products else owners)
+    kept_per_product = [[] for _ in products]
+    for i in keep:
+        owner, position = locations[i]
+        kept_per_product[owner].append(position)
+
+    removed = 0
+    for owner, product in enumerate(products):
+        kept = kept_per_product[owner]
+        if len(kept) < len(product["review"]):
+            removed += len(product["review"]) - len(kept)
+            product["review"] = [product["review"][i] for i in kept]
+            store.upsert(product)
+        if index is not None:
+            index.add(product["review"], brand, product["product_id"])
+    if removed:
+        store.compact()
+        store.export_json(f'./scraper_results/{brand}_reviews.json')
+    print(f"Removed {removed} near-duplicate reviews of {len(texts)} from {store.path}")
+
+
+def add_summaries(brand, manifest=None):
     """
     Adds summaries to the processed reviews and appends them to the results file.
     """
     summariser = ReviewSummariser()
-    summariser.run(brand)
+    summariser.run(brand, manifest=manifest)
 
 
-def add_sentiments(brand):
+def add_sentiments(brand, manifest=None, batch=False, local_threshold=None):
     """
     Adds sentiment analysis to the processed reviews and appends them to the results file.
+    With batch enabled, the requests go through the OpenAI Batch API instead. With a
+    local_threshold, a local classifier answers the reviews it is at least that
+    confident about and only the rest go to the LLM. Near-duplicates of reviews analysed
+    in earlier runs reuse their results unless REVIEW_CACHE=0.
     """
-    sentiment_generator = SentimentGenerator()
-    sentiment_generator.run(brand)
+    sentiment_generator = build_sentiment_generator(local_threshold)
+    sentiment_generator.run(brand, manifest=manifest, batch=batch)
 
 
-def run_pipeline(brand: str, max_asins: int):
-    print("=== Running ASIN spider ===")
-    scrape_asins(brand=brand, max_asins=max_asins)
+def build_sentiment_generator(local_threshold=None):
+    """
+    Builds the sentiment stage: the local classifier cascade when a local_threshold is
+    given, and the near-duplicate result cache unless REVIEW_CACHE=0.
+    """
+    cascade = SentimentCascade(get_classifier("aspect"), local_threshold) if local_threshold is not None else None
+    result_cache = review_result_cache_from_env(version=SentimentGenerator.results_version())
+    return SentimentGenerator(cascade=cascade, result_cache=result_cache)
 
-    print("=== Processing ASINs ===")
-    scrape_reviews(brand=brand, review_pages_per_asin=1)
+
+def stream_reviews(brand: str, review_pages_per_asin=1, max_workers=4, max_in_flight=10, max_credits=None,
+                   manifest=None, local_threshold=None):
+    """
+    Streams each ASIN from asins.json through scraping, summarising and sentiment
+    analysis as soon as it is scraped, instead of finishing each stage for every
+    product before starting the next. The sentiment stage is set up as in add_sentiments().
+    """
+    path_to_asins = './scraper_results/asins.json'
+
+    if not os.path.exists(path_to_asins):
+        print("No ASIN file found. Make sure the spider has scraped some ASINs.")
+        return
+
+    with open(path_to_asins, 'r') as f:
+        asins_data = json.load(f)
+
+    if not asins_data:
+        print("No ASINs scraped.")
+        return
+
+    get_client(SCRAPINGBEE_API_KEY).budget = RequestBudget(
+        max_in_flight=max_in_flight, max_credits=max_credits
+    )
+    pipeline = StreamingPipeline(
+        api_key=SCRAPINGBEE_API_KEY,
+        brand=brand,
+        review_pages_per_asin=review_pages_per_asin,
+        scrape_workers=max_workers,
+        manifest=manifest,
+        review_index=review_index_from_env(),
+        sentiment_generator=build_sentiment_generator(local_threshold)
+    )
+    pipeline.run(asins_data)
+
+
+def add_summaries_and_sentiments(brand, manifest=None):
+    """
+    Adds summaries and sentiment analysis in one fused pass that sends each review once.
+    """
+    fused_analyser = FusedAnalyser()
+    fused_analyser.run(brand, manifest=manifest)
+
+
+def run_pipeline(brand: str, max_asins: int, resume=True, streaming=False, fused=False, local_threshold=None,
+                 dedupe_threshold=0.8, refresh=False):
+    """
+    Runs every pipeline stage for a brand. With resume enabled, a per-brand manifest
+    records each stage's work per product so a rerun skips anything whose inputs are
+    unchanged and picks up at the first incomplete product. With streaming enabled,
+    products flow from the scraper into the summary and sentiment stages as soon as
+    they are scraped. With fused enabled, summaries and sentiments come from the same
+    requests. A local_threshold puts the local classifier cascade in front of the
+    separate sentiment stage. Scraped reviews are deduplicated within each product at
+    dedupe_threshold similarity; reviews already in the shared review index are not
+    checked again. With refresh enabled, the brand's already scraped products only
+    fetch their new reviews, and with resume enabled the summary and sentiment stages
+    then update each product with just those reviews. Streaming supports local_threshold
+    but not fused or refresh.
+    """
+    if streaming and (fused or refresh):
+        raise ValueError("streaming cannot be combined with fused or refresh")
+    manifest = PipelineManifest(f'./scraper_results/manifest/{brand}.jsonl') if resume else None
+
+    if refresh:
+        print("=== Fetching new reviews ===")
+        refresh_reviews(brand=brand, dedupe_threshold=dedupe_threshold)
+    else:
+        print("=== Running ASIN spider ===")
+        scrape_asins(brand=brand, max_asins=max_asins, manifest=manifest)
+
+        if streaming:
+            print("=== Streaming ASINs through reviews, summaries and sentiments ===")
+            stream_reviews(brand=brand, review_pages_per_asin=1, manifest=manifest, local_threshold=local_threshold)
+            print("=== Workflow complete ===")
+            return
+
+        print("=== Processing ASINs ===")
+        scrape_reviews(brand=brand, review_pages_per_asin=1, manifest=manifest, dedupe_threshold=dedupe_threshold)
+
+    print("=== Removing near-duplicate reviews ===")
+    dedupe_brand_reviews(brand=brand, threshold=dedupe_threshold, index=review_index_from_env())
+
+    if fused:
+        print("=== Adding summaries and sentiments ===")
+        add_summaries_and_sentiments(brand=brand, manifest=manifest)
+        print("=== Workflow complete ===")
+        return
 
     print("=== Adding summaries ===")
-    add_summaries(brand=brand)
+    add_summaries(brand=brand, manifest=manifest)
 
     print("=== Adding sentiments ===")
-    add_sentiments(brand=brand)
+    add_sentiments(brand=brand, manifest=manifest, local_threshold=local_threshold)
 
     print("=== Workflow complete ===")
 
@@ -0,0 +1,272 @@
+import os
+import time
+import random
+import asyncio
+import threading
+import requests
+import aiohttp
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from response_cache import cache_from_env
+from request_budget import CreditBudgetExceeded
+
+SCRAPINGBEE_API_URL = "https://app.scrapingbee.com/api/v1"
+
+# Status codes worth retrying: rate limiting and transient upstream failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class ScrapingBeeClient:
+    """
+    Shared HTTP client for the ScrapingBee API.
+    Keeps a pooled keep-alive session, applies per-request timeouts and retries
+    transient failures with jittered exponential backoff that honours Retry-After.
+    Provides both a blocking get() and an aiohttp-based get_async(), both served from
+    an optional ResponseCache before any paid request is made.
+    """
+
+    def __init__(self, api_key=None, cookies="", timeout=(10, 120), max_retries=3,
+                 backoff_base=1.0, backoff_cap=30.0, pool_size=10, cache=None, budget=None):
+        """
+        Initialize the client with credentials, timeouts, retry policy and pool size.
+
+        Args:
+            api_key (str, optional): ScrapingBee API key. Defaults to SCRAPINGBEE_API_KEY.
+            cookies (str): Default Amazon cookies forwarded to ScrapingBee.
+            timeout (tuple): (connect, read) timeouts in seconds for each request.
+            max_retries (int): Number of retries after the first attempt.
+            backoff_base (float): Base delay in seconds for exponential backoff.
+            backoff_cap (float): Maximum delay in seconds between attempts.
+            pool_size (int): Maximum number of pooled connections.
+            cache (ResponseCache, optional): On-disk cache consulted before fetching.
+            budget (RequestBudget, optional): Global in-flight and credit limit for paid requests.
+        """
+        self.api_key = api_key or os.getenv("SCRAPINGBEE_API_KEY")
+        self.cookies = cookies
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.pool_size = pool_size
+        self.cache = cache
+        self.budget = budget
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """
+        Lazily create the pooled requests session shared by all blocking calls.
+        """
+        with self._session_lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+        return self._session
+
+    def build_params(self, url, cookies=None):
+        """
+        Build the ScrapingBee query parameters for a target URL.
+
+        Args:
+            url (str): The target page URL.
+            cookies (str, optional): Cookies overriding the client default.
+
+        Returns:
+            dict: Query parameters for the ScrapingBee API.
+        """
+        return {
+            'api_key': self.api_key,
+            'url': url,
+            'block_resources': 'false',
+            'cookies': self.cookies if cookies is None else cookies
+        }
+
+    def retry_delay(self, attempt, retry_after=None):
+        """
+        Compute how long to wait before the next attempt.
+        Uses the server's Retry-After value when present, otherwise full-jitter
+        exponential backoff capped at backoff_cap.
+
+        Args:
+            attempt (int): Zero-based index of the attempt that just failed.
+            retry_after (str, optional): Raw Retry-After header value.
+
+        Returns:
+            float: Delay in seconds.
+        """
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_cap)
+            except ValueError:
+                try:
+                    wait = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                    return min(max(wait, 0.0), self.backoff_cap)
+                except (TypeError, ValueError):
+                    pass
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def _lookup_cache(self, url, params, fresh=False):
+        """
+        Look up a response in the cache.
+
+        Args:
+            url (str): The target page URL.
+            params (dict): ScrapingBee parameters for the request.
+            fresh (bool): Ignore any cached body so the page is fetched again, unless the
+                cache is in cache-only mode. The fetched body still replaces the entry.
+
+        Returns:
+            tuple: (cache_key, content, skip_fetch). content is the cached body or None;
+                skip_fetch is True when the network must not be used.
+        """
+        if self.cache is None:
+            return None, None, False
+        cache_key = self.cache.key_for(url, params)
+        content = None if fresh and not self.cache.cache_only else self.cache.get(cache_key)
+        if content is not None:
+            print(f"Cache hit: {url}")
+            return cache_key, content, True
+        if self.cache.cache_only:
+            print(f"Cache miss in cache-only mode, skipping fetch: {url}")
+            return cache_key, None, True
+        return cache_key, None, False
+
+    def get(self, url, cookies=None, fresh=False):
+        """
+        Fetch the rendered HTML of a URL through ScrapingBee, retrying transient failures.
+
+        Args:
+            url (str): The target page URL.
+            cookies (str, optional): Cookies overriding the client default.
+            fresh (bool): Bypass cached copies of the page.
+
+        Returns:
+            bytes or None: HTML content if successful, else None.
+        """
+        params = self.build_params(url, cookies)
+        cache_key, content, skip_fetch = self._lookup_cache(url, params, fresh)
+        if skip_fetch:
+            return content
+        try:
+            if self.budget is not None:
+                self.budget.charge()
+        except CreditBudgetExceeded as e:
+            print(f"Skipping {url}: {e}")
+            return None
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            if self.budget is not None:
+                self.budget.acquire()
+            try:
+                response = self.session.get(SCRAPINGBEE_API_URL, params=params, timeout=self.timeout)
+                print(f'URL {url} - HTTP Status Code: {response.status_code}')
+                if response.status_code == 200:
+                    if cache_key:
+                        self.cache.put(cache_key, response.content)
+                    return response.content
+                if response.status_code not in RETRY_STATUSES:
+                    print(f"Failed to fetch {url}: {response.content[:500]}")
+                    return None
+                retry_after = response.headers.get("Retry-After")
+            except requests.RequestException as e:
+                print(f"Request error for {url}: {e}")
+            finally:
+                if self.budget is not None:
+                    self.budget.release()
+            if attempt < self.max_retries:
+                delay = self.retry_delay(attempt, retry_after)
+                print(f"Retrying {url} in {delay:.1f}s (attempt {attempt + 2}/{self.max_retries + 1})")
+                time.sleep(delay)
+        print(f"Giving up on {url} after {self.max_retries + 1} attempts")
+        return None
+
+    def async_session(self):
+        """
+        Create a pooled keep-alive aiohttp session configured with the client timeouts.
+        aiohttp sessions are bound to an event loop, so callers own the returned session.
+
+        Returns:
+            aiohttp.ClientSession: A new session; use it as an async context manager.
+        """
+        connect_timeout, read_timeout = self.timeout
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        )
+
+    async def get_async(self, session, url, cookies=None, fresh=False):
+        """
+        Asynchronous counterpart of get(), sharing the same retry policy.
+
+        Args:
+            session (aiohttp.ClientSession): Session from async_session().
+            url (str): The target page URL.
+            cookies (str, optional): Cookies overriding the client default.
+            fresh (bool): Bypass cached copies of the page.
+
+        Returns:
+            bytes or None: HTML content if successful, else None.
+        """
+        params = self.build_params(url, cookies)
+        cache_key, content, skip_fetch = self._lookup_cache(url, params, fresh)
+        if skip_fetch:
+            return content
+        try:
+            if self.budget is not None:
+                self.budget.charge()
+        except CreditBudgetExceeded as e:
+            print(f"Skipping {url}: {e}")
+            return None
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            if self.budget is not None:
+                await self.budget.acquire_async()
+            try:
+                async with session.get(SCRAPINGBEE_API_URL, params=params) as response:
+                    content = await response.read()
+                    print(f'URL {url} - HTTP Status Code: {response.status}')
+                    if response.status == 200:
+                        if cache_key:
+                            self.cache.put(cache_key, content)
+                        return content
+                    if response.status not in RETRY_STATUSES:
+                        print(f"Failed to fetch {url}: {content[:500]}")
+                        return None
+                    retry_after = response.headers.get("Retry-After")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"Request error for {url}: {e!r}")
+            finally:
+                if self.budget is not None:
+                    self.budget.release()
+            if attempt < self.max_retries:
+                delay = self.retry_delay(attempt, retry_after)
+                print(f"Retrying {url} in {delay:.1f}s (attempt {attempt + 2}/{self.max_retries + 1})")
+                await asyncio.sleep(delay)
+        print(f"Giving up on {url} after {self.max_retries + 1} attempts")
+        return None
+
+
+_shared_clients = {}
+_shared_clients_lock = threading.Lock()
+
+
+def get_client(api_key=None):
+    """
+    Return the process-wide ScrapingBeeClient for an API key, creating it on first use,
+    so every scraper component reuses the same connection pool and response cache.
+
+    Args:
+        api_key (str, optional): ScrapingBee API key. Defaults to SCRAPINGBEE_API_KEY.
+
+    Returns:
+        ScrapingBeeClient: The shared client.
+    """
+    api_key = api_key or os.getenv("SCRAPINGBEE_API_KEY")
+    with _shared_clients_lock:
+        if api_key not in _shared_clients:
+            _shared_clients[api_key] = ScrapingBeeClient(api_key, cache=cache_from_env())
+        return _shared_clients[api_key]
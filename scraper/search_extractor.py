@@ -0,0 +1,38 @@
+from urllib.parse import urljoin
+from review_extractor import page_selector
+
+
+def parse_search_page(content, base_url):
+    """
+    Parse a raw Amazon search results page into product records and the next page URL.
+    Runs in ParsePool worker processes, so it must stay a module-level function.
+
+    Args:
+        content (bytes): Raw HTML of the search results page.
+        base_url (str): The page URL, used to resolve relative links.
+
+    Returns:
+        dict: 'products' (list of dicts with 'asin', 'price', 'image_url', 'product_url')
+            and 'next_url' (str or None).
+    """
+    sel = page_selector(content)
+    products = []
+    # Select product containers matching Amazon's search result structure
+    for product in sel.css('div[role="listitem"][data-component-type="s-search-result"]'):
+        asin = product.attrib.get("data-asin")
+        if not asin:
+            continue
+        price = product.css("div[data-cy='price-recipe'] span.a-price > span.a-offscreen::text").get()
+        relative_url = product.css("a.a-link-normal.s-no-outline::attr(href)").get()
+        products.append({
+            "asin": asin,
+            "price": price.strip() if price else None,
+            "image_url": product.css("img.s-image::attr(src)").get(),
+            "product_url": urljoin(base_url, relative_url) if relative_url else None
+        })
+
+    next_page_url = sel.css("li.a-last a::attr(href)").get()
+    return {
+        "products": products,
+        "next_url": urljoin(base_url, next_page_url) if next_page_url else None
+    }
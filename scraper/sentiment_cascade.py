@@ -0,0 +1,400 @@
+import os
+import json
+import threading
+from collections import Counter
+
+import numpy as np
+
+from aspect_lexicon import category_aspects, normalise
+from pipeline_manifest import hash_file, hash_inputs
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "datasets")
+GOLD_TRAIN_PATH = os.path.join(DATASETS_DIR, "laptop_quad_train.tsv.jsonl")
+GOLD_TEST_PATH = os.path.join(DATASETS_DIR, "laptop_quad_test.tsv.jsonl")
+# LLM labels for the test texts: extra training data in production, the LLM baseline in evaluate()
+LLM_LABELLED_PATH = os.path.join(DATASETS_DIR, "clean_full_results.jsonl")
+DEFAULT_TRAIN_PATHS = (GOLD_TRAIN_PATH, LLM_LABELLED_PATH)
+MODEL_DIR = "./scraper_results/models"
+
+
+def load_quads(paths, exclude_texts=()):
+    """
+    Read labelled reviews from quad JSONL files, skipping malformed records.
+
+    Args:
+        paths (iterable): Files of {"text", "labels": [{"aspect", "opinion", "polarity", "category"}]}.
+        exclude_texts (iterable): Texts to leave out, e.g. the evaluation set.
+
+    Returns:
+        list: Records with a 'text' and a list of dict 'labels'. The first record wins
+            when a text appears more than once, so list gold files first.
+    """
+    seen = {normalise(text) for text in exclude_texts}
+    records = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if not isinstance(record, dict) or not isinstance(record.get("labels"), list):
+                    continue
+                key = normalise(record.get("text"))
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                labels = [label for label in record["labels"] if isinstance(label, dict)]
+                records.append({"text": record["text"], "labels": labels})
+    return records
+
+
+def aspect_labels(record):
+    """
+    Label a record with the allowed aspects it praises or criticises, e.g. 'DISPLAY:positive'.
+    """
+    labels = set()
+    for label in record.get("labels", []):
+        polarity = label.get("polarity")
+        if polarity in ("positive", "negative"):
+            labels.update(f"{aspect}:{polarity}" for aspect in category_aspects(label.get("category", "")))
+    return labels
+
+
+def category_labels(record):
+    """
+    Label a record with its ENTITY#ATTRIBUTE categories and polarities, e.g. 'LAPTOP#PRICE:negative'.
+    """
+    return {f"{label.get('category')}:{label.get('polarity')}" for label in record.get("labels", [])
+            if label.get("category") and label.get("polarity")}
+
+
+LABEL_FUNCTIONS = {"aspect": aspect_labels, "category": category_labels}
+# Schemes in which every review has at least one label
+LABELLED_KINDS = {"category"}
+
+
+def label_accuracy(predicted, gold):
+    """
+    Score one review's predicted label set against the gold set as |intersection| / max size,
+    the per-review accuracy used in pyabsa/metrics.ipynb.
+    """
+    if not predicted and not gold:
+        return 1.0
+    if not predicted or not gold:
+        return 0.0
+    return len(predicted & gold) / max(len(predicted), len(gold))
+
+
+class TfidfFeaturiser:
+    """
+    Maps texts to L2-normalised TF-IDF vectors of word unigrams and bigrams.
+    """
+
+    def __init__(self, min_df=2):
+        self.min_df = min_df
+        self.vocabulary = {}
+        self.idf = np.zeros(0, dtype=np.float32)
+
+    @staticmethod
+    def _grams(text):
+        words = normalise(text).split()
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def fit(self, texts):
+        df = Counter(gram for text in texts for gram in set(self._grams(text)))
+        grams = sorted(gram for gram, count in df.items() if count >= self.min_df)
+        self.vocabulary = {gram: i for i, gram in enumerate(grams)}
+        counts = np.array([df[gram] for gram in grams], dtype=np.float32)
+        self.idf = np.log((1 + len(texts)) / (1 + counts)) + 1
+        return self
+
+    def transform(self, texts):
+        X = np.zeros((len(texts), len(self.vocabulary)), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for gram in self._grams(text):
+                j = self.vocabulary.get(gram)
+                if j is not None:
+                    X[i, j] += 1
+        X *= self.idf
+        X /= np.maximum(np.linalg.norm(X, axis=1, keepdims=True), 1e-9)
+        return X
+
+
+class OneVsRestLogistic:
+    """
+    Independent L2-regularised logistic regressions, one per label, trained together
+    with full-batch Adam. Enough for a few thousand short reviews in a few seconds.
+    """
+
+    def __init__(self, iterations=100, learning_rate=0.1, l2=1e-4):
+        self.iterations = iterations
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.coef = None
+        self.intercept = None
+
+    def fit(self, X, Y):
+        n, n_features = X.shape
+        params = [np.zeros((n_features, Y.shape[1]), dtype=np.float32), np.zeros(Y.shape[1], dtype=np.float32)]
+        moments = [[np.zeros_like(p), np.zeros_like(p)] for p in params]
+        for step in range(1, self.iterations + 1):
+            error = (self._sigmoid(X @ params[0] + params[1]) - Y) / n
+            grads = [X.T @ error + self.l2 * params[0], error.sum(axis=0)]
+            for param, grad, (m, v) in zip(params, grads, moments):
+                m *= 0.9
+                m += 0.1 * grad
+                v *= 0.999
+                v += 0.001 * grad ** 2
+                param -= self.learning_rate * (m / (1 - 0.9 ** step)) / (np.sqrt(v / (1 - 0.999 ** step)) + 1e-8)
+        self.coef, self.intercept = params
+        return self
+
+    @staticmethod
+    def _sigmoid(z):
+        return 1 / (1 + np.exp(-np.clip(z, -30, 30)))
+
+    def predict_proba(self, X):
+        return self._sigmoid(X @ self.coef + self.intercept)
+
+
+class LocalSentimentClassifier:
+    """
+    CPU multi-label classifier over one of the label schemes in LABEL_FUNCTIONS. A
+    prediction's confidence is that of its least certain label decision, so a review
+    is only answered locally when every label is clearly present or clearly absent.
+    """
+
+    def __init__(self, kind="aspect", min_df=2, min_support=3, iterations=100, learning_rate=0.1, l2=1e-4):
+        """
+        Initialize the classifier.
+
+        Args:
+            kind (str): 'aspect' for allowed-aspect polarities, 'category' for ENTITY#ATTRIBUTE polarities.
+            min_df (int): Minimum training documents for an n-gram feature.
+            min_support (int): Minimum training examples for a label to be learned.
+            iterations (int): Optimisation steps.
+            learning_rate (float): Adam step size.
+            l2 (float): L2 penalty.
+        """
+        self.kind = kind
+        self.label_fn = LABEL_FUNCTIONS[kind]
+        self.min_support = min_support
+        self.featuriser = TfidfFeaturiser(min_df)
+        self.model = OneVsRestLogistic(iterations, learning_rate, l2)
+        self.labels = []
+        self.version = None
+
+    def params(self):
+        return [self.kind, self.featuriser.min_df, self.min_support, self.model.iterations,
+                self.model.learning_rate, self.model.l2]
+
+    def fit(self, records):
+        """
+        Train on labelled records from load_quads().
+        """
+        label_sets = [self.label_fn(record) for record in records]
+        support = Counter(label for labels in label_sets for label in labels)
+        self.labels = sorted(label for label, count in support.items() if count >= self.min_support)
+        index = {label: i for i, label in enumerate(self.labels)}
+        Y = np.zeros((len(records), len(self.labels)), dtype=np.float32)
+        for i, labels in enumerate(label_sets):
+            for label in labels & index.keys():
+                Y[i, index[label]] = 1
+        texts = [record["text"] for record in records]
+        self.model.fit(self.featuriser.fit(texts).transform(texts), Y)
+        self.version = hash_inputs(self.params(), records)
+        return self
+
+    def predict(self, texts):
+        """
+        Predict label sets with their confidence.
+
+        Args:
+            texts (list): Review texts.
+
+        Returns:
+            list: (set of labels, confidence in [0.5, 1]) per text.
+        """
+        if not texts:
+            return []
+        probabilities = self.model.predict_proba(self.featuriser.transform(texts))
+        confidences = np.maximum(probabilities, 1 - probabilities).min(axis=1)
+        predictions = []
+        for row, confidence in zip(probabilities, confidences):
+            labels = {self.labels[j] for j in np.flatnonzero(row >= 0.5)}
+            if not labels and self.kind in LABELLED_KINDS:
+                # Every review carries a label in this scheme, so an empty prediction is a miss
+                top = int(row.argmax())
+                labels, confidence = {self.labels[top]}, row[top]
+            predictions.append((labels, float(confidence)))
+        return predictions
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        grams = sorted(self.featuriser.vocabulary, key=self.featuriser.vocabulary.get)
+        with open(path, "wb") as f:
+            np.savez(f, coef=self.model.coef, intercept=self.model.intercept, idf=self.featuriser.idf,
+                     grams=np.array(grams, dtype=object), labels=np.array(self.labels, dtype=object),
+                     version=np.array(self.version))
+
+    def load(self, path):
+        data = np.load(path, allow_pickle=True)
+        self.model.coef, self.model.intercept = data["coef"], data["intercept"]
+        self.featuriser.idf = data["idf"]
+        self.featuriser.vocabulary = {gram: i for i, gram in enumerate(data["grams"].tolist())}
+        self.labels = data["labels"].tolist()
+        self.version = str(data["version"])
+        return self
+
+
+def classifier_version(kind="aspect", train_paths=DEFAULT_TRAIN_PATHS):
+    """
+    Identify a classifier's training data and settings, so outputs it produced are
+    recomputed when either changes.
+    """
+    return hash_inputs([hash_file(path) for path in train_paths], LocalSentimentClassifier(kind).params())
+
+
+_classifiers = {}
+_classifiers_lock = threading.Lock()
+
+
+def get_classifier(kind="aspect"):
+    """
+    Return the shared classifier of a kind, trained on the gold and LLM-labelled quads.
+    The trained weights are cached under MODEL_DIR, keyed by classifier_version().
+
+    Args:
+        kind (str): 'aspect' or 'category'.
+
+    Returns:
+        LocalSentimentClassifier: The trained classifier.
+    """
+    with _classifiers_lock:
+        if kind not in _classifiers:
+            path = os.path.join(MODEL_DIR, f"{kind}_{classifier_version(kind)[:12]}.npz")
+            classifier = LocalSentimentClassifier(kind)
+            if os.path.exists(path):
+                classifier.load(path)
+            else:
+                print(f"Training the local {kind} classifier...")
+                classifier.fit(load_quads(DEFAULT_TRAIN_PATHS))
+                classifier.save(path)
+            _classifiers[kind] = classifier
+        return _classifiers[kind]
+
+
+class SentimentCascade:
+    """
+    Confidence gate in front of an LLM stage: the local classifier answers the reviews
+    it is confident about and the rest are escalated. Counts are thread-safe so one
+    cascade can be shared by concurrent workers.
+    """
+
+    def __init__(self, classifier, threshold=0.7):
+        """
+        Initialize the cascade.
+
+        Args:
+            classifier (LocalSentimentClassifier): Trained classifier.
+            threshold (float): Minimum confidence to answer locally; 1.0 escalates everything.
+        """
+        self.classifier = classifier
+        self.threshold = threshold
+        self.seen = 0
+        self.escalated = 0
+        self._lock = threading.Lock()
+
+    def answer(self, texts):
+        """
+        Answer texts locally where the classifier is confident.
+
+        Args:
+            texts (list): Review texts.
+
+        Returns:
+            list: Predicted label set per text, or None where the text must be escalated.
+        """
+        answers = [labels if confidence >= self.threshold else None
+                   for labels, confidence in self.classifier.predict(texts)]
+        with self._lock:
+            self.seen += len(answers)
+            self.escalated += sum(answer is None for answer in answers)
+        return answers
+
+    def escalation_rate(self):
+        with self._lock:
+            return self.escalated / self.seen if self.seen else 0.0
+
+    def version(self):
+        return hash_inputs(self.classifier.version, self.threshold)
+
+    def report(self):
+        return (f"Local {self.classifier.kind} classifier answered {self.seen - self.escalated} of {self.seen} "
+                f"reviews; escalation rate {self.escalation_rate():.1%} at threshold {self.threshold}.")
+
+
+def evaluate(kind="aspect", thresholds=(0.6, 0.7, 0.8, 0.9), test_path=GOLD_TEST_PATH,
+             llm_path=LLM_LABELLED_PATH):
+    """
+    Measure the cascade on the gold test set against the LLM-only baseline. The
+    classifier is trained on the gold training quads alone, since the LLM-labelled
+    file covers the test texts.
+
+    Args:
+        kind (str): 'aspect' or 'category'.
+        thresholds (iterable): Confidence thresholds to report.
+        test_path (str): Gold quads to score against.
+        llm_path (str): LLM output for the same texts, in the same order.
+
+    Returns:
+        list: One dict per threshold with 'threshold', 'escalation_rate', 'local_accuracy',
+            'llm_accuracy', 'cascade_accuracy' and 'delta'.
+    """
+    with open(test_path, "r", encoding="utf-8") as f:
+        test = [json.loads(line) for line in f]
+    with open(llm_path, "r", encoding="utf-8") as f:
+        llm = [json.loads(line) for line in f]
+    label_fn = LABEL_FUNCTIONS[kind]
+    gold = [label_fn(record) for record in test]
+    llm_labels = [label_fn(load_quads_record(record)) for record in llm]
+
+    classifier = LocalSentimentClassifier(kind).fit(load_quads([GOLD_TRAIN_PATH], exclude_texts=[
+        record["text"] for record in test]))
+    predictions = classifier.predict([record["text"] for record in test])
+    llm_accuracy = float(np.mean([label_accuracy(p, g) for p, g in zip(llm_labels, gold)]))
+    local_accuracy = float(np.mean([label_accuracy(p, g) for (p, _), g in zip(predictions, gold)]))
+
+    report = []
+    for threshold in thresholds:
+        local = [confidence >= threshold for _, confidence in predictions]
+        cascade = [label_accuracy(predicted if is_local else llm_predicted, g)
+                   for (predicted, _), is_local, llm_predicted, g in zip(predictions, local, llm_labels, gold)]
+        cascade_accuracy = float(np.mean(cascade))
+        report.append({
+            "threshold": threshold,
+            "escalation_rate": 1 - sum(local) / len(local),
+            "local_accuracy": local_accuracy,
+            "llm_accuracy": llm_accuracy,
+            "cascade_accuracy": cascade_accuracy,
+            "delta": cascade_accuracy - llm_accuracy,
+        })
+    return report
+
+
+def load_quads_record(record):
+    """
+    Normalise one LLM output record, which may lack labels or hold non-dict labels.
+    """
+    labels = record.get("labels") if isinstance(record, dict) else None
+    return {"labels": [label for label in labels if isinstance(label, dict)] if isinstance(labels, list) else []}
+
+
+if __name__ == "__main__":
+    for kind in LABEL_FUNCTIONS:
+        print(f"=== {kind} labels ===")
+        for row in evaluate(kind):
+            print(f"threshold {row['threshold']:.2f}: escalation {row['escalation_rate']:.1%}, "
+                  f"cascade accuracy {row['cascade_accuracy']:.4f} vs LLM {row['llm_accuracy']:.4f} "
+                  f"(delta {row['delta']:+.4f}); local-only {row['local_accuracy']:.4f}")
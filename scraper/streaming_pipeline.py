@@ -0,0 +1,220 @@
+import os
+import queue
+import shutil
+import threading
+
+from review_scraper import AmazonReviewProcessor
+from review_summariser import ReviewSummariser
+from review_sentiment import SentimentGenerator
+from review_store import ReviewStore
+from pipeline_manifest import hash_inputs
+
+# Marks the end of a stage's input; one is queued per downstream worker
+_DONE = object()
+
+
+class StreamingPipeline:
+    """
+    Runs review scraping, summarising and sentiment analysis as concurrent stages
+    connected by bounded queues, so each product moves on to the next stage as soon
+    as it is ready instead of waiting for the whole brand. Scraping and LLM latency
+    overlap and a brand takes roughly as long as its slowest stage. The bounded queues
+    apply backpressure, so a fast scraper cannot race ahead of the LLM stages.
+    Products are written to the same stores, exports and manifest as run_pipeline().
+    """
+
+    def __init__(self, api_key, brand, review_pages_per_asin=1, scrape_workers=4,
+                 summarise_workers=4, sentiment_workers=4, queue_size=8, manifest=None,
+                 results_dir='./scraper_results', review_index=None, sentiment_generator=None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            api_key (str): ScrapingBee API key.
+            brand (str): Laptop brand being processed.
+            review_pages_per_asin (int): Review pages to scrape per ASIN.
+            scrape_workers (int): Threads scraping ASINs.
+            summarise_workers (int): Threads summarising products.
+            sentiment_workers (int): Threads analysing product sentiments.
+            queue_size (int): Maximum products waiting between two stages.
+            manifest (PipelineManifest, optional): Manifest used to skip unchanged work.
+            results_dir (str): Directory holding the brand's stores and exports.
+            review_index (ReviewIndex, optional): Index that records the IDs of scraped reviews.
+            sentiment_generator (SentimentGenerator, optional): Sentiment stage, e.g. with a
+                cascade or result cache. Defaults to a plain SentimentGenerator.
+        """
+        self.api_key = api_key
+        self.brand = brand
+        self.review_pages_per_asin = review_pages_per_asin
+        self.scrape_workers = scrape_workers
+        self.summarise_workers = summarise_workers
+        self.sentiment_workers = sentiment_workers
+        self.queue_size = queue_size
+        self.manifest = manifest
+        self.results_dir = results_dir
+        self.workspace_root = os.path.join(results_dir, 'work', brand)
+
+        self.review_store = ReviewStore(os.path.join(results_dir, f'{brand}_reviews.jsonl'))
+        self.processed_store = ReviewStore(os.path.join(results_dir, f'{brand}_processed_reviews.jsonl'))
+        self.sentiment_store = ReviewStore(
+            os.path.join(results_dir, 'final', f'{brand}_sentiment_analysis.jsonl')
+        )
+        self.summariser = ReviewSummariser()
+        self.sentiment_generator = sentiment_generator or SentimentGenerator()
+        self.review_index = review_index
+
+    def scrape_entry(self, entry, input_hash):
+        """
+        Scrape one ASIN in its own workspace and merge it into the brand's review store.
+
+        Args:
+            entry (dict): ASIN entry from asins.json.
+            input_hash (str): Digest of the entry and scrape settings.
+
+        Returns:
+            dict or None: The scraped product, or None if nothing was scraped.
+        """
+        asin = entry.get("asin")
+        manifest = self.manifest
+        if manifest and manifest.is_done("scrape", asin, input_hash) and asin in self.review_store:
+            print(f"Product {asin} already scraped; skipping.")
+            return self.review_store.get(asin)
+
+        workspace = os.path.join(self.workspace_root, asin)
+        # Start from a clean workspace so a previous crashed run cannot leak into this one
+        shutil.rmtree(workspace, ignore_errors=True)
+        print(f"\n=== Processing product: {asin} ===")
+        try:
+            processor = AmazonReviewProcessor(
+                api_key=self.api_key,
+                product_info=entry,
+                review_pages=self.review_pages_per_asin,
+                brand=self.brand,
+                output_dir=workspace
+            )
+            processor.process()
+            path = os.path.join(workspace, f"{self.brand}_reviews.jsonl")
+            product = ReviewStore(path).get(asin) if os.path.exists(path) else None
+        except Exception as e:
+            print(f"Failed to process product {asin}: {e}")
+            if manifest:
+                manifest.mark_failed("scrape", asin, input_hash, e)
+            return None
+        finally:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+        if not product:
+            if manifest:
+                manifest.mark_failed("scrape", asin, input_hash, "no product data scraped")
+            return None
+        self.review_store.upsert(product)
+        if self.review_index is not None:
+            self.review_index.add(product["review"], self.brand, asin)
+        if manifest:
+            manifest.mark("scrape", asin, input_hash, output=self.review_store.path)
+        return product
+
+    def _fail(self, stage, product_id, hash_input, error):
+        """
+        Log an item that raised in a stage and record it in the manifest, so one bad
+        product cannot kill its worker and leave the queues blocked.
+        """
+        print(f"Failed to {stage} product {product_id}: {error}")
+        if self.manifest:
+            try:
+                self.manifest.mark_failed(stage, product_id, hash_input(), error)
+            except Exception as e:
+                print(f"Failed to record the {stage} failure of {product_id}: {e}")
+
+    def _scrape_worker(self, entries, out_queue):
+        while True:
+            item = entries.get()
+            if item is _DONE:
+                return
+            entry, input_hash = item
+            try:
+                product = self.scrape_entry(entry, input_hash)
+            except Exception as e:
+                self._fail("scrape", entry.get("asin"), lambda: input_hash, e)
+                continue
+            if product:
+                out_queue.put(product)
+
+    def _summarise_worker(self, in_queue, out_queue):
+        while True:
+            product = in_queue.get()
+            if product is _DONE:
+                return
+            try:
+                laptop = self.summariser.process_product(product, self.processed_store, self.manifest)
+            except Exception as e:
+                self._fail("summarise", product.get("product_id"),
+                           lambda: self.summariser.input_hash(product), e)
+                continue
+            if laptop:
+                out_queue.put(laptop)
+
+    def _sentiment_worker(self, in_queue):
+        while True:
+            laptop = in_queue.get()
+            if laptop is _DONE:
+                return
+            try:
+                self.sentiment_generator.process_product(laptop, self.sentiment_store, self.manifest)
+            except Exception as e:
+                self._fail("sentiment", laptop.get("product_id"),
+                           lambda: self.sentiment_generator.input_hash(laptop), e)
+
+    @staticmethod
+    def _start(count, target, *args):
+        threads = [threading.Thread(target=target, args=args, daemon=True) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    @staticmethod
+    def _finish(threads, out_queue, consumers):
+        # Once every producer has exited, tell each consumer there is nothing more to come
+        for thread in threads:
+            thread.join()
+        for _ in range(consumers):
+            out_queue.put(_DONE)
+
+    def run(self, asins_data):
+        """
+        Stream every ASIN through scraping, summarising and sentiment analysis,
+        then export the legacy JSON files.
+
+        Args:
+            asins_data (list): ASIN entries from asins.json.
+        """
+        entries = queue.Queue()
+        to_summarise = queue.Queue(maxsize=self.queue_size)
+        to_analyse = queue.Queue(maxsize=self.queue_size)
+
+        for entry in asins_data:
+            if not entry or not entry.get("asin"):
+                print("Encountered an entry without an ASIN.")
+                continue
+            entries.put((entry, hash_inputs(entry, self.review_pages_per_asin)))
+        for _ in range(self.scrape_workers):
+            entries.put(_DONE)
+
+        scrapers = self._start(self.scrape_workers, self._scrape_worker, entries, to_summarise)
+        summarisers = self._start(self.summarise_workers, self._summarise_worker, to_summarise, to_analyse)
+        analysers = self._start(self.sentiment_workers, self._sentiment_worker, to_analyse)
+
+        self._finish(scrapers, to_summarise, self.summarise_workers)
+        self._finish(summarisers, to_analyse, self.sentiment_workers)
+        for thread in analysers:
+            thread.join()
+        shutil.rmtree(self.workspace_root, ignore_errors=True)
+
+        for store, name in [
+            (self.review_store, f'{self.brand}_reviews.json'),
+            (self.processed_store, f'{self.brand}_processed_reviews.json'),
+            (self.sentiment_store, os.path.join('final', f'{self.brand}_sentiment_analysis.json')),
+        ]:
+            store.compact()
+            store.export_json(os.path.join(self.results_dir, name))
+        print(f"Streamed {len(self.sentiment_store)} products for {self.brand}")
@@ -0,0 +1,70 @@
+import json
+import unittest
+
+from aspect_lexicon import AspectLexicon, category_aspects, get_lexicon
+from review_sentiment import SentimentGenerator
+
+
+class RecordingSentimentGenerator(SentimentGenerator):
+    """Answers batch prompts locally and records which reviews reached the LLM."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sent = []
+
+    def _get_responses(self, sysprompt, prompts):
+        responses = []
+        for prompt in prompts:
+            items = json.loads(prompt)
+            self.sent.extend(item["review_text"] for item in items)
+            responses.append(json.dumps({"results": [
+                {"id": item["id"], "pos_aspects": ["DISPLAY"], "neg_aspects": []} for item in items
+            ]}))
+        return responses
+
+
+class TestAspectLexicon(unittest.TestCase):
+    """Unit tests for the trie-based aspect pre-filter."""
+
+    def test_category_mapping(self):
+        """Entities and attributes map to allowed aspects; service categories map to none."""
+        self.assertEqual(category_aspects("DISPLAY#QUALITY"), {"DISPLAY", "BUILD_QUALITY"})
+        self.assertEqual(category_aspects("LAPTOP#PRICE"), {"PRICE"})
+        self.assertEqual(category_aspects("SUPPORT#QUALITY"), set())
+        self.assertEqual(category_aspects("LAPTOP#GENERAL"), set())
+
+    def test_whole_word_and_phrase_matches(self):
+        """Terms match whole words, including multi-word terms and simple plurals."""
+        lexicon = AspectLexicon({"screen": {"DISPLAY"}, "battery life": {"BATTERY"}, "screens": {"DISPLAY"}})
+        self.assertEqual(lexicon.candidate_aspects("The Screen is sharp"), {"DISPLAY"})
+        self.assertEqual(lexicon.candidate_aspects("great battery life!"), {"BATTERY"})
+        self.assertEqual(lexicon.candidate_aspects("two screens"), {"DISPLAY"})
+        self.assertFalse(lexicon.has_aspect("screenshot tool works"))
+        self.assertFalse(lexicon.has_aspect("battery"))
+
+    def test_learned_lexicon_skips_generic_reviews(self):
+        """The lexicon learned from the training quads ignores generic praise."""
+        lexicon = get_lexicon()
+        self.assertIn("DISPLAY", lexicon.candidate_aspects("the display is gorgeous"))
+        self.assertIn("PRICE", lexicon.candidate_aspects("worth every penny"))
+        self.assertFalse(lexicon.has_aspect("Love it, great laptop!"))
+
+    def test_generator_routes_skipped_reviews_to_empty_results(self):
+        """Reviews without candidate aspects never reach the LLM and count towards the skip rate."""
+        laptop = {"review": [
+            {"star_rating": "5.0 out of 5 stars", "review_text": "the screen is bright"},
+            {"star_rating": "5.0 out of 5 stars", "review_text": "Love it!"},
+        ]}
+        generator = RecordingSentimentGenerator()
+        sentiments = generator.analyse_product(laptop)
+        self.assertEqual(generator.sent, ["the screen is bright"])
+        self.assertEqual(sentiments["pos_5_aspects"], ["DISPLAY"])
+        self.assertEqual(generator.skip_rate(), 0.5)
+
+        unfiltered = RecordingSentimentGenerator(prefilter=False)
+        unfiltered.analyse_product(laptop)
+        self.assertEqual(len(unfiltered.sent), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import asyncio
+import contextlib
+import unittest
+
+from async_fetcher import AsyncPageFetcher
+
+
+class StubClient:
+    """Serves page bodies from a dict after a short delay and tracks requests in flight."""
+
+    def __init__(self, pages, delay=0.01):
+        self.pages = pages
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @contextlib.asynccontextmanager
+    async def async_session(self):
+        yield None
+
+    async def get_async(self, session, url, cookies=None, fresh=False):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return self.pages.get(url)
+        finally:
+            self.in_flight -= 1
+
+
+def fail_on_bad(content):
+    if content == b"bad":
+        raise ValueError("unparseable page")
+    return content.decode()
+
+
+class TestAsyncPageFetcher(unittest.TestCase):
+    """Unit tests for the concurrent page fetcher."""
+
+    def test_concurrency_is_capped(self):
+        """No more than max_concurrency requests are in flight, and every page is delivered."""
+        pages = {f"u{i}": f"page {i}".encode() for i in range(12)}
+        client = StubClient(pages)
+        seen = {}
+        AsyncPageFetcher(client, max_concurrency=3).run(
+            [(url, url) for url in pages], lambda key, content: seen.update({key: content}))
+        self.assertEqual(seen, pages)
+        self.assertEqual(client.max_in_flight, 3)
+
+    def test_follow_ups_are_scheduled_from_on_page(self):
+        """Pairs returned by on_page are fetched in the same crawl, with their own keys."""
+        client = StubClient({f"p{i}": b"page" for i in range(1, 5)})
+        order = []
+
+        def on_page(key, content):
+            order.append(key)
+            return [(key + 1, f"p{key + 1}")] if key < 4 else None
+
+        AsyncPageFetcher(client).run([(1, "p1")], on_page)
+        self.assertEqual(order, [1, 2, 3, 4])
+
+    def test_failures_reach_on_page_and_do_not_abort_crawl(self):
+        """Parse and callback errors fail their own page only; the crawl keeps draining."""
+        client = StubClient({"u1": b"one", "u2": b"bad", "u3": b"three"})
+        seen = {}
+
+        def on_page(key, content):
+            seen[key] = content
+            if key == 3:
+                raise RuntimeError("callback failed")
+
+        AsyncPageFetcher(client).run([(1, "u1"), (2, "u2"), (3, "u3"), (4, "missing")], on_page, parse=fail_on_bad)
+        self.assertEqual(seen, {1: "one", 2: None, 3: "three", 4: None})
+
+
+if __name__ == "__main__":
+    unittest.main()
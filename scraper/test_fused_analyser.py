@@ -0,0 +1,104 @@
+import os
+import json
+import tempfile
+import unittest
+
+from fused_analyser import FusedAnalyser, FUSED_PROMPT
+from pipeline_manifest import PipelineManifest
+from review_store import ReviewStore
+from review_summariser import ReviewSummariser
+
+
+class StubSummariser:
+    def __init__(self):
+        self.calls = 0
+
+    def summarise_product(self, laptop):
+        self.calls += 1
+        return "The laptop is summarised separately."
+
+    def prompt_hash(self):
+        return "split"
+
+
+class ScriptedAnalyser(FusedAnalyser):
+    """Answers fused prompts locally with a configurable summary."""
+
+    def __init__(self, summary, **kwargs):
+        super().__init__(summariser=StubSummariser(), **kwargs)
+        self.summary = summary
+        self.requests = []
+
+    def _get_responses(self, sysprompt, prompts):
+        self.requests.append((sysprompt, len(prompts)))
+        return [json.dumps({"summary": self.summary, "results": [
+            {"id": item["id"], "pos_aspects": ["DISPLAY"], "neg_aspects": []} for item in json.loads(prompt)
+        ]}) for prompt in prompts]
+
+
+class TestFusedAnalyser(unittest.TestCase):
+    """Unit tests for the fused summary and sentiment stage."""
+
+    laptop = {"review": [{"star_rating": "4.0 out of 5 stars", "review_text": f"nice screen {i}"}
+                         for i in range(5)]}
+
+    def test_one_request_returns_summary_and_sentiments(self):
+        """A valid fused response yields both outputs without touching the split path."""
+        analyser = ScriptedAnalyser("The laptop has a nice screen.")
+        summary, sentiments = analyser.analyse_product(self.laptop)
+        self.assertEqual(summary, "The laptop has a nice screen.")
+        self.assertEqual(sentiments["pos_4_aspects"], ["DISPLAY"] * 5)
+        self.assertEqual(analyser.requests, [(FUSED_PROMPT, 1)])
+        self.assertEqual(analyser.summariser.calls, 0)
+
+    def test_invalid_summary_falls_back_to_split_path(self):
+        """A summary that fails validation is regenerated by the summariser; sentiments are kept."""
+        analyser = ScriptedAnalyser("Great screen!")
+        summary, sentiments = analyser.analyse_product(self.laptop)
+        self.assertEqual(summary, "The laptop is summarised separately.")
+        self.assertEqual(sentiments["pos_4_aspects"], ["DISPLAY"] * 5)
+        self.assertEqual(analyser.summariser.calls, 1)
+
+    def test_fused_sentiments_are_not_reused_by_split_path(self):
+        """Fused results are recorded under their own hash, so the split stage recomputes them."""
+        analyser = ScriptedAnalyser("The laptop has a nice screen.")
+        laptop = dict(self.laptop, product_id="A1")
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = PipelineManifest(os.path.join(tmp, "manifest.jsonl"))
+            sentiment_store = ReviewStore(os.path.join(tmp, "sentiments.jsonl"))
+            analyser.summariser.input_hash = lambda laptop: "summary"
+            analyser.summariser.save_summary = lambda laptop, *args, **kwargs: laptop
+            analyser.process_product(dict(laptop), ReviewStore(os.path.join(tmp, "processed.jsonl")),
+                                     sentiment_store, manifest)
+            generator = analyser.sentiment_generator
+            self.assertTrue(manifest.is_done("sentiment", "A1", analyser.sentiment_hash(laptop)))
+            self.assertFalse(manifest.is_done("sentiment", "A1", generator.input_hash(laptop)))
+            entry = manifest.get("sentiment", "A1")
+            self.assertIsNone(generator.plan_update(laptop, sentiment_store.get("A1"), entry))
+
+    def test_fused_summary_is_not_reused_or_extended_by_split_path(self):
+        """Fused summaries are recorded under their own hashes; an unchanged product skips both stages."""
+        analyser = ScriptedAnalyser("The laptop has a nice screen.")
+        analyser.summariser = ReviewSummariser()
+        laptop = dict(self.laptop, product_id="A1")
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = PipelineManifest(os.path.join(tmp, "manifest.jsonl"))
+            processed_store = ReviewStore(os.path.join(tmp, "processed.jsonl"))
+            sentiment_store = ReviewStore(os.path.join(tmp, "sentiments.jsonl"))
+            analyser.process_product(dict(laptop), processed_store, sentiment_store, manifest)
+            summariser = analyser.summariser
+            self.assertTrue(manifest.is_done("summarise", "A1", analyser.summary_hash(laptop)))
+            self.assertFalse(manifest.is_done("summarise", "A1", summariser.input_hash(laptop)))
+            grown = dict(laptop, review=laptop["review"] + [{"star_rating": "5.0 out of 5 stars",
+                                                             "review_text": "fast"}])
+            entry = manifest.get("summarise", "A1")
+            self.assertIsNone(summariser.plan_update(grown, processed_store.get("A1"), entry))
+
+            result = analyser.process_product(dict(laptop), processed_store, sentiment_store, manifest)
+            self.assertEqual(analyser.requests, [(FUSED_PROMPT, 1)])
+            self.assertEqual(result["review_summary"], "The laptop has a nice screen.")
+            self.assertEqual(result["review_sentiments"]["pos_4_aspects"], ["DISPLAY"] * 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import json
+import tempfile
+import unittest
+
+from llm_batch import BatchRunner, LocalBatchBackend, request_line, write_shards
+from review_result_cache import ReviewResultCache
+from review_sentiment import SentimentGenerator
+from review_store import ReviewStore
+
+
+def respond(body):
+    """Answers batch sentiment prompts with BATTERY for every review except 'bad' ones."""
+    items = json.loads(body["messages"][-1]["content"])
+    return json.dumps({"results": [
+        {"id": item["id"], "pos_aspects": ["BATTERY"], "neg_aspects": []}
+        for item in items if "bad" not in item["review_text"]
+    ]})
+
+
+class FallbackSentimentGenerator(SentimentGenerator):
+    """Answers synchronous retries locally and records them."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sync_prompts = []
+
+    def _get_responses(self, sysprompt, prompts):
+        self.sync_prompts.extend(prompts)
+        return [json.dumps({"pos_5_aspects": ["PRICE"]}) for _ in prompts]
+
+
+class TestLLMBatch(unittest.TestCase):
+    """Unit tests for batch request files and the batch sentiment path."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_shards_split_on_request_limit(self):
+        """Shards hold at most max_requests lines and keep every request once."""
+        requests = [request_line(f"r{i}", "m", [{"role": "user", "content": str(i)}]) for i in range(5)]
+        paths = write_shards(requests, self.tmp.name, max_requests=2)
+        self.assertEqual(len(paths), 3)
+        ids = []
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                ids.extend(json.loads(line)["custom_id"] for line in f)
+        self.assertEqual(ids, [f"r{i}" for i in range(5)])
+
+    def test_runner_maps_results_and_failures_by_custom_id(self):
+        """Successful results come back by custom_id; failed requests map to None."""
+        def echo(body):
+            if body["messages"][0]["content"] == "fail":
+                raise RuntimeError("boom")
+            return body["messages"][0]["content"].upper()
+
+        requests = [request_line(cid, "m", [{"role": "user", "content": text}])
+                    for cid, text in [("a", "x"), ("b", "fail")]]
+        runner = BatchRunner(LocalBatchBackend(echo), work_dir=self.tmp.name, poll_interval=0)
+        self.assertEqual(runner.run(requests), {"a": "X", "b": None})
+
+    def test_batch_sentiments_match_sync_shape(self):
+        """The batch path stores the same aggregated keys, retrying dropped reviews synchronously."""
+        laptop = {"product_id": "B0TEST", "review": [
+            {"star_rating": "5.0 out of 5 stars", "review_text": f"good battery {i}"} for i in range(3)
+        ] + [{"star_rating": "5.0 out of 5 stars", "review_text": "bad one, battery died"}]}
+        store = ReviewStore(os.path.join(self.tmp.name, "hp_sentiment_analysis.jsonl"))
+        generator = FallbackSentimentGenerator()
+        generator.run_batch([laptop], store, backend=LocalBatchBackend(respond),
+                            work_dir=os.path.join(self.tmp.name, "batches"))
+        sentiments = store.get("B0TEST")["review_sentiments"]
+        self.assertEqual(len(sentiments), 10)
+        self.assertEqual(sentiments["pos_5_aspects"], ["BATTERY"] * 3 + ["PRICE"])
+        # only the dropped review is retried synchronously
+        self.assertTrue(generator.sync_prompts)
+        self.assertTrue(all("bad one" in prompt and "good" not in prompt for prompt in generator.sync_prompts))
+
+    def test_batch_path_applies_prefilter_and_result_cache(self):
+        """Batch mode sends neither reviews the lexicon answers nor cached phrasings, and fills the cache."""
+        sent = []
+
+        def recording(body):
+            sent.extend(item["review_text"] for item in json.loads(body["messages"][-1]["content"]))
+            return respond(body)
+
+        cache = ReviewResultCache(os.path.join(self.tmp.name, "results.sqlite"), verify_rate=0)
+        cache.add("good battery life", 5, (["BATTERY"], []))
+        laptop = {"product_id": "B0TEST", "review": [
+            {"star_rating": "5.0 out of 5 stars", "review_text": text}
+            for text in ["good battery life!", "arrived on time", "the fan is loud under load"]
+        ]}
+        store = ReviewStore(os.path.join(self.tmp.name, "hp_sentiment_analysis.jsonl"))
+        generator = FallbackSentimentGenerator(result_cache=cache)
+        generator.run_batch([laptop], store, backend=LocalBatchBackend(recording),
+                            work_dir=os.path.join(self.tmp.name, "batches"))
+        self.assertEqual(sent, ["the fan is loud under load"])
+        self.assertEqual(store.get("B0TEST")["review_sentiments"]["pos_5_aspects"], ["BATTERY", "BATTERY"])
+        self.assertIsNotNone(cache.lookup("The fan is loud under load", 5))
+
+
+if __name__ == "__main__":
+    unittest.main()
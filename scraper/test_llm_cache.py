@@ -0,0 +1,70 @@
+import os
+import asyncio
+import tempfile
+import unittest
+
+from llm_cache import LLMCache, prompt_version
+from llm_pool import LLMPool
+
+
+class TestLLMCache(unittest.TestCase):
+    """Unit tests for the LLM response cache and request coalescing."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = LLMCache(os.path.join(self.tmp.name, "llm_cache.sqlite"))
+        self.messages = [{"role": "user", "content": "battery is great"}]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_and_stats(self):
+        """A stored response is returned for the same request only."""
+        key = self.cache.key_for("gpt-4o-mini", "v1", self.messages)
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, "gpt-4o-mini", "v1", "positive")
+        self.assertEqual(self.cache.get(key), "positive")
+        self.assertNotEqual(key, self.cache.key_for("gpt-4o", "v1", self.messages))
+        self.assertNotEqual(key, self.cache.key_for("gpt-4o-mini", "v2", self.messages))
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+
+    def test_invalidate_by_prompt_version(self):
+        """Invalidating a prompt version keeps other versions' entries."""
+        old, new = prompt_version("old prompt"), prompt_version("new prompt")
+        for version in (old, new):
+            self.cache.put(self.cache.key_for("m", version, self.messages), "m", version, "r")
+        self.assertEqual(self.cache.invalidate(version=old), 1)
+        self.assertIsNotNone(self.cache.get(self.cache.key_for("m", new, self.messages)))
+
+    def test_evicts_least_recently_used_past_cap(self):
+        """Entries past the size cap are evicted oldest-access first."""
+        cache = LLMCache(os.path.join(self.tmp.name, "small.sqlite"), max_bytes=25)
+        keys = [cache.key_for("m", "v", [{"role": "user", "content": str(i)}]) for i in range(3)]
+        cache.put(keys[0], "m", "v", "x" * 10)
+        cache.put(keys[1], "m", "v", "x" * 10)
+        cache.get(keys[0])
+        cache.put(keys[2], "m", "v", "x" * 10)
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(keys[0]))
+
+    def test_identical_in_flight_requests_share_one_call(self):
+        """Concurrent identical requests make one API call; a rerun makes none."""
+        os.environ.setdefault("OPENAI_API_KEY", "test")
+        pool = LLMPool(cache=self.cache)
+        calls = []
+
+        async def complete(messages, model, **kwargs):
+            calls.append(messages)
+            await asyncio.sleep(0.05)
+            return "positive"
+
+        pool.complete = complete
+        self.assertEqual(pool.chat_many([self.messages] * 5, "m", version="v"), ["positive"] * 5)
+        self.assertEqual(pool.chat(self.messages, "m", version="v"), "positive")
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.cache.stats()["coalesced"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import time
+import asyncio
+import tempfile
+import unittest
+from unittest import mock
+from types import SimpleNamespace
+
+from llm_cache import LLMCache
+from llm_pool import LLMPool, TokenBucket
+
+
+class TestLLMPool(unittest.TestCase):
+    """Unit tests for the shared LLM client's rate limiting."""
+
+    def test_bucket_allows_burst_then_waits(self):
+        """A full bucket serves its capacity at once, then refills at its rate."""
+        async def take_all():
+            bucket = TokenBucket(per_minute=600, capacity=5)  # 10 tokens per second
+            start = time.monotonic()
+            for _ in range(5):
+                await bucket.take(1)
+            burst = time.monotonic() - start
+            await bucket.take(2)
+            return burst, time.monotonic() - start
+
+        burst, total = asyncio.run(take_all())
+        self.assertLess(burst, 0.05)
+        self.assertGreaterEqual(total, 0.15)
+
+    def test_oversized_take_is_clamped(self):
+        """A request larger than the bucket still runs once the bucket is full."""
+        async def take():
+            await TokenBucket(per_minute=60, capacity=10).take(1000)
+
+        asyncio.run(asyncio.wait_for(take(), timeout=1))
+
+    def test_retry_delay_prefers_server_hint(self):
+        """The retry-after-ms header wins over exponential backoff, capped at backoff_cap."""
+        pool = LLMPool(backoff_cap=5.0)
+        hinted = SimpleNamespace(response=SimpleNamespace(headers={"retry-after-ms": "250"}))
+        self.assertAlmostEqual(pool.retry_delay(0, hinted), 0.25)
+        capped = SimpleNamespace(response=SimpleNamespace(headers={"retry-after": "600"}))
+        self.assertEqual(pool.retry_delay(0, capped), 5.0)
+        self.assertLessEqual(pool.retry_delay(10, Exception()), 5.0)
+
+    def test_empty_response_resolves_without_caching(self):
+        """A None response (refusal or content filter) resolves every waiter and is not cached."""
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.dict(os.environ, {"OPENAI_API_KEY": "key"}):
+            cache = LLMCache(os.path.join(tmp, "cache.sqlite"))
+            pool = LLMPool(cache=cache)
+
+            async def complete(messages, model, **kwargs):
+                await asyncio.sleep(0.05)
+                return None
+
+            pool.complete = complete
+            messages = [{"role": "user", "content": "hi"}]
+            first, duplicate = pool.submit(messages, "model"), pool.submit(messages, "model")
+            self.assertIsNone(first.result(timeout=5))
+            self.assertIsNone(duplicate.result(timeout=5))
+            self.assertIsNone(cache.get(cache.key_for("model", "", messages)))
+
+    def test_chat_many_can_return_errors_in_place(self):
+        """With return_exceptions, one failed request does not discard the other responses."""
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "key"}):
+            pool = LLMPool()
+
+            async def complete(messages, model, **kwargs):
+                if messages[0]["content"] == "bad":
+                    raise ValueError("context length exceeded")
+                return messages[0]["content"]
+
+            pool.complete = complete
+            message_lists = [[{"role": "user", "content": text}] for text in ("a", "bad", "b")]
+            responses = pool.chat_many(message_lists, "model", return_exceptions=True)
+            self.assertEqual(responses[::2], ["a", "b"])
+            self.assertIsInstance(responses[1], ValueError)
+            with self.assertRaises(ValueError):
+                pool.chat_many(message_lists, "model")
+
+
+if __name__ == "__main__":
+    unittest.main()
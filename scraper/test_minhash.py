@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+
+from minhash import MinHasher, candidate_pairs, dedupe
+
+FULL = ("The screen is bright and the keyboard feels solid, though the battery could last longer "
+        "on a single charge and the speakers are tinny.")
+
+
+class TestMinHash(unittest.TestCase):
+    """Unit tests for vectorised MinHash signatures and near-duplicate detection."""
+
+    def test_batch_signatures_match_single(self):
+        """Signing a corpus at once gives the same signatures as signing each text alone."""
+        hasher = MinHasher()
+        texts = ["Great laptop for the price", "ok", "", FULL]
+        batch = hasher.signatures(texts)
+        for text, signature in zip(texts, batch):
+            self.assertTrue(np.array_equal(signature, hasher.signature(text)))
+
+    def test_candidate_pairs_respect_partition(self):
+        """Identical signatures pair up, but never across partitions."""
+        signatures = MinHasher().signatures(["Battery dies fast"] * 3)
+        left, right = candidate_pairs(signatures)
+        self.assertEqual(sorted(zip(left.tolist(), right.tolist())), [(0, 1), (0, 2)])
+        left, right = candidate_pairs(signatures, partition=np.array([0, 1, 0]))
+        self.assertEqual(list(zip(left.tolist(), right.tolist())), [(0, 2)])
+
+    def test_near_duplicates_collapse_to_longest(self):
+        """Formatting variants and truncated copies are dropped; distinct reviews are kept."""
+        texts = [
+            FULL[:70] + "... Read more",
+            "Battery dies fast",
+            FULL,
+            "  the SCREEN is bright and the keyboard feels solid,though the battery could last longer "
+            "on a single charge and the speakers are tinny!!",
+            "Battery died fast",
+        ]
+        self.assertEqual(dedupe(texts), [1, 2, 4])
+
+    def test_partition_and_threshold(self):
+        """Partitions keep copies on different products; a stricter threshold keeps light edits."""
+        edited = FULL.replace("tinny", "quite tinny")
+        self.assertEqual(dedupe([FULL, FULL], partition=["a", "b"]), [0, 1])
+        self.assertEqual(dedupe([FULL, edited], threshold=0.8), [1])
+        self.assertEqual(dedupe([FULL, edited], threshold=0.99), [0, 1])
+        self.assertEqual(dedupe([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
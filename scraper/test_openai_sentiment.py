@@ -0,0 +1,81 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+from unittest import mock
+from concurrent.futures import Future
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "llm"))
+from openai_sentiment import OpenAISentiment, SentimentPromptType
+
+
+class StubPool:
+    """Answers each line with a fixed record, failing texts listed in fail, and records requests."""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.requested = []
+
+    def submit(self, messages, model, version=""):
+        text = messages[0]["content"].rsplit("**Your Turn**: ", 1)[1]
+        self.requested.append(text)
+        future = Future()
+        if text in self.fail:
+            future.set_exception(RuntimeError("request failed"))
+        else:
+            future.set_result(f"```json\n{json.dumps({'text': text, 'labels': []})}\n```")
+        return future
+
+
+class TestOpenAISentiment(unittest.TestCase):
+    """Unit tests for concurrent, resumable sentiment output."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input = os.path.join(self.tmp.name, "input.jsonl")
+        self.output = os.path.join(self.tmp.name, "output.jsonl")
+        self.texts = [f"text {i}" for i in range(6)]
+        with open(self.input, "w") as f:
+            f.writelines(json.dumps({"text": text}) + "\n" for text in self.texts)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_sentiment(self, pool, model="gpt-4o-mini", sysprompt=SentimentPromptType.COT):
+        with mock.patch("openai_sentiment.get_pool", return_value=pool):
+            OpenAISentiment(self.input, self.output, model=model).get_sentiment(sysprompt, max_in_flight=2)
+        with open(self.output) as f:
+            return [json.loads(line) for line in f]
+
+    def test_resume_retries_errors_and_torn_lines_in_order(self):
+        """Failed and torn lines are re-requested on the next run; the output stays in input order."""
+        records = self.run_sentiment(StubPool(fail={"text 2"}))
+        self.assertEqual([record["text"] for record in records], self.texts)
+        self.assertEqual(records[2]["error"], "request failed")
+
+        with open(self.output) as f:
+            lines = f.readlines()
+        with open(self.output, "w") as f:
+            f.writelines(lines[:4] + [lines[4][:10]])
+
+        pool = StubPool()
+        records = self.run_sentiment(pool)
+        self.assertEqual(pool.requested, ["text 2", "text 4", "text 5"])
+        self.assertEqual(records, [{"text": text, "labels": []} for text in self.texts])
+
+    def test_other_settings_start_afresh(self):
+        """Output from another model or prompt is not reused."""
+        self.run_sentiment(StubPool())
+        pool = StubPool()
+        self.run_sentiment(pool)
+        self.assertEqual(pool.requested, [])
+
+        for settings in ({"model": "o1-mini"}, {"model": "o1-mini", "sysprompt": SentimentPromptType.N_SHOT}):
+            pool = StubPool()
+            self.assertEqual(len(self.run_sentiment(pool, **settings)), len(self.texts))
+            self.assertEqual(pool.requested, self.texts)
+
+
+if __name__ == "__main__":
+    unittest.main()
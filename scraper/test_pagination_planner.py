@@ -0,0 +1,50 @@
+import unittest
+
+from pagination_planner import PaginationPlanner
+
+
+class TestPaginationPlanner(unittest.TestCase):
+    """Unit tests for the star-filtered review page planner."""
+
+    def test_initial_plan_covers_quotas(self):
+        """Each star gets the fewest full pages that cover its quota; zero quotas get none."""
+        planner = PaginationPlanner({"5_star": 7, "4_star": 23, "3_star": 0}, max_pages=5)
+        self.assertEqual(
+            sorted(planner.initial_pages()),
+            [("4_star", 1), ("4_star", 2), ("4_star", 3), ("5_star", 1)],
+        )
+
+    def test_full_pages_need_no_follow_up(self):
+        """A quota met by its planned page issues nothing more."""
+        planner = PaginationPlanner({"5_star": 7})
+        planner.initial_pages()
+        self.assertEqual(planner.on_page("5_star", 1, 7, 10), [])
+        self.assertEqual(planner.pages_requested(), 1)
+
+    def test_short_page_triggers_next_page(self):
+        """A short page that leaves the quota unmet requests the next page."""
+        planner = PaginationPlanner({"5_star": 7})
+        planner.initial_pages()
+        self.assertEqual(planner.on_page("5_star", 1, 4, 4), [("5_star", 2)])
+
+    def test_speculative_prefetch(self):
+        """Speculative mode prefetches while other planned pages are still in flight."""
+        quotas = {"5_star": 15}
+        waiting = PaginationPlanner(quotas)
+        waiting.initial_pages()
+        self.assertEqual(waiting.on_page("5_star", 1, 8, 8), [])
+
+        eager = PaginationPlanner(quotas, speculative=True)
+        eager.initial_pages()
+        self.assertEqual(eager.on_page("5_star", 1, 8, 8), [("5_star", 3)])
+
+    def test_empty_page_and_max_pages_stop_paging(self):
+        """An empty page ends a star's listing, and max_pages caps follow-ups."""
+        planner = PaginationPlanner({"5_star": 7, "1_star": 7}, max_pages=1)
+        planner.initial_pages()
+        self.assertEqual(planner.on_page("5_star", 1, 0, 0), [])
+        self.assertEqual(planner.on_page("1_star", 1, 3, 3), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import time
+import asyncio
+import threading
+import unittest
+
+from parse_pool import ParsePool
+
+
+def slow_length(content, delay=0.3):
+    time.sleep(delay)
+    return len(content)
+
+
+def reject(content):
+    raise ValueError(f"cannot parse {content!r}")
+
+
+class TestParsePool(unittest.TestCase):
+    """Unit tests for the bounded process pool that parses fetched pages."""
+
+    def setUp(self):
+        self.pool = ParsePool(workers=1, max_pending=2)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_submitters_block_once_max_pending_is_reached(self):
+        """A submit beyond max_pending waits until an outstanding parse finishes."""
+        futures = [self.pool.submit(slow_length, b"page") for _ in range(2)]
+        submitted = threading.Event()
+        thread = threading.Thread(target=lambda: (self.pool.submit(slow_length, b"next", 0), submitted.set()))
+        thread.start()
+        self.assertFalse(submitted.wait(0.1))
+        self.assertEqual(futures[0].result(timeout=10), 4)
+        self.assertTrue(submitted.wait(10))
+        thread.join()
+
+    def test_worker_errors_reach_the_caller_and_free_their_slot(self):
+        """A parse error is raised from the future and from run(); later pages still get slots."""
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                self.pool.submit(reject, b"bad").result(timeout=10)
+        with self.assertRaises(ValueError):
+            asyncio.run(self.pool.run(reject, b"bad"))
+        self.assertEqual(asyncio.run(self.pool.run(slow_length, b"good", 0)), 4)
+
+    def test_inline_pool_parses_in_the_calling_thread(self):
+        """With no workers, results and errors come back without starting processes."""
+        pool = ParsePool(workers=0)
+        self.assertEqual(pool.submit(len, b"abc").result(), 3)
+        with self.assertRaises(ValueError):
+            pool.submit(reject, b"bad").result()
+        self.assertIsNone(pool._executor)
+
+
+if __name__ == "__main__":
+    unittest.main()
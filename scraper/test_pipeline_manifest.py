@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+
+from pipeline_manifest import PipelineManifest, hash_inputs, hash_file
+
+
+class TestPipelineManifest(unittest.TestCase):
+    """Unit tests for the per-stage input-hash manifest."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "state", "manifest.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_entries_round_trip_on_reopen(self):
+        """Done and failed entries survive a reopen; the latest entry per stage and item wins."""
+        manifest = PipelineManifest(self.path)
+        manifest.mark("summarise", "A1", "h1", output="out.jsonl", review_hashes=["r1"])
+        manifest.mark_failed("sentiment", "A1", "h2", ValueError("rate limited"))
+        manifest.mark("scrape", "A2", "old")
+        manifest.mark("scrape", "A2", "new")
+
+        reopened = PipelineManifest(self.path)
+        self.assertTrue(reopened.is_done("summarise", "A1", "h1"))
+        self.assertFalse(reopened.is_done("summarise", "A1", "changed"))
+        self.assertFalse(reopened.is_done("sentiment", "A1", "h2"))
+        self.assertEqual(reopened.get("sentiment", "A1")["error"], "rate limited")
+        self.assertEqual(reopened.get("summarise", "A1")["review_hashes"], ["r1"])
+        self.assertTrue(reopened.is_done("scrape", "A2", "new"))
+        self.assertFalse(reopened.is_done("scrape", "A2", "old"))
+        self.assertEqual(reopened.summary("sentiment"), {"failed": 1})
+
+    def test_torn_last_line_is_ignored(self):
+        """An interrupted write leaves earlier entries readable."""
+        PipelineManifest(self.path).mark("scrape", "A1", "h1")
+        with open(self.path, "a") as f:
+            f.write('{"stage": "scrape", "item": "A2"')
+        self.assertTrue(PipelineManifest(self.path).is_done("scrape", "A1", "h1"))
+
+    def test_hashes_are_stable(self):
+        """Input hashes do not depend on dict order; missing files hash to None."""
+        self.assertEqual(hash_inputs({"a": 1, "b": 2}), hash_inputs({"b": 2, "a": 1}))
+        self.assertNotEqual(hash_inputs("a", "b"), hash_inputs("ab"))
+        self.assertIsNone(hash_file(os.path.join(self.tmp.name, "missing")))
+
+
+if __name__ == "__main__":
+    unittest.main()
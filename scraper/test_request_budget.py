@@ -0,0 +1,81 @@
+import asyncio
+import unittest
+from unittest import mock
+from types import SimpleNamespace
+
+from request_budget import RequestBudget, CreditBudgetExceeded
+from scrapingbee_client import ScrapingBeeClient
+
+
+class StubSession:
+    """Replays status codes for blocking requests and records each call."""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        status = self.statuses.pop(0)
+        return SimpleNamespace(status_code=status, content=f"body {status}".encode(), headers={})
+
+
+class TestRequestBudget(unittest.TestCase):
+    """Unit tests for the global ScrapingBee slot and credit limit."""
+
+    def test_credits_are_charged_until_exhausted(self):
+        """Each charge costs credits_per_request; the one that would overshoot is refused."""
+        budget = RequestBudget(max_credits=10, credits_per_request=5)
+        budget.charge()
+        budget.charge()
+        with self.assertRaises(CreditBudgetExceeded):
+            budget.charge()
+        self.assertEqual(budget.credits_used, 10)
+
+    def test_slots_cap_requests_in_flight(self):
+        """Slots are shared between blocking and async callers and come back on release."""
+        budget = RequestBudget(max_in_flight=2)
+
+        async def take_slots():
+            budget.acquire()
+            await budget.acquire_async()
+            waiter = asyncio.create_task(budget.acquire_async())
+            await asyncio.sleep(0.05)
+            self.assertFalse(waiter.done())
+            budget.release()
+            await asyncio.wait_for(waiter, timeout=1)
+
+        asyncio.run(take_slots())
+        self.assertEqual(budget.credits_used, 0)
+
+    def test_cancelled_waiter_does_not_leak_a_slot(self):
+        """A task cancelled while waiting for a slot leaves every slot available."""
+        budget = RequestBudget(max_in_flight=1)
+
+        async def cancel_waiter():
+            await budget.acquire_async()
+            waiter = asyncio.create_task(budget.acquire_async())
+            await asyncio.sleep(0.05)
+            waiter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+            budget.release()
+            await asyncio.wait_for(budget.acquire_async(), timeout=1)
+
+        asyncio.run(cancel_waiter())
+
+    def test_client_charges_once_per_page_and_frees_slots(self):
+        """Retries of one page cost one charge; every attempt returns its slot; an exhausted budget skips the page."""
+        budget = RequestBudget(max_in_flight=1, max_credits=5, credits_per_request=5)
+        client = ScrapingBeeClient(api_key="key", budget=budget)
+        client._session = StubSession([503, 200])
+        with mock.patch("scrapingbee_client.time.sleep"):
+            self.assertEqual(client.get("https://www.amazon.com/dp/X"), b"body 200")
+            self.assertIsNone(client.get("https://www.amazon.com/dp/Y"))
+        self.assertEqual(budget.credits_used, 5)
+        self.assertEqual(client._session.calls, 2)
+        self.assertTrue(budget._slots.acquire(blocking=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
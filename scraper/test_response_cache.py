@@ -0,0 +1,66 @@
+import os
+import time
+import tempfile
+import unittest
+
+from response_cache import ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+    """Unit tests for the on-disk scraped page cache."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip(self):
+        """Stored bodies come back byte-identical and count as hits."""
+        cache = ResponseCache(self.cache_dir)
+        key = cache.key_for("https://www.amazon.com/dp/X", {"cookies": "c"})
+        self.assertIsNone(cache.get(key))
+        cache.put(key, b"<html>page</html>")
+        self.assertEqual(cache.get(key), b"<html>page</html>")
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_key_ignores_credentials_but_not_params(self):
+        """The API key and rotating session cookies do not split the cache; other fetch params do."""
+        cache = ResponseCache(self.cache_dir)
+        url = "https://www.amazon.com/dp/X"
+        self.assertEqual(
+            cache.key_for(url, {"api_key": "a", "cookies": "c", "block_resources": "false"}),
+            cache.key_for(url, {"api_key": "b", "cookies": "d", "block_resources": "false"}),
+        )
+        self.assertNotEqual(
+            cache.key_for(url, {"block_resources": "false"}),
+            cache.key_for(url, {"block_resources": "true"}),
+        )
+
+    def test_ttl_expiry(self):
+        """Entries older than the TTL are treated as misses and removed."""
+        cache = ResponseCache(self.cache_dir, ttl=0.05)
+        key = cache.key_for("https://www.amazon.com/dp/X")
+        cache.put(key, b"old")
+        time.sleep(0.1)
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted once over the size cap."""
+        cache = ResponseCache(self.cache_dir, max_bytes=10 ** 9)
+        keys = [cache.key_for(f"https://www.amazon.com/dp/{i}") for i in range(3)]
+        for key in keys:
+            cache.put(key, os.urandom(2000))
+            time.sleep(0.01)
+        cache.get(keys[0])  # touch the oldest so keys[1] becomes LRU
+        cache.max_bytes = cache.stats()["bytes"] - 1
+        cache.put(keys[2], os.urandom(2000))
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import unittest
+from unittest import mock
+
+from review_batcher import pack_reviews, estimate_tokens
+from review_sentiment import SentimentGenerator, BATCH_SENTIMENT_PROMPT
+from openai_handler import OpenAIHandler
+
+
+class ScriptedSentimentGenerator(SentimentGenerator):
+    """Answers batch prompts locally, dropping the result of any review marked 'bad'."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.requests = []
+
+    def _get_responses(self, sysprompt, prompts):
+        return [self._answer(sysprompt, prompt) for prompt in prompts]
+
+    def _answer(self, sysprompt, prompt):
+        items = json.loads(prompt)
+        self.requests.append((sysprompt, len(items)))
+        if sysprompt != BATCH_SENTIMENT_PROMPT:
+            return json.dumps({"pos_5_aspects": ["PRICE"]})
+        return json.dumps({"results": [
+            {"id": item["id"], "pos_aspects": ["BATTERY", "NOT_AN_ASPECT"], "neg_aspects": []}
+            for item in items if "bad" not in item["review_text"]
+        ]})
+
+
+class TestReviewBatcher(unittest.TestCase):
+    """Unit tests for token-budgeted review packing and batched sentiment requests."""
+
+    def test_pack_respects_budget_and_order(self):
+        """Batches stay under the token and item limits and keep review order."""
+        items = [{"id": i, "review_text": "x" * 400} for i in range(10)]
+        per_item = estimate_tokens(json.dumps(items[0]))
+        batches = pack_reviews(items, max_tokens=per_item * 3, max_items=2)
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 2, 2, 2])
+        self.assertEqual([item["id"] for batch in batches for item in batch], list(range(10)))
+        self.assertEqual(len(pack_reviews(items, max_tokens=per_item * 3, max_items=10)), 4)
+
+    def test_oversized_item_gets_own_batch(self):
+        """A single review larger than the budget is still sent, alone."""
+        batches = pack_reviews([{"review_text": "x" * 100}, {"review_text": "y" * 10000}], max_tokens=50)
+        self.assertEqual([len(batch) for batch in batches], [1, 1])
+
+    def test_one_request_per_batch_and_failed_items_retried(self):
+        """Good reviews share one request; a dropped review is split out and falls back alone."""
+        laptop = {"review": [
+            {"star_rating": "5.0 out of 5 stars", "review_text": f"great battery {i}"} for i in range(7)
+        ] + [{"star_rating": "5.0 out of 5 stars", "review_text": "bad item"}]}
+        generator = ScriptedSentimentGenerator()
+        sentiments = generator.analyse_product(laptop)
+        self.assertEqual(sentiments["pos_5_aspects"], ["BATTERY"] * 7 + ["PRICE"])
+        self.assertEqual(generator.requests[0], (BATCH_SENTIMENT_PROMPT, 8))
+        self.assertEqual(generator.requests[-1][1], 1)
+        self.assertLess(len(generator.requests), 8)
+
+    def test_single_response_tolerates_refusals_and_filters_aspects(self):
+        """None and non-object responses fail the review only; unknown aspects are dropped."""
+        generator = SentimentGenerator()
+        item = {"star_rating": "2.0 out of 5 stars", "review_text": "loud fan"}
+        self.assertIsNone(generator.parse_single_response(item, None))
+        self.assertIsNone(generator.parse_single_response(item, "[]"))
+        response = json.dumps({"pos_2_aspects": "PRICE", "neg_2_aspects": ["AUDIO", "FAN_NOISE"]})
+        self.assertEqual(generator.parse_single_response(item, response), ([], ["AUDIO"]))
+
+    def test_failed_batch_request_is_split_not_fatal(self):
+        """A request that raises only fails its own reviews; the rest of the product is kept."""
+        scripted = ScriptedSentimentGenerator()
+
+        def get_responses(handler, prompts, return_exceptions=False):
+            self.assertTrue(return_exceptions)
+            return [ValueError("context length exceeded") if "bad" in prompt
+                    else scripted._answer(handler.sysprompt, prompt) for prompt in prompts]
+
+        items = [{"id": i, "star_rating": "5.0 out of 5 stars", "review_text": f"great battery {i}"}
+                 for i in range(3)] + [{"id": 3, "star_rating": "5.0 out of 5 stars", "review_text": "bad item"}]
+        with mock.patch.object(OpenAIHandler, "__init__", lambda handler, sysprompt: setattr(
+                handler, "sysprompt", sysprompt)), mock.patch.object(OpenAIHandler, "get_responses", get_responses):
+            results = SentimentGenerator(max_batch_size=4).analyse_reviews(items)
+        self.assertEqual(results, {i: (["BATTERY"], []) for i in range(3)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+
+from review_extractor import parse_review_page
+from review_index import ReviewIndex, review_id
+
+PAGE = b"""<html><body><ul>
+<li id="R1ABCDEF" data-hook="review"><span data-hook="review-body"><span>Great screen</span></span></li>
+<li data-hook="review"><span data-hook="review-body"><span>Battery dies fast</span></span></li>
+</ul></body></html>"""
+
+
+class TestReviewIndex(unittest.TestCase):
+    """Unit tests for stable review IDs and the persistent review index."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "index.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_review_ids_prefer_amazon_ids(self):
+        """Amazon's review ID is kept; reviews without one get a stable content digest."""
+        first, second = parse_review_page(PAGE)["reviews"]
+        self.assertEqual(first["review_id"], "R1ABCDEF")
+        self.assertTrue(second["review_id"].startswith("h:"))
+        self.assertEqual(parse_review_page(PAGE)["reviews"][1]["review_id"], second["review_id"])
+        self.assertNotEqual(review_id({"review_text": "Battery dies"}), second["review_id"])
+
+    def test_index_persists_membership_across_runs(self):
+        """Added IDs are known after a reopen and keep the product they were first seen on."""
+        reviews = [{"review_id": "R1", "review_text": "a"}, {"review_text": "b"}]
+        index = ReviewIndex(self.path)
+        self.assertEqual(index.add(reviews, "hp", "A1"), 2)
+        self.assertEqual(index.add(reviews, "dell", "B1"), 0)
+
+        reopened = ReviewIndex(self.path)
+        self.assertEqual(len(reopened), 2)
+        self.assertIn("R1", reopened)
+        self.assertEqual(reopened.location(review_id(reviews[1])), ("hp", "A1"))
+        self.assertEqual(reopened.unknown(reviews + [{"review_id": "R2"}]), [{"review_id": "R2"}])
+        self.assertIsNone(reopened.location("R2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
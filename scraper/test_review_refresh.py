@@ -0,0 +1,130 @@
+import os
+import json
+import tempfile
+import unittest
+
+from pipeline_manifest import PipelineManifest
+from review_scraper import AmazonReviewProcessor
+from review_sentiment import SentimentGenerator
+from review_store import ReviewStore
+
+
+def review(rid, text, star="5.0 out of 5 stars"):
+    return {"review_id": rid, "reviewer_name": "A", "star_rating": star, "review_date": "May 1",
+            "review_text": text}
+
+
+def page(reviews):
+    return {"details": {"title": "Laptop", "average_rating": "4.6 out of 5 stars",
+                        "review_count": "130 global ratings"},
+            "histogram": {"5_star": "90", "1_star": "10"}, "star_urls": {}, "reviews": reviews}
+
+
+class FakeFetcher:
+    """Serves parsed pages by page number and records the requests made."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def run(self, requests, on_page, parse=None, fresh=False):
+        pending = list(requests)
+        while pending:
+            key, url = pending.pop(0)
+            self.requested.append((key, url, fresh))
+            pending.extend(on_page(key, self.pages.get(key)) or [])
+
+
+class RecordingSentimentGenerator(SentimentGenerator):
+    """Answers batch prompts locally and records which reviews reached the LLM."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sent = []
+
+    def _get_responses(self, sysprompt, prompts):
+        responses = []
+        for prompt in prompts:
+            items = json.loads(prompt)
+            self.sent.extend(item["review_text"] for item in items)
+            responses.append(json.dumps({"results": [
+                {"id": item["id"], "pos_aspects": ["BATTERY"], "neg_aspects": []} for item in items
+            ]}))
+        return responses
+
+
+class TestReviewRefresh(unittest.TestCase):
+    """Unit tests for fetching and analysing only the new reviews of a product."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_refresh_stops_at_first_stored_review(self):
+        """Recent pages are fetched fresh until a stored review appears; new reviews go first."""
+        stored = {"product_id": "A1", "average_rating": "4.5 out of 5 stars",
+                  "review": [review("R3", "old battery review"), review("R4", "older screen review")]}
+        processor = AmazonReviewProcessor("key", "hp", {"asin": "A1"}, review_pages=5, output_dir=self.tmp.name)
+        processor.fetcher = FakeFetcher({
+            1: page([review("R1", "new battery review"), review("R2", "newer screen review")]),
+            2: page([review("R5", "another new review"), review("R3", "old battery review")]),
+            3: page([review("R6", "never requested")]),
+        })
+        new_reviews = processor.refresh_reviews(stored)
+
+        self.assertEqual([r["review_id"] for r in new_reviews], ["R1", "R2", "R5"])
+        self.assertEqual([key for key, _, _ in processor.fetcher.requested], [1, 2])
+        self.assertTrue(all(fresh and "sortBy=recent" in url for _, url, fresh in processor.fetcher.requested))
+        refreshed = ReviewStore(os.path.join(self.tmp.name, "hp_reviews.jsonl")).get("A1")
+        self.assertEqual([r["review_id"] for r in refreshed["review"]], ["R1", "R2", "R5", "R3", "R4"])
+        self.assertEqual(refreshed["average_rating"], "4.6 out of 5 stars")
+        self.assertEqual(refreshed["histogram"], {"5_star": "90%", "1_star": "10%"})
+
+    def test_refresh_skips_unsampled_reviews_and_keeps_quotas(self):
+        """Unsampled older reviews are not added, and each star is trimmed back to its quota."""
+        def dated(rid, text, day, star="5.0 out of 5 stars"):
+            return dict(review(rid, text, star), review_date=f"Reviewed in the United States on May {day}, 2024")
+
+        stored = {"product_id": "A1", "review": [dated("R3", "sampled five star", 10),
+                                                 dated("R4", "sampled one star", 2, "1.0 out of 5 stars")]}
+        processor = AmazonReviewProcessor("key", "hp", {"asin": "A1"}, review_pages=5, output_dir=self.tmp.name)
+        processor.fetcher = FakeFetcher({
+            1: page([dated(f"N{i}", text, 20) for i, text in enumerate(
+                ["battery lasts", "screen is bright", "keyboard feels great", "fans are quiet", "speakers sound rich",
+                 "light to carry", "boots quickly", "ports are handy", "hinge is sturdy", "trackpad is smooth"])]
+                    + [dated("U1", "unsampled but recent enough", 11)]),
+            2: page([dated("R3", "sampled five star", 10), dated("U2", "unsampled older one", 9)]),
+            3: page([dated("U3", "never requested", 1)]),
+        })
+        new_reviews = processor.refresh_reviews(stored)
+
+        self.assertEqual([key for key, _, _ in processor.fetcher.requested], [1, 2])
+        self.assertEqual(len(new_reviews), 9)
+        refreshed = ReviewStore(os.path.join(self.tmp.name, "hp_reviews.jsonl")).get("A1")
+        self.assertEqual([r["review_id"] for r in refreshed["review"]], [f"N{i}" for i in range(9)] + ["R4"])
+        self.assertEqual(refreshed["histogram_reviews_to_scrape"], {"5_star": 9, "1_star": 1})
+
+    def test_sentiments_are_extended_with_new_reviews_only(self):
+        """Only new reviews reach the LLM, and their aspects are appended to the previous ones."""
+        manifest = PipelineManifest(os.path.join(self.tmp.name, "manifest.jsonl"))
+        store = ReviewStore(os.path.join(self.tmp.name, "sentiments.jsonl"))
+        generator = RecordingSentimentGenerator(prefilter=False)
+        laptop = {"product_id": "A1", "review": [review("R3", "old battery review")]}
+        generator.process_product(dict(laptop), store, manifest)
+
+        refreshed = {"product_id": "A1", "review": [review("R1", "new battery review", "1.0 out of 5 stars")]
+                     + laptop["review"]}
+        result = generator.process_product(refreshed, store, manifest)
+        self.assertEqual(generator.sent, ["old battery review", "new battery review"])
+        self.assertEqual(result["review_sentiments"]["pos_5_aspects"], ["BATTERY"])
+        self.assertEqual(result["review_sentiments"]["pos_1_aspects"], ["BATTERY"])
+
+        # Removing a review means the previous aspects cannot be reused
+        generator.process_product({"product_id": "A1", "review": refreshed["review"][:1]}, store, manifest)
+        self.assertEqual(generator.sent[2:], ["new battery review"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import json
+import tempfile
+import unittest
+
+from minhash import MinHasher, LSHIndex, similarity
+from review_result_cache import ReviewResultCache
+from review_sentiment import SentimentGenerator
+
+
+class RecordingSentimentGenerator(SentimentGenerator):
+    """Answers batch prompts locally and records which reviews reached the LLM."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sent = []
+
+    def _get_responses(self, sysprompt, prompts):
+        responses = []
+        for prompt in prompts:
+            items = json.loads(prompt)
+            self.sent.extend(item["review_text"] for item in items)
+            responses.append(json.dumps({"results": [
+                {"id": item["id"], "pos_aspects": ["PRICE"], "neg_aspects": []} for item in items
+            ]}))
+        return responses
+
+
+class TestReviewResultCache(unittest.TestCase):
+    """Unit tests for MinHash signatures and near-duplicate result reuse."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "results.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_signatures_estimate_similarity(self):
+        """Formatting changes keep signatures identical; unrelated texts share almost nothing."""
+        hasher = MinHasher()
+        a = hasher.signature("Great laptop for the price")
+        self.assertEqual(similarity(a, hasher.signature("great laptop for the price!!")), 1.0)
+        self.assertLess(similarity(a, hasher.signature("Battery dies fast")), 0.2)
+
+        index = LSHIndex()
+        index.insert("a", a)
+        self.assertEqual(index.query(hasher.signature("Great laptop for the price.")), {"a"})
+        index.remove("a")
+        self.assertEqual(len(index), 0)
+
+    def test_near_duplicates_reuse_results_per_star(self):
+        """A near-duplicate with the same star reuses the result; another star rating does not."""
+        cache = ReviewResultCache(self.path, verify_rate=0)
+        cache.add("Great laptop for the price", 5, (["PRICE"], []))
+        self.assertEqual(cache.lookup("great laptop for the price!", 5), [["PRICE"], []])
+        self.assertIsNone(cache.lookup("great laptop for the price!", 1))
+        self.assertIsNone(cache.lookup("Battery dies fast", 5))
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_entries_persist_and_stay_bounded(self):
+        """Entries survive a reopen, and the least recently used are evicted past max_entries."""
+        cache = ReviewResultCache(self.path, max_entries=2, verify_rate=0)
+        for text in ["Battery dies fast", "Screen is too dim", "Keyboard feels cheap"]:
+            cache.add(text, 2, ([], ["BATTERY"]))
+        reopened = ReviewResultCache(self.path, max_entries=2, verify_rate=0)
+        self.assertEqual(reopened.stats()["entries"], 2)
+        self.assertIsNone(reopened.lookup("Battery dies fast", 2))
+        self.assertIsNotNone(reopened.lookup("Keyboard feels cheap", 2))
+        self.assertEqual(ReviewResultCache(self.path, version="other").stats()["entries"], 0)
+
+    def test_verification_measures_agreement(self):
+        """Sampled hits are re-analysed and compared with the reused result."""
+        cache = ReviewResultCache(self.path, verify_rate=1.0)
+        cache.add("Great laptop for the price", 5, (["PRICE"], []))
+        self.assertIsNone(cache.lookup("Great laptop for the price!", 5))
+        cache.add("Great laptop for the price!", 5, (["PRICE", "PERFORMANCE"], []))
+        self.assertEqual(cache.stats()["verified"], 1)
+        self.assertEqual(cache.stats()["agreement"], 0.5)
+
+    def test_unanswered_verifications_are_discarded_and_counted(self):
+        """A sampled hit counts as a lookup and is forgotten if the LLM drops the review."""
+        cache = ReviewResultCache(self.path, verify_rate=1.0)
+        cache.add("Great laptop for the price", 5, (["PRICE"], []))
+        generator = SentimentGenerator(prefilter=False, result_cache=cache)
+        items = [{"id": 0, "star_rating": "5.0 out of 5 stars", "review_text": "Great laptop for the price!"}]
+        kept, _ = generator.filter_reviews(items)
+        self.assertEqual(kept, items)
+        generator.remember_results(kept, {})
+        self.assertEqual(cache._verifying, {})
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertIn("reused 0 of 1 review results", cache.report())
+
+    def test_failed_analysis_clears_pending_verifications(self):
+        """Samples taken for verification are dropped even when the LLM call raises."""
+        class FailingSentimentGenerator(SentimentGenerator):
+            def _get_responses(self, sysprompt, prompts):
+                raise RuntimeError("LLM unavailable")
+
+        cache = ReviewResultCache(self.path, verify_rate=1.0)
+        cache.add("Great laptop for the price", 5, (["PRICE"], []))
+        generator = FailingSentimentGenerator(prefilter=False, result_cache=cache)
+        laptop = {"review": [{"star_rating": "5.0 out of 5 stars", "review_text": "Great laptop for the price!"}]}
+        with self.assertRaises(RuntimeError):
+            generator.analyse_product(laptop)
+        self.assertEqual(cache._verifying, {})
+
+    def test_access_times_are_written_on_flush(self):
+        """Hits update access times in memory; flush() persists them for LRU ordering."""
+        cache = ReviewResultCache(self.path, verify_rate=0)
+        cache.add("Battery dies fast", 2, ([], ["BATTERY"]))
+        cache.add("Screen is too dim", 2, ([], ["DISPLAY"]))
+        self.assertIsNotNone(cache.lookup("Battery dies fast", 2))
+        self.assertIsNone(ReviewResultCache(self.path, max_entries=1, verify_rate=0).lookup("Battery dies fast", 2))
+        cache.flush()
+        self.assertIsNotNone(ReviewResultCache(self.path, max_entries=1, verify_rate=0).lookup("Battery dies fast", 2))
+
+    def test_generator_skips_llm_for_cached_phrasings(self):
+        """A phrasing analysed for one laptop is reused for the next without an LLM call."""
+        generator = RecordingSentimentGenerator(
+            prefilter=False, result_cache=ReviewResultCache(self.path, verify_rate=0))
+        first = {"review": [{"star_rating": "5.0 out of 5 stars", "review_text": "Great laptop for the price"}]}
+        second = {"review": [{"star_rating": "5.0 out of 5 stars", "review_text": "great laptop for the price!"}]}
+        generator.analyse_product(first)
+        sentiments = generator.analyse_product(second)
+        self.assertEqual(generator.sent, ["Great laptop for the price"])
+        self.assertEqual(sentiments["pos_5_aspects"], ["PRICE"])
+
+
+if __name__ == "__main__":
+    unittest.main()
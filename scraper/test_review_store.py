@@ -0,0 +1,75 @@
+import os
+import json
+import tempfile
+import unittest
+
+from review_store import ReviewStore
+
+
+class TestReviewStore(unittest.TestCase):
+    """Unit tests for the append-only product review store."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "hp_reviews.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_upsert_latest_wins_and_keeps_order(self):
+        """Re-upserting a product replaces it in place without duplicating it."""
+        store = ReviewStore(self.path)
+        store.upsert({"product_id": "A", "review": []})
+        store.upsert({"product_id": "B", "review": []})
+        store.upsert({"product_id": "A", "review": [{"review_text": "new"}]})
+        self.assertEqual(store.product_ids(), ["A", "B"])
+        self.assertEqual(store.get("A")["review"], [{"review_text": "new"}])
+        # checks if a reopened store sees the same latest records
+        reopened = ReviewStore(self.path)
+        self.assertEqual([p["product_id"] for p in reopened], ["A", "B"])
+        self.assertEqual(reopened.get("A")["review"], [{"review_text": "new"}])
+
+    def test_records_without_product_id_are_skipped(self):
+        """Empty product data from failed scrapes is not stored."""
+        store = ReviewStore(self.path)
+        self.assertFalse(store.upsert({}))
+        self.assertEqual(len(store), 0)
+
+    def test_compact_drops_superseded_lines(self):
+        """Compaction leaves exactly one line per product."""
+        store = ReviewStore(self.path)
+        for i in range(3):
+            store.upsert({"product_id": "A", "version": i})
+        store.compact()
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 1)
+        self.assertEqual(store.get("A")["version"], 2)
+
+    def test_torn_trailing_line_is_ignored(self):
+        """A partially written last line from a crash is dropped on open."""
+        store = ReviewStore(self.path)
+        store.upsert({"product_id": "A"})
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"product_id": "B", "rev')
+        reopened = ReviewStore(self.path)
+        self.assertEqual(reopened.product_ids(), ["A"])
+        reopened.upsert({"product_id": "C"})
+        self.assertEqual(ReviewStore(self.path).product_ids(), ["A", "C"])
+
+    def test_export_matches_json_dump(self):
+        """The legacy export is byte-identical to json.dump(indent=4)."""
+        store = ReviewStore(self.path)
+        products = [
+            {"product_id": "A", "review": [{"review_text": "ok\nfine"}], "histogram": {}},
+            {"product_id": "B", "review": []},
+        ]
+        for product in products:
+            store.upsert(product)
+        out = os.path.join(self.tmp.name, "hp_reviews.json")
+        store.export_json(out)
+        with open(out, encoding="utf-8") as f:
+            self.assertEqual(f.read(), json.dumps(products, ensure_ascii=False, indent=4))
+
+
+if __name__ == "__main__":
+    unittest.main()
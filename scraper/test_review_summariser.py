@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+
+from pipeline_manifest import PipelineManifest
+from review_store import ReviewStore
+from review_summariser import (ReviewSummariser, SUMMARISATION_PROMPT, CHUNK_SUMMARISATION_PROMPT,
+                               REDUCE_SUMMARISATION_PROMPT, UPDATE_SUMMARISATION_PROMPT)
+
+
+class ScriptedSummariser(ReviewSummariser):
+    """Answers summary prompts locally and records each round of requests."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.rounds = []
+
+    def _get_responses(self, sysprompt, prompts):
+        self.rounds.append((sysprompt, len(prompts)))
+        if sysprompt == CHUNK_SUMMARISATION_PROMPT:
+            return [f"partial of {prompt.count(';') + 1} reviews" for prompt in prompts]
+        return ["The laptop is good."]
+
+
+class TestReviewSummariser(unittest.TestCase):
+    """Unit tests for the chunked map-reduce summariser."""
+
+    def laptop(self, n_reviews):
+        return {"review": [{"review_text": f"review number {i} " + "x" * 200} for i in range(n_reviews)]}
+
+    def test_small_product_uses_single_request(self):
+        """Reviews that fit one chunk keep the original one-request prompt."""
+        summariser = ScriptedSummariser(chunk_tokens=3000)
+        self.assertEqual(summariser.summarise_product(self.laptop(5)), "The laptop is good.")
+        self.assertEqual(summariser.rounds, [(SUMMARISATION_PROMPT, 1)])
+
+    def test_large_product_maps_chunks_then_reduces(self):
+        """Many reviews are summarised in parallel chunks, then reduced in one request."""
+        summariser = ScriptedSummariser(chunk_tokens=600)
+        self.assertEqual(summariser.summarise_product(self.laptop(50)), "The laptop is good.")
+        (map_prompt, n_chunks), reduce_round = summariser.rounds
+        self.assertEqual(map_prompt, CHUNK_SUMMARISATION_PROMPT)
+        self.assertGreater(n_chunks, 1)
+        self.assertEqual(reduce_round, (REDUCE_SUMMARISATION_PROMPT, 1))
+
+    def test_round_trips_do_not_grow_with_reviews(self):
+        """Ten times more reviews still take one map round and one reduce round."""
+        rounds = []
+        for n_reviews in (30, 300):
+            summariser = ScriptedSummariser(chunk_tokens=600)
+            summariser.summarise_product(self.laptop(n_reviews))
+            rounds.append(len(summariser.rounds))
+        self.assertEqual(rounds, [2, 2])
+
+
+class TestIncrementalSummaries(unittest.TestCase):
+    """Unit tests for updating summaries when only some reviews are new."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ReviewStore(os.path.join(self.tmp.name, "hp_processed_reviews.jsonl"))
+        self.manifest = PipelineManifest(os.path.join(self.tmp.name, "manifest.jsonl"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_product(self, n_reviews, skip=0):
+        summariser = ScriptedSummariser()
+        laptop = {"product_id": "A", "review": [{"review_text": f"review {i}"} for i in range(skip, n_reviews)]}
+        summariser.process_product(laptop, self.store, self.manifest)
+        return [prompt for prompt, _ in summariser.rounds]
+
+    def test_few_new_reviews_update_the_summary(self):
+        """A handful of new reviews costs one update request; no change costs nothing."""
+        self.assertEqual(self.run_product(20), [SUMMARISATION_PROMPT])
+        self.assertEqual(self.run_product(22), [UPDATE_SUMMARISATION_PROMPT])
+        self.assertEqual(self.run_product(22), [])
+
+    def test_many_new_or_removed_reviews_regenerate(self):
+        """Too many new reviews, or removed ones, fall back to a full summary."""
+        self.run_product(20)
+        self.assertEqual(self.run_product(40), [SUMMARISATION_PROMPT])
+        self.assertEqual(self.run_product(40, skip=1), [SUMMARISATION_PROMPT])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import asyncio
+import unittest
+from unittest import mock
+from types import SimpleNamespace
+from email.utils import formatdate
+
+from scrapingbee_client import ScrapingBeeClient
+
+
+class StubSession:
+    """Replays (status, headers) pairs for blocking requests and records each call."""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        status, headers = self.statuses.pop(0)
+        return SimpleNamespace(status_code=status, content=f"body {status}".encode(), headers=headers)
+
+
+class StubResponse:
+    def __init__(self, status, headers):
+        self.status = status
+        self.headers = headers
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def read(self):
+        return f"body {self.status}".encode()
+
+
+class StubAsyncSession(StubSession):
+    """Asynchronous counterpart of StubSession, shaped like an aiohttp session."""
+
+    def get(self, url, params=None):
+        self.calls += 1
+        return StubResponse(*self.statuses.pop(0))
+
+
+class TestScrapingBeeClient(unittest.TestCase):
+    """Unit tests for the shared ScrapingBee client's retry policy."""
+
+    def client(self, statuses, **kwargs):
+        client = ScrapingBeeClient(api_key="key", **kwargs)
+        client._session = StubSession(statuses)
+        return client
+
+    def test_retry_delay_prefers_retry_after(self):
+        """Seconds and HTTP-date Retry-After values are honoured and capped at backoff_cap."""
+        client = ScrapingBeeClient(api_key="key", backoff_cap=30.0)
+        self.assertEqual(client.retry_delay(0, "2.5"), 2.5)
+        self.assertEqual(client.retry_delay(0, "600"), 30.0)
+        self.assertAlmostEqual(client.retry_delay(0, formatdate(usegmt=True)), 0.0, delta=1.0)
+        self.assertLessEqual(client.retry_delay(10, "soon"), 30.0)
+
+    def test_transient_statuses_are_retried_with_server_delay(self):
+        """429 and 5xx responses are retried, waiting for Retry-After when the server sends one."""
+        client = self.client([(429, {"Retry-After": "3"}), (503, {}), (200, {})])
+        with mock.patch("scrapingbee_client.time.sleep") as sleep, \
+                mock.patch("scrapingbee_client.random.uniform", return_value=0.5):
+            self.assertEqual(client.get("https://www.amazon.com/dp/X"), b"body 200")
+        self.assertEqual(client._session.calls, 3)
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [3.0, 0.5])
+
+    def test_other_statuses_are_not_retried(self):
+        """A non-retryable status gives up at once, and retries stop after max_retries."""
+        client = self.client([(404, {})])
+        with mock.patch("scrapingbee_client.time.sleep") as sleep:
+            self.assertIsNone(client.get("https://www.amazon.com/dp/X"))
+        self.assertEqual(client._session.calls, 1)
+        sleep.assert_not_called()
+
+        client = self.client([(500, {})] * 3, max_retries=2)
+        with mock.patch("scrapingbee_client.time.sleep"):
+            self.assertIsNone(client.get("https://www.amazon.com/dp/X"))
+        self.assertEqual(client._session.calls, 3)
+
+    def test_async_get_shares_the_retry_policy(self):
+        """get_async() retries transient statuses and stops at other failures like get()."""
+        client = ScrapingBeeClient(api_key="key", backoff_base=0.0)
+        session = StubAsyncSession([(502, {}), (200, {})])
+        self.assertEqual(asyncio.run(client.get_async(session, "https://www.amazon.com/dp/X")), b"body 200")
+        self.assertEqual(session.calls, 2)
+
+        session = StubAsyncSession([(403, {})])
+        self.assertIsNone(asyncio.run(client.get_async(session, "https://www.amazon.com/dp/X")))
+        self.assertEqual(session.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import json
+import tempfile
+import unittest
+
+from sentiment_cascade import LocalSentimentClassifier, SentimentCascade, label_accuracy
+from review_sentiment import SentimentGenerator
+
+
+def quad(category, polarity):
+    return {"aspect": "NULL", "opinion": "NULL", "polarity": polarity, "category": category}
+
+
+RECORDS = [{"text": f"the screen is bright and sharp {i}", "labels": [quad("DISPLAY#QUALITY", "positive")]}
+           for i in range(20)] + \
+          [{"text": f"battery dies after an hour {i}", "labels": [quad("BATTERY#OPERATION_PERFORMANCE", "negative")]}
+           for i in range(20)] + \
+          [{"text": f"shipping was quick {i}", "labels": [quad("SHIPPING#GENERAL", "positive")]} for i in range(20)]
+
+
+class ScriptedClassifier:
+    """Returns fixed predictions: confident about screens, unsure about anything else."""
+
+    kind = "aspect"
+    version = "scripted"
+
+    def predict(self, texts):
+        return [({"DISPLAY:positive"}, 0.95) if "screen" in text else (set(), 0.6) for text in texts]
+
+
+class RecordingSentimentGenerator(SentimentGenerator):
+    """Answers batch prompts locally and records which reviews reached the LLM."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sent = []
+
+    def _get_responses(self, sysprompt, prompts):
+        responses = []
+        for prompt in prompts:
+            items = json.loads(prompt)
+            self.sent.extend(item["review_text"] for item in items)
+            responses.append(json.dumps({"results": [
+                {"id": item["id"], "pos_aspects": ["PRICE"], "neg_aspects": []} for item in items
+            ]}))
+        return responses
+
+
+class TestSentimentCascade(unittest.TestCase):
+    """Unit tests for the local classifier and its confidence gate."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.classifier = LocalSentimentClassifier("aspect", min_df=1, iterations=200).fit(RECORDS)
+
+    def test_classifier_learns_aspect_polarities(self):
+        """Seen phrasings get their aspect labels with high confidence; service reviews get none."""
+        (screen, screen_confidence), (battery, _), (shipping, _) = self.classifier.predict(
+            ["the screen is bright", "battery dies fast", "shipping was quick"])
+        self.assertEqual(screen, {"DISPLAY:positive", "BUILD_QUALITY:positive"})
+        self.assertEqual(battery, {"BATTERY:negative", "PERFORMANCE:negative"})
+        self.assertEqual(shipping, set())
+        self.assertGreater(screen_confidence, 0.7)
+
+    def test_threshold_controls_escalation(self):
+        """A threshold of 1.0 escalates everything; a low threshold answers everything locally."""
+        texts = ["the screen is bright", "something unrelated entirely"]
+        strict = SentimentCascade(self.classifier, threshold=1.0)
+        self.assertEqual(strict.answer(texts), [None, None])
+        self.assertEqual(strict.escalation_rate(), 1.0)
+        lenient = SentimentCascade(self.classifier, threshold=0.5)
+        self.assertNotIn(None, lenient.answer(texts))
+        self.assertEqual(lenient.escalation_rate(), 0.0)
+
+    def test_save_and_load_round_trip(self):
+        """A saved classifier predicts the same as the original."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "aspect.npz")
+            self.classifier.save(path)
+            loaded = LocalSentimentClassifier("aspect").load(path)
+        texts = ["the screen is bright", "battery dies"]
+        self.assertEqual(loaded.predict(texts), self.classifier.predict(texts))
+        self.assertEqual(loaded.version, self.classifier.version)
+
+    def test_generator_escalates_only_uncertain_reviews(self):
+        """Confident reviews are answered locally; the rest go to the LLM."""
+        laptop = {"review": [
+            {"star_rating": "5.0 out of 5 stars", "review_text": "the screen is bright and sharp"},
+            {"star_rating": "2.0 out of 5 stars", "review_text": "the price is odd for what you get"},
+        ]}
+        generator = RecordingSentimentGenerator(cascade=SentimentCascade(ScriptedClassifier(), threshold=0.9))
+        sentiments = generator.analyse_product(laptop)
+        self.assertEqual(generator.sent, ["the price is odd for what you get"])
+        self.assertEqual(sentiments["pos_5_aspects"], ["DISPLAY"])
+        self.assertEqual(sentiments["pos_2_aspects"], ["PRICE"])
+        self.assertEqual(generator.cascade.escalation_rate(), 0.5)
+
+    def test_label_accuracy(self):
+        """Per-review accuracy is the overlap over the larger set; two empty sets agree."""
+        self.assertEqual(label_accuracy(set(), set()), 1.0)
+        self.assertEqual(label_accuracy({"a"}, set()), 0.0)
+        self.assertEqual(label_accuracy({"a", "b"}, {"a"}), 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
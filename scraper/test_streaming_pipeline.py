@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+
+from pipeline_manifest import PipelineManifest
+from streaming_pipeline import StreamingPipeline
+
+
+class FakeSummariser:
+    def input_hash(self, laptop):
+        return "hash"
+
+    def process_product(self, laptop, processed_store, manifest=None):
+        if laptop["product_id"] == "RAISES":
+            raise RuntimeError("LLM error")
+        laptop["review_summary"] = f"summary of {laptop['product_id']}"
+        processed_store.upsert(laptop)
+        return laptop
+
+
+class FakeSentimentGenerator:
+    def process_product(self, laptop, sentiment_store, manifest=None):
+        laptop["review_sentiments"] = {"Battery": {"positive": 1}}
+        sentiment_store.upsert(laptop)
+        return laptop
+
+
+class TestStreamingPipeline(unittest.TestCase):
+    """Unit tests for the queue-connected scrape, summary and sentiment stages."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pipeline = StreamingPipeline(
+            api_key="key", brand="hp", scrape_workers=3, summarise_workers=2,
+            sentiment_workers=2, queue_size=1, results_dir=self.tmp.name
+        )
+        self.pipeline.summariser = FakeSummariser()
+        self.pipeline.sentiment_generator = FakeSentimentGenerator()
+
+        def scrape_entry(entry, input_hash):
+            if entry["asin"] == "BAD":
+                return None
+            product = {"product_id": entry["asin"], "review": []}
+            self.pipeline.review_store.upsert(product)
+            return product
+
+        self.pipeline.scrape_entry = scrape_entry
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_every_scraped_product_reaches_sentiment_store(self):
+        """Products flow through every stage despite single-slot queues; failed scrapes stop early."""
+        asins = [{"asin": f"A{i}"} for i in range(10)] + [{"asin": "BAD"}, {}]
+        self.pipeline.run(asins)
+        final = self.pipeline.sentiment_store
+        self.assertEqual(sorted(final.product_ids()), sorted(f"A{i}" for i in range(10)))
+        for product in final:
+            self.assertEqual(product["review_summary"], f"summary of {product['product_id']}")
+            self.assertIn("review_sentiments", product)
+        self.assertTrue(os.path.exists(
+            os.path.join(self.tmp.name, "final", "hp_sentiment_analysis.json")
+        ))
+
+    def test_failing_product_does_not_stall_the_pipeline(self):
+        """An item that raises is logged and marked failed; every other product still finishes."""
+        self.pipeline.manifest = PipelineManifest(os.path.join(self.tmp.name, "manifest.jsonl"))
+        asins = [{"asin": "RAISES"}] * 4 + [{"asin": f"A{i}"} for i in range(6)]
+        self.pipeline.run(asins)
+        self.assertEqual(sorted(self.pipeline.sentiment_store.product_ids()), [f"A{i}" for i in range(6)])
+        self.assertEqual(self.pipeline.manifest.get("summarise", "RAISES")["status"], "failed")
+
+
+if __name__ == "__main__":
+    unittest.main()
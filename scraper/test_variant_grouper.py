@@ -0,0 +1,65 @@
+import tempfile
+import unittest
+
+from review_extractor import parse_probe_page
+from review_scraper import AmazonReviewProcessor
+from review_store import ReviewStore
+from variant_grouper import group_variants, review_fingerprint
+
+LISTING = {"title": "Laptop", "average_rating": "4.5 out of 5 stars", "review_count": "120 global ratings",
+           "histogram": {"5_star": "80%"}, "histogram_reviews_to_scrape": {"5_star": 8}}
+
+
+def probe(review_texts, review_count="120 global ratings", parent_asin=None):
+    return {
+        "details": {"title": "Laptop", "average_rating": "4.5 out of 5 stars", "review_count": review_count},
+        "histogram": {"5_star": "80", "1_star": "20"},
+        "star_urls": {},
+        "reviews": [{"reviewer_name": "A", "review_date": "May 1", "review_text": text} for text in review_texts],
+        "parent_asin": parent_asin,
+    }
+
+
+class TestVariantGrouper(unittest.TestCase):
+    """Unit tests for grouping ASINs that share a review pool."""
+
+    def test_groups_by_parent_asin_then_review_pool(self):
+        """Same parent or same top reviews group together; failed or empty probes stay alone."""
+        pages = {
+            "A1": probe(["great screen"]),
+            "A2": probe(["great screen"]),
+            "A3": probe(["great screen"], review_count="7 global ratings"),
+            "B1": probe(["fast"], parent_asin="P1"),
+            "B2": probe(["slow"], parent_asin="P1"),
+            "C1": None,
+            "C2": probe([]),
+            "C3": probe([]),
+        }
+        self.assertEqual(group_variants(list(pages), pages),
+                         [["A1", "A2"], ["A3"], ["B1", "B2"], ["C1"], ["C2"], ["C3"]])
+        self.assertIsNone(review_fingerprint(probe([])))
+
+    def test_probe_page_reads_parent_asin(self):
+        """The parent ASIN is read from a data attribute or embedded page data."""
+        attribute = b'<html><body><div data-parent-asin="B0PARENT01"></div></body></html>'
+        embedded = b'<html><script>var data = {"parentAsin" : "B0PARENT02"};</script></html>'
+        self.assertEqual(parse_probe_page(attribute)["parent_asin"], "B0PARENT01")
+        self.assertEqual(parse_probe_page(embedded)["parent_asin"], "B0PARENT02")
+        self.assertIsNone(parse_probe_page(b"<html></html>")["parent_asin"])
+
+    def test_variant_keeps_own_listing_with_shared_reviews(self):
+        """A variant is saved with its own ASIN and price and the scraped variant's reviews."""
+        with tempfile.TemporaryDirectory() as tmp:
+            processor = AmazonReviewProcessor(
+                "key", "hp", {"asin": "A2", "price": "$899", "product_url": "https://www.amazon.com/dp/A2"},
+                output_dir=tmp)
+            scraped = {"product_id": "A1", "review": [{"review_text": "great screen"}]}
+            path = processor.save_variant(LISTING, scraped)
+            variant = ReviewStore(path).get("A2")
+        self.assertEqual(variant["price"], "$899")
+        self.assertEqual(variant["variant_of"], "A1")
+        self.assertEqual(variant["review"], scraped["review"])
+
+
+if __name__ == "__main__":
+    unittest.main()
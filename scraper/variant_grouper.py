@@ -0,0 +1,61 @@
+import json
+import hashlib
+
+
+def review_fingerprint(page, top_reviews=5):
+    """
+    Fingerprint the review pool behind a product from its first review page. Variants
+    sharing a pool show the same rating histogram, review count and top reviews.
+
+    Args:
+        page (dict): Probe page parsed by review_extractor.parse_probe_page().
+        top_reviews (int): Number of leading reviews included in the fingerprint.
+
+    Returns:
+        str or None: Hex digest, or None when the page has no histogram or reviews to compare.
+    """
+    if not page or not page.get("histogram") or not page.get("reviews"):
+        return None
+    reviews = [[review.get("reviewer_name"), review.get("review_date"), review.get("review_text")]
+               for review in page["reviews"][:top_reviews]]
+    payload = [sorted(page["histogram"].items()), page["details"].get("review_count"), reviews]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def variant_key(page):
+    """
+    Return the key shared by every variant of a product: its parent ASIN when the page
+    names one, otherwise its review fingerprint.
+
+    Args:
+        page (dict): Probe page parsed by review_extractor.parse_probe_page().
+
+    Returns:
+        str or None: Group key, or None when the product cannot be grouped.
+    """
+    if not page:
+        return None
+    if page.get("parent_asin"):
+        return f"parent:{page['parent_asin']}"
+    fingerprint = review_fingerprint(page)
+    return f"reviews:{fingerprint}" if fingerprint else None
+
+
+def group_variants(asins, pages):
+    """
+    Group ASINs whose probe pages show the same review pool.
+
+    Args:
+        asins (list): ASINs in scrape order.
+        pages (dict): ASIN to its parsed probe page, or None if the probe failed.
+
+    Returns:
+        list: Groups as lists of ASINs, in order of their first ASIN. The first ASIN of
+            each group is scraped; its reviews are fanned out to the rest. ASINs that
+            cannot be grouped form groups of one.
+    """
+    groups = {}
+    for asin in asins:
+        key = variant_key(pages.get(asin)) or f"asin:{asin}"
+        groups.setdefault(key, []).append(asin)
+    return list(groups.values())